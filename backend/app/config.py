@@ -10,6 +10,29 @@ class SimpleSettings:
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_PORT: int = int(os.getenv("DB_PORT", "3306"))
     DB_NAME: str = os.getenv("DB_NAME", "flight_booking_db")
+    # Full SQLAlchemy URL; overrides the DB_* parts above (e.g. sqlite:///primary.db)
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+
+    # Read replicas for search/history reads: comma-separated URLs (empty = primary only)
+    DB_REPLICA_URLS: str = os.getenv("DB_REPLICA_URLS", "")
+    # "round_robin" or "least_loaded" (fewest checked-out connections)
+    DB_REPLICA_STRATEGY: str = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+    # after a user writes, their reads stay on the primary this long (read-your-writes)
+    DB_STICKY_SECONDS: float = float(os.getenv("DB_STICKY_SECONDS", 10.0))
+
+    # Async request path (AsyncSession + async driver) instead of sync + threadpool
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+    DB_ASYNC_DRIVER: str = os.getenv("DB_ASYNC_DRIVER", "aiomysql")
+
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30.0))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 3600))
+    # Liveness check on checkout: "always" (pre-ping every time),
+    # "idle" (ping only after DB_POOL_PING_IDLE_SECONDS unused) or "off"
+    DB_POOL_LIVENESS: str = os.getenv("DB_POOL_LIVENESS", "idle")
+    DB_POOL_PING_IDLE_SECONDS: float = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", 30.0))
 
     # -----------------------------
     # WALLET SETTINGS
@@ -25,11 +48,111 @@ class SimpleSettings:
     SURGE_WINDOW_MINUTES: int = int(os.getenv("SURGE_WINDOW_MINUTES", 5))
     SURGE_DURATION_MINUTES: int = int(os.getenv("SURGE_DURATION_MINUTES", 10))
     SURGE_MULTIPLIER: float = float(os.getenv("SURGE_MULTIPLIER", 1.10))
+    # attempts kept per flight (fixed memory); counts saturate here, >= SURGE_ATTEMPTS
+    SURGE_RING_SIZE: int = int(os.getenv("SURGE_RING_SIZE", 16))
+    # "sliding" (trailing window) or "fixed" (aligned windows)
+    SURGE_WINDOW_MODE: str = os.getenv("SURGE_WINDOW_MODE", "sliding")
+
+    # Pricing engine: multipliers applied in order to base_price
+    PRICING_STRATEGIES: str = os.getenv("PRICING_STRATEGIES", "surge,fare_bucket,time_to_departure")
+    # days_before_departure:multiplier, nearest matching threshold wins
+    PRICING_DEPARTURE_CURVE: str = os.getenv("PRICING_DEPARTURE_CURVE", "1:1.5,3:1.3,7:1.15,14:1.05")
+
+    # How often in-memory surge state is written back to flight_attempts
+    SURGE_FLUSH_SECONDS: float = float(os.getenv("SURGE_FLUSH_SECONDS", 2.0))
+
+    # How often stale / due rows of the flight_prices snapshot are recomputed
+    PRICE_REFRESH_SECONDS: float = float(os.getenv("PRICE_REFRESH_SECONDS", 1.0))
+
+    # -----------------------------
+    # SEAT INVENTORY
+    # -----------------------------
+    DEFAULT_FLIGHT_CAPACITY: int = int(os.getenv("DEFAULT_FLIGHT_CAPACITY", 180))
+    # counter rows per fare bucket; more shards = less row-lock contention
+    SEAT_INVENTORY_SHARDS: int = int(os.getenv("SEAT_INVENTORY_SHARDS", 8))
+    # CODE:share_of_capacity:price_multiplier, sold cheapest first
+    FARE_BUCKETS: str = os.getenv("FARE_BUCKETS", "SAVER:0.4:1.0,STANDARD:0.4:1.15,FLEX:0.2:1.35")
+
+    # -----------------------------
+    # FLIGHT SCHEDULE
+    # -----------------------------
+    # days of daily instances created when seeding an empty database
+    FLIGHT_SEED_DAYS: int = int(os.getenv("FLIGHT_SEED_DAYS", 7))
+    # departed, unbooked instances older than this are deleted (0 = keep forever)
+    FLIGHT_RETENTION_DAYS: int = int(os.getenv("FLIGHT_RETENTION_DAYS", 30))
+    FLIGHT_PRUNE_SECONDS: float = float(os.getenv("FLIGHT_PRUNE_SECONDS", 3600.0))
+
+    # Bulk schedule import: rows per multi-row upsert / commit
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", 5000))
+    IMPORT_REJECT_DIR: str = os.getenv("IMPORT_REJECT_DIR", "import_rejects")
+
+    # Connection search (in-memory route graph of dated instances)
+    CONNECTION_MAX_STOPS: int = int(os.getenv("CONNECTION_MAX_STOPS", 2))
+    CONNECTION_MIN_MINUTES: int = int(os.getenv("CONNECTION_MIN_MINUTES", 45))
+    CONNECTION_MAX_LAYOVER_HOURS: int = int(os.getenv("CONNECTION_MAX_LAYOVER_HOURS", 12))
+    # pick up instances other processes inserted (flights.id watermark)
+    ROUTE_GRAPH_SYNC_SECONDS: float = float(os.getenv("ROUTE_GRAPH_SYNC_SECONDS", 30.0))
+
+    # -----------------------------
+    # SEAT HOLDS (hold → confirm)
+    # -----------------------------
+    HOLD_TTL_SECONDS: int = int(os.getenv("HOLD_TTL_SECONDS", 600))
+    HOLD_SWEEP_SECONDS: float = float(os.getenv("HOLD_SWEEP_SECONDS", 5.0))
+    HOLD_SWEEP_BATCH: int = int(os.getenv("HOLD_SWEEP_BATCH", 500))
+
+    # -----------------------------
+    # IDEMPOTENCY KEYS
+    # -----------------------------
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400))
+    # an in-progress claim older than this is treated as abandoned
+    IDEMPOTENCY_LOCK_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
+    IDEMPOTENCY_SWEEP_SECONDS: float = float(os.getenv("IDEMPOTENCY_SWEEP_SECONDS", 60.0))
+
+    # -----------------------------
+    # FLIGHT SEARCH CACHE
+    # -----------------------------
+    SEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", 30.0))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1024))
+
+    # -----------------------------
+    # TICKET PDFs
+    # -----------------------------
+    TICKET_STORAGE_DIR: str = os.getenv("TICKET_STORAGE_DIR", "generated_tickets")
+    TICKET_RENDER_WORKERS: int = int(os.getenv("TICKET_RENDER_WORKERS", 2))
+    TICKET_EXPORT_WORKERS: int = int(os.getenv("TICKET_EXPORT_WORKERS", os.cpu_count() or 2))
+    # the merged PDF is one ReportLab document held until saved (~4.5 KB a
+    # page); larger exports have to use the ZIP format, which streams
+    TICKET_EXPORT_PDF_MAX_PAGES: int = int(os.getenv("TICKET_EXPORT_PDF_MAX_PAGES", 5000))
+
+    # -----------------------------
+    # PNR ALLOCATION
+    # -----------------------------
+    # Fixed id (0-255) for this process; unset = lease a free id from the database
+    PNR_WORKER_ID = int(os.environ["PNR_WORKER_ID"]) if os.getenv("PNR_WORKER_ID") else None
+    # leases are renewed every third of this; a dead process's id is reused after it
+    PNR_LEASE_SECONDS: int = int(os.getenv("PNR_LEASE_SECONDS", 300))
 
     # -----------------------------
     # PAGE LIMITING
     # -----------------------------
     DEFAULT_PAGE_LIMIT: int = int(os.getenv("DEFAULT_PAGE_LIMIT", 10))
+    MAX_PAGE_LIMIT: int = int(os.getenv("MAX_PAGE_LIMIT", 100))
+
+    # -----------------------------
+    # PASSWORD HASHING
+    # -----------------------------
+    # bcrypt work factor; stored hashes with other rounds are rehashed on login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    # queued hash/verify jobs beyond the workers before returning 503
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+
+    # -----------------------------
+    # OPS ENDPOINTS
+    # -----------------------------
+    # Shared secret for ops-only endpoints (bulk ticket export), sent as
+    # the X-Admin-Key header. Empty = those endpoints are disabled.
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
 
     # -----------------------------
     # SESSION AUTHENTICATION
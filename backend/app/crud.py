@@ -1,182 +1,1697 @@
 # backend/app/crud.py
 
-from datetime import datetime, timedelta
 import random
-from sqlalchemy.orm import Session
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from types import SimpleNamespace
+from sqlalchemy import exists, func, insert, literal, select, true, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from . import models
 from .config import settings
-
-
-# ---------------------------
-# SURGE CONFIG
-# ---------------------------
-SURGE_ATTEMPTS = 3
-SURGE_WINDOW_MIN = 5
-SURGE_DURATION_MIN = 10
-SURGE_MULTIPLIER = 1.10
+from .utils.airports import AIRPORT_CODES, airport_code
+from .utils.cache import get_search_cache, flight_tag, invalidate_catalog, invalidate_flights
+from .utils.catalog_import import parse_stream, write_reject
+from .utils.inventory import BUCKET_RANK, inventory_rows, opening_bucket, validate_seat
+from .utils.money import to_minor
+from .utils.pagination import keyset_page
+from .utils.pnr import WORKER_BITS, next_pnr
+from .utils.pricing import drain_stale_prices, get_pricing_engine, mark_prices_stale
+from .utils.route_graph import get_route_graph
+from .utils.surge import get_surge_engine
 
 
 # ============================================================
 # INTERNAL SURGE ENGINE
 # ============================================================
 def _update_attempt_state(db: Session, flight: models.Flight):
-    now = datetime.utcnow()
-    state = flight.attempt_state
+    """Record a booking attempt. In-memory only; persisted by the surge flusher."""
+    return get_surge_engine().record_attempt(flight.id)
 
-    # Create first attempt row
-    if not state:
-        state = models.FlightAttempt(
-            flight_id=flight.id,
-            attempt_count=1,
-            first_attempt_at=now,
-            surge_expires_at=None
-        )
-        db.add(state)
-        db.commit()
-        db.refresh(state)
-        return state
 
-    # Reset window
-    if (state.first_attempt_at is None) or (
-        now - state.first_attempt_at > timedelta(minutes=SURGE_WINDOW_MIN)
+def compute_dynamic_price(db: Session, flight: models.Flight, fare_bucket: str = None):
+    """Current price from the pricing engine (list price when no bucket is given)."""
+    return get_pricing_engine().price(flight, fare_bucket)
+
+
+def _flight_out(flight: models.Flight, price: float, surge_expires_at: datetime = None):
+    return {
+        "id": flight.id,
+        "flight_id": flight.flight_id,
+        "airline": flight.airline,
+        "departure_city": flight.departure_city,
+        "arrival_city": flight.arrival_city,
+        "base_price": flight.base_price,
+        "departure_at": flight.departure_at,
+        "arrival_at": flight.arrival_at,
+        "price": round(price, 2),
+        "surge_active": surge_expires_at is not None,
+        "surge_expires_at": surge_expires_at,
+    }
+
+
+def _snapshot_out(db: Session, flights):
+    """
+    Flights (with price_snapshot loaded) → output dicts.
+    Flights not yet in flight_prices are priced live and queued for it.
+    """
+    missing = [f for f in flights if f.price_snapshot is None]
+    buckets = current_fare_buckets(db, [f.id for f in missing])
+    live = dict(zip((f.id for f in missing), get_pricing_engine().snapshot_many(missing, fare_buckets=buckets)))
+    if missing:
+        mark_prices_stale(live.keys())
+
+    out = []
+    for f in flights:
+        snap = f.price_snapshot or live[f.id]
+        out.append(_flight_out(f, snap.price, snap.surge_expires_at))
+    return out
+
+
+# ============================================================
+# PRICE SNAPSHOTS (flight_prices)
+# ============================================================
+def current_fare_buckets(db: Session, flight_ids) -> dict:
+    """
+    flight id → the fare bucket its next seat sells in: the cheapest with
+    seats left, or the dearest once sold out. This is the bucket listings
+    are priced in, so the price shown is the price booking charges.
+    Flights without seat inventory are left out (base fare). One query.
+    """
+    flight_ids = list(flight_ids)
+    if not flight_ids:
+        return {}
+
+    seats = defaultdict(dict)
+    for flight_id, fare_bucket, available in (
+        db.query(
+            models.SeatInventory.flight_id,
+            models.SeatInventory.fare_bucket,
+            func.sum(models.SeatInventory.seats_available),
+        )
+        .filter(models.SeatInventory.flight_id.in_(flight_ids))
+        .group_by(models.SeatInventory.flight_id, models.SeatInventory.fare_bucket)
     ):
-        state.first_attempt_at = now
-        state.attempt_count = 1
-        state.surge_expires_at = None
-        db.commit()
-        return state
+        seats[flight_id][fare_bucket] = available
 
-    # Increment attempt
-    state.attempt_count += 1
+    rank = lambda bucket: BUCKET_RANK.get(bucket, len(BUCKET_RANK))
+    buckets = {}
+    for flight_id, by_bucket in seats.items():
+        open_buckets = [b for b, available in by_bucket.items() if available > 0]
+        buckets[flight_id] = min(open_buckets, key=rank) if open_buckets else max(by_bucket, key=rank)
+    return buckets
 
-    # Trigger surge
-    if state.attempt_count >= SURGE_ATTEMPTS:
-        state.surge_expires_at = now + timedelta(minutes=SURGE_DURATION_MIN)
+
+def refresh_flight_prices(db: Session, flight_ids, now: datetime = None) -> int:
+    """Recompute and upsert flight_prices rows for `flight_ids` (commits)."""
+    flight_ids = list(flight_ids)
+    if not flight_ids:
+        return 0
+
+    now = now or datetime.utcnow()
+    flights = (
+        db.query(models.Flight)
+        .options(joinedload(models.Flight.price_snapshot))
+        .filter(models.Flight.id.in_(flight_ids))
+        .all()
+    )
+
+    buckets = current_fare_buckets(db, flight_ids)
+    for flight, snap in zip(flights, get_pricing_engine().snapshot_many(flights, now, buckets)):
+        row = flight.price_snapshot
+        if row is None:
+            row = models.FlightPrice(flight_id=flight.id)
+            db.add(row)
+
+        row.price = snap.price
+        row.surge_active = snap.surge_expires_at is not None
+        row.surge_expires_at = snap.surge_expires_at
+        row.refresh_at = snap.refresh_at
+        row.updated_at = now
 
     db.commit()
-    return state
+    return len(flights)
 
 
-def compute_dynamic_price(db: Session, flight: models.Flight):
-    now = datetime.utcnow()
-    state = flight.attempt_state
+def refresh_due_prices(db: Session, now: datetime = None, batch_size: int = 1000) -> int:
+    """
+    Incremental refresh: flights marked stale by surge events, plus rows
+    whose refresh_at has passed (read off ix_flight_prices_refresh).
+    Nothing else is touched. Refreshed flights drop out of the search cache.
+    """
+    now = now or datetime.utcnow()
+    stale = set(drain_stale_prices())
+    refreshed = 0
 
-    if not state:
-        return flight.base_price
+    try:
+        while True:
+            due = [
+                row.flight_id
+                for row in db.query(models.FlightPrice.flight_id)
+                .filter(models.FlightPrice.refresh_at <= now)
+                .order_by(models.FlightPrice.refresh_at)
+                .limit(batch_size)
+                .all()
+            ]
+            batch = list(stale.union(due))
+            if not batch:
+                return refreshed
 
-    # Surge expired
-    if state.surge_expires_at and now > state.surge_expires_at:
-        state.first_attempt_at = None
-        state.attempt_count = 0
-        state.surge_expires_at = None
-        db.commit()
-        return flight.base_price
+            refreshed += refresh_flight_prices(db, batch, now)
+            invalidate_flights(batch)
+            stale.clear()
+            if len(due) < batch_size:
+                return refreshed
+    except Exception:
+        db.rollback()
+        mark_prices_stale(stale)  # retry on the next run
+        raise
+
+
+def backfill_flight_prices(db: Session) -> int:
+    """Snapshot rows for flights that don't have one yet."""
+    has_price = exists().where(models.FlightPrice.flight_id == models.Flight.id)
+    ids = [row.id for row in db.query(models.Flight.id).filter(~has_price).all()]
+    return refresh_flight_prices(db, ids)
+
+
+# ============================================================
+# CITY LOOKUP
+# ============================================================
+def normalize_city(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def _city_match(term: str):
+    """Index-friendly match: key prefix (covers exact) or IATA code."""
+    key = normalize_city(term)
+    escaped = key.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    condition = models.City.search_key.like(f"{escaped}%", escape="/")
+
+    if len(key) == 3:
+        condition = condition | (models.City.code == key.upper())
+    return condition
+
+
+def search_cities(db: Session, q: str, limit: int = 10):
+    if not normalize_city(q):
+        return []
+
+    return (
+        db.query(models.City)
+        .filter(_city_match(q))
+        .order_by(models.City.search_key)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_or_create_city(db: Session, name: str, cache: dict = None):
+    key = normalize_city(name)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    city = db.query(models.City).filter(models.City.search_key == key).first()
+    if not city:
+        city = models.City(name=" ".join(name.split()), search_key=key, code=airport_code(key))
+        db.add(city)
+        db.flush()
 
-    # Surge active
-    if state.surge_expires_at and now <= state.surge_expires_at:
-        return round(flight.base_price * SURGE_MULTIPLIER, 2)
+    if cache is not None:
+        cache[key] = city
+    return city
 
-    return flight.base_price
+
+def backfill_city_codes(db: Session) -> int:
+    """IATA codes for cities created before they were assigned (AIRPORT_CODES)."""
+    cities = (
+        db.query(models.City)
+        .filter(models.City.code.is_(None), models.City.search_key.in_(AIRPORT_CODES.keys()))
+        .all()
+    )
+    for city in cities:
+        city.code = airport_code(city.search_key)
+
+    db.commit()
+    return len(cities)
+
+
+def assign_flight_cities(db: Session, flight: models.Flight, cache: dict = None):
+    flight.departure_city_id = get_or_create_city(db, flight.departure_city, cache).id
+    flight.arrival_city_id = get_or_create_city(db, flight.arrival_city, cache).id
+    return flight
+
+
+def backfill_flight_cities(db: Session) -> int:
+    """Link flights created before the city dimension existed."""
+    flights = (
+        db.query(models.Flight)
+        .filter(
+            (models.Flight.departure_city_id.is_(None))
+            | (models.Flight.arrival_city_id.is_(None))
+        )
+        .all()
+    )
+
+    cache = {}
+    for f in flights:
+        assign_flight_cities(db, f, cache)
+
+    db.commit()
+    return len(flights)
 
 
 # ============================================================
 # FLIGHT CRUD
 # ============================================================
-def get_flights(db: Session, departure_city=None, arrival_city=None, limit=None):
+def _departure_range(date_from: date = None, date_to: date = None):
+    """Inclusive UTC departure dates → half-open [start, end) datetimes."""
+    if date_from and date_to and date_to < date_from:
+        raise ValueError("date_to must not be before date_from")
+    start = datetime.combine(date_from, time.min) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
+    return start, end
+
+
+def get_flights(
+    db: Session,
+    departure_city=None,
+    arrival_city=None,
+    limit=None,
+    cursor=None,
+    date_from: date = None,
+    date_to: date = None,
+):
+    """
+    Returns (flights, next_cursor). Without dates, pages are keyed on
+    flights.id and cover instances that have not departed yet (plus
+    undated legacy routes); with a departure date range, on
+    (departure_at, id) so results come in departure order and only that
+    slice of the departure_at indexes is read.
+    """
     if limit is None:
         limit = settings.DEFAULT_PAGE_LIMIT
 
     query = db.query(models.Flight)
 
+    # City terms resolve through the indexed cities table (subquery),
+    # then hit the (departure_city_id, arrival_city_id) route index.
     if departure_city:
-        query = query.filter(models.Flight.departure_city.ilike(f"%{departure_city}%"))
+        dep_ids = db.query(models.City.id).filter(_city_match(departure_city))
+        query = query.filter(models.Flight.departure_city_id.in_(dep_ids.scalar_subquery()))
 
     if arrival_city:
-        query = query.filter(models.Flight.arrival_city.ilike(f"%{arrival_city}%"))
+        arr_ids = db.query(models.City.id).filter(_city_match(arrival_city))
+        query = query.filter(models.Flight.arrival_city_id.in_(arr_ids.scalar_subquery()))
+
+    columns = [models.Flight.id]
+    if date_from or date_to:
+        start, end = _departure_range(date_from, date_to)
+        if start:
+            query = query.filter(models.Flight.departure_at >= start)
+        if end:
+            query = query.filter(models.Flight.departure_at < end)
+        columns = [models.Flight.departure_at, models.Flight.id]
+    else:
+        query = query.filter(
+            (models.Flight.departure_at >= datetime.utcnow()) | models.Flight.departure_at.is_(None)
+        )
+
+    # prices come from the flight_prices snapshot in the same query
+    query = query.outerjoin(models.Flight.price_snapshot).options(contains_eager(models.Flight.price_snapshot))
+    flights, next_cursor = keyset_page(query, columns, limit, cursor)
+
+    return _snapshot_out(db, flights), next_cursor
+
+
+def search_flights(
+    db: Session,
+    departure_city=None,
+    arrival_city=None,
+    limit=None,
+    cursor=None,
+    date_from: date = None,
+    date_to: date = None,
+):
+    """
+    get_flights behind the search cache.
+
+    Keyed on normalized parameters and tagged with every flight in the
+    page, so a surge flip drops exactly the searches showing that flight.
+    Entries never outlive the earliest active surge expiry on the page.
+    """
+    if limit is None:
+        limit = settings.DEFAULT_PAGE_LIMIT
+
+    key = (
+        "flights",
+        normalize_city(departure_city or ""),
+        normalize_city(arrival_city or ""),
+        date_from,
+        date_to,
+        limit,
+        cursor,
+    )
+
+    cache = get_search_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = get_flights(db, departure_city, arrival_city, limit, cursor, date_from, date_to)
+    flight_ids = [f["id"] for f in result[0]]
+
+    now = datetime.utcnow()
+    ttl = settings.SEARCH_CACHE_TTL_SECONDS
+    for f in result[0]:
+        if f["surge_expires_at"] is not None:
+            ttl = min(ttl, (f["surge_expires_at"] - now).total_seconds())
+
+    cache.set(key, result, ttl=ttl, tags=[flight_tag(fid) for fid in flight_ids])
+    return result
+
+
+def get_flight_by_id(db: Session, flight_id: int):
+    return db.query(models.Flight).filter(models.Flight.id == flight_id).first()
+
+
+def get_flight(db: Session, flight_id: int):
+    """Single flight with its snapshot price (one joined row), or None."""
+    flight = (
+        db.query(models.Flight)
+        .options(joinedload(models.Flight.price_snapshot))
+        .filter(models.Flight.id == flight_id)
+        .first()
+    )
+    if not flight:
+        return None
+    return _snapshot_out(db, [flight])[0]
+
+
+def get_fare_calendar(db: Session, departure_city: str, arrival_city: str, month: str):
+    """
+    Lowest snapshot price per departure day for a route in one month
+    ("YYYY-MM"), as [{date, min_price, flights}] for days with a
+    bookable instance: one that has seats left, at its snapshot price
+    (the cheapest open fare bucket). One grouped query over the route
+    index joined to flight_prices, which the refresher keeps current.
+    """
+    try:
+        first = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise ValueError("month must be YYYY-MM")
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    start = max(first, datetime.utcnow())
+
+    dep_ids = db.query(models.City.id).filter(_city_match(departure_city))
+    arr_ids = db.query(models.City.id).filter(_city_match(arrival_city))
+    day = func.date(models.Flight.departure_at)
+    has_seats = (
+        db.query(models.SeatInventory.id)
+        .filter(
+            models.SeatInventory.flight_id == models.Flight.id,
+            models.SeatInventory.seats_available > 0,
+        )
+        .exists()
+    )
 
-    flights = query.limit(limit).all()
+    rows = (
+        db.query(day.label("day"), func.min(models.FlightPrice.price), func.count(models.Flight.id))
+        # flights without a snapshot row yet are left out until the refresher adds it
+        .join(models.FlightPrice, models.FlightPrice.flight_id == models.Flight.id)
+        .filter(
+            models.Flight.departure_city_id.in_(dep_ids.scalar_subquery()),
+            models.Flight.arrival_city_id.in_(arr_ids.scalar_subquery()),
+            models.Flight.departure_at >= start,
+            models.Flight.departure_at < next_month,
+            has_seats,
+        )
+        .group_by(day)
+        .order_by(day)
+        .all()
+    )
+
+    # SQLite returns DATE() as text
+    return [
+        {
+            "date": d if isinstance(d, date) else date.fromisoformat(d),
+            "min_price": round(price, 2),
+            "flights": count,
+        }
+        for d, price, count in rows
+    ]
+
+
+def find_connections(
+    db: Session,
+    departure_city: str,
+    arrival_city: str,
+    date_from: date = None,
+    date_to: date = None,
+    max_stops: int = None,
+    sort: str = "cheapest",
+    limit: int = 5,
+):
+    """
+    Itineraries of up to `max_stops` connections from the in-memory
+    route graph. The search ranks legs at their base dynamic price; the
+    itineraries found are then priced in each leg's open fare bucket
+    (one inventory query) and re-ranked, so the total is what booking
+    the legs costs.
+    """
+    max_stops = settings.CONNECTION_MAX_STOPS if max_stops is None else max_stops
+    if not 0 <= max_stops <= settings.CONNECTION_MAX_STOPS:
+        raise ValueError(f"max_stops must be between 0 and {settings.CONNECTION_MAX_STOPS}")
 
-    # Return enriched data
+    origins = [c.id for c in db.query(models.City.id).filter(_city_match(departure_city))]
+    destinations = [c.id for c in db.query(models.City.id).filter(_city_match(arrival_city))]
+    if not origins or not destinations:
+        return []
+
+    now = datetime.utcnow()
+    start, end = _departure_range(date_from or now.date(), date_to or date_from)
+    start = max(start, now)
+    end = end or start + timedelta(days=1)
+
+    engine = get_pricing_engine()
+    prices = {}
+
+    def price(edge):
+        if edge.id not in prices:
+            prices[edge.id] = engine.price(edge, now=now)
+        return prices[edge.id]
+
+    paths = get_route_graph().search(
+        origins, destinations, start, end, price,
+        max_stops=max_stops, sort=sort, limit=limit,
+    )
+
+    buckets = current_fare_buckets(db, {edge.id for path in paths for edge in path})
     out = []
-    for f in flights:
-        price = compute_dynamic_price(db, f)
+    for path in paths:
+        legs = [
+            _flight_out(edge, snap.price, snap.surge_expires_at)
+            for edge, snap in zip(path, engine.snapshot_many(path, now, buckets))
+        ]
         out.append({
-            "id": f.id,
-            "flight_id": f.flight_id,
-            "airline": f.airline,
-            "departure_city": f.departure_city,
-            "arrival_city": f.arrival_city,
-            "base_price": f.base_price,
-            "price": round(price, 2)
+            "legs": legs,
+            "stops": len(path) - 1,
+            "total_price": round(sum(leg["price"] for leg in legs), 2),
+            "departure_at": path[0].departure_at,
+            "arrival_at": path[-1].arrival_at,
+            "duration_minutes": int((path[-1].arrival_at - path[0].departure_at).total_seconds() // 60),
         })
-
+    if sort == "cheapest":
+        out.sort(key=lambda it: (it["total_price"], it["duration_minutes"]))
+    else:
+        out.sort(key=lambda it: (it["duration_minutes"], it["total_price"]))
     return out
 
 
-def get_flight_by_id(db: Session, flight_id: int):
-    return db.query(models.Flight).filter(models.Flight.id == flight_id).first()
+# ============================================================
+# SEAT INVENTORY
+# ============================================================
+def create_seat_inventory(db: Session, flights) -> int:
+    """
+    Sharded seat counters for new (flushed) flights; caller commits.
+    Flights of one capacity share a counter layout, so each capacity is
+    a single INSERT ... SELECT crossing that layout with the flight ids
+    instead of buckets x shards parameter rows per flight.
+    """
+    by_capacity = defaultdict(list)
+    for f in flights:
+        by_capacity[f.capacity or settings.DEFAULT_FLIGHT_CAPACITY].append(f.id)
+
+    created = 0
+    for capacity, ids in by_capacity.items():
+        rows = inventory_rows(None, capacity)
+        layout = union_all(*(
+            select(
+                literal(row["fare_bucket"]).label("fare_bucket"),
+                literal(row["shard"]).label("shard"),
+                literal(row["seats_available"]).label("seats_available"),
+            )
+            for row in rows
+        )).subquery()
+
+        db.execute(
+            insert(models.SeatInventory.__table__).from_select(
+                ["flight_id", "fare_bucket", "shard", "seats_available"],
+                select(models.Flight.id, layout.c.fare_bucket, layout.c.shard, layout.c.seats_available)
+                .select_from(models.Flight.__table__.join(layout, true()))   # every flight x every counter
+                .where(models.Flight.id.in_(ids)),
+            )
+        )
+        created += len(rows) * len(ids)
+    return created
+
+
+def backfill_seat_inventory(db: Session) -> int:
+    """Give flights created before seat inventory existed their counters."""
+    has_inventory = exists().where(models.SeatInventory.flight_id == models.Flight.id)
+    flights = db.query(models.Flight).filter(~has_inventory).all()
+
+    create_seat_inventory(db, flights)
+    db.commit()
+    return len(flights)
+
+
+def reserve_seat(db: Session, flight_id: int) -> str:
+    """
+    Take one seat from the cheapest open fare bucket; returns the bucket.
+
+    One plain read finds open shards, then a conditional decrement
+    (`seats_available > 0`) claims a random one. Concurrent bookers land
+    on different shard rows, and a lost race just moves to the next shard,
+    so inventory can never go negative.
+    """
+    open_shards = (
+        db.query(models.SeatInventory.id, models.SeatInventory.fare_bucket)
+        .filter(
+            models.SeatInventory.flight_id == flight_id,
+            models.SeatInventory.seats_available > 0,
+        )
+        .all()
+    )
+
+    random.shuffle(open_shards)
+    open_shards.sort(key=lambda row: BUCKET_RANK.get(row.fare_bucket, len(BUCKET_RANK)))
+    open_per_bucket = Counter(row.fare_bucket for row in open_shards)
+
+    for shard_id, fare_bucket in open_shards:
+        claimed = (
+            db.query(models.SeatInventory)
+            .filter(
+                models.SeatInventory.id == shard_id,
+                models.SeatInventory.seats_available > 0,
+            )
+            .update(
+                {models.SeatInventory.seats_available: models.SeatInventory.seats_available - 1},
+                synchronize_session=False,
+            )
+        )
+        if claimed:
+            if open_per_bucket[fare_bucket] == 1:
+                # possibly the bucket's last seat: the listed price moves up a bucket
+                mark_prices_stale([flight_id])
+            return fare_bucket
+        open_per_bucket[fare_bucket] -= 1
+
+    raise ValueError("Flight is sold out")
 
 
 # ============================================================
 # CREATE BOOKING
 # ============================================================
-def create_booking(db: Session, passenger_name: str, flight_id: int, user_id: int = None, ip_address: str = None):
-    flight = get_flight_by_id(db, flight_id)
-    if not flight:
-        raise ValueError("Flight not found")
+def _check_not_departed(flight: models.Flight):
+    # undated legacy routes have no departure to check
+    if flight.departure_at is not None and flight.departure_at < datetime.utcnow():
+        raise ValueError("Flight has departed")
+
+
+def _seat_price(db: Session, flight: models.Flight, fare_bucket: str) -> float:
+    return compute_dynamic_price(db, flight, fare_bucket)
+
+
+def _claim_seat(db: Session, flight_id: int, seat_number: str):
+    """
+    Insert the seat's assignment row. Holds and bookings both go through
+    here, so the unique key decides any race between them; the caller's
+    rollback undoes the claim if the unit of work fails later.
+    """
+    db.add(models.SeatAssignment(flight_id=flight_id, seat_number=seat_number))
+    try:
+        db.flush()
+    except IntegrityError:
+        raise ValueError("Seat already taken")
+
+
+def _free_seats(db: Session, seats):
+    """Delete the assignments of (flight_id, seat_number) pairs; None seats are skipped."""
+    by_flight = defaultdict(list)
+    for flight_id, seat_number in seats:
+        if seat_number:
+            by_flight[flight_id].append(seat_number)
+
+    for flight_id, seat_numbers in by_flight.items():
+        db.query(models.SeatAssignment).filter(
+            models.SeatAssignment.flight_id == flight_id,
+            models.SeatAssignment.seat_number.in_(seat_numbers),
+        ).delete(synchronize_session=False)
+
 
-    # update surge and compute price
+def _booking_time() -> datetime:
+    """
+    UTC like every other timestamp, in whole seconds: MySQL DATETIME
+    drops the fraction, and the ticket digest taken now must match the
+    one taken from the stored row at download.
+    """
+    return datetime.utcnow().replace(microsecond=0)
+
+
+def _debit_wallet(db: Session, user_id: int, amount: float, reference: str = None):
+    """Charge a booking to the wallet ledger (atomic check-and-debit)."""
+    post_wallet_entry(db, user_id, -to_minor(amount), "booking", reference=reference)
+
+
+_PNR_ATTEMPTS = 3
+
+
+def _retry_pnr_clash(book, *args):
+    """
+    Run a booking unit of work, again with a fresh PNR if the unique
+    index rejected the one it drew (two allocators on one worker id).
+    The failed attempt was rolled back whole, so a retry is safe.
+    """
+    for attempt in range(_PNR_ATTEMPTS):
+        try:
+            return book(*args)
+        except IntegrityError as e:
+            if attempt == _PNR_ATTEMPTS - 1 or "pnr" not in str(e.orig).lower():
+                raise
+
+
+def create_booking(
+    db: Session,
+    passenger_name: str,
+    flight_id: int,
+    user_id: int = None,
+    ip_address: str = None,
+    seat_number: str = None,
+    idempotency_key: str = None,
+):
+    """
+    One unit of work, one commit:
+      SELECT flight → claim seat → conditional wallet UPDATE
+      → INSERT booking → COMMIT.
+    Any failure rolls back everything, so a wallet is never debited
+    without its booking and a seat is never lost.
+
+    With an idempotency key the key is committed on the booking row
+    (unique per user), so a retry gets the booking it already made back
+    instead of a second charge; reusing the key for a different
+    flight or passenger is a ValueError.
+    """
+    try:
+        if idempotency_key:
+            booked = _booking_for_key(db, user_id, idempotency_key, flight_id, passenger_name)
+            if booked is not None:
+                return booked
+
+        flight = get_flight_by_id(db, flight_id)
+        if not flight:
+            raise ValueError("Flight not found")
+        _check_not_departed(flight)
+
+        if seat_number:
+            seat_number = validate_seat(seat_number, flight.capacity or settings.DEFAULT_FLIGHT_CAPACITY)
+    except Exception:
+        db.rollback()
+        raise
+
+    # update surge (in memory, no DB writes): once per request, not per PNR retry
     _update_attempt_state(db, flight)
-    final_price = compute_dynamic_price(db, flight)
 
-    # User wallet deduction
-    if user_id:
-        user = db.query(models.User).filter(models.User.id == user_id).with_for_update().first()
+    try:
+        return _retry_pnr_clash(
+            _create_booking, db, flight, passenger_name, user_id, ip_address, seat_number, idempotency_key,
+        )
+    except IntegrityError as e:
+        if not idempotency_key or "idempotency" not in str(e.orig).lower():
+            raise
+
+    # a concurrent retry with the same key committed first
+    return _booking_for_key(db, user_id, idempotency_key, flight_id, passenger_name)
+
+
+def _booking_for_key(db: Session, user_id: int, idempotency_key: str, flight_id: int, passenger_name: str):
+    """The booking this key already made (flight loaded), or None."""
+    booking = (
+        db.query(models.Booking)
+        .options(joinedload(models.Booking.flight))
+        .filter(models.Booking.user_id == user_id, models.Booking.idempotency_key == idempotency_key)
+        .first()
+    )
+    if booking is not None and (booking.flight_id, booking.passenger_name) != (flight_id, passenger_name):
+        raise ValueError("Idempotency-Key was already used with a different booking")
+    return booking
+
+
+def _create_booking(db, flight, passenger_name, user_id, ip_address, seat_number, idempotency_key):
+    try:
+        if seat_number:
+            _claim_seat(db, flight.id, seat_number)
+
+        # claim inventory first: sold-out flights fail before touching the wallet
+        fare_bucket = reserve_seat(db, flight.id)
+        final_price = _seat_price(db, flight, fare_bucket)
+
+        # Unique PNR without probing the table (unique index is the backstop)
+        pnr = next_pnr()
+
+        if user_id:
+            _debit_wallet(db, user_id, final_price, reference=pnr)
+
+        booking = models.Booking(
+            pnr=pnr,
+            passenger_name=passenger_name,
+            flight_id=flight.id,
+            user_id=user_id,
+            final_price=final_price,
+            booking_time=_booking_time(),  # set here so no refresh is needed
+            fare_bucket=fare_bucket,
+            seat_number=seat_number,
+            idempotency_key=idempotency_key,
+        )
+
+        db.add(booking)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if "seat" in str(e.orig).lower():
+            raise ValueError("Seat already taken")
+        raise
+    except Exception:
+        db.rollback()
+        raise
+
+    # loaded here so serialization never lazy-loads (async sessions can't)
+    booking.flight = flight
+    return booking
+
+
+# ============================================================
+# SEAT HOLDS (hold → confirm, expired holds swept back)
+# ============================================================
+def create_hold(db: Session, passenger_name: str, flight_id: int, user_id: int, seat_number: str = None):
+    """
+    Phase one: take a seat out of inventory and lock its price for
+    HOLD_TTL_SECONDS. The wallet is only checked here, debited on confirm.
+    """
+    try:
+        flight = get_flight_by_id(db, flight_id)
+        if not flight:
+            raise ValueError("Flight not found")
+        _check_not_departed(flight)
+
+        user = get_user_by_id(db, user_id)
         if not user:
-            raise ValueError("User not found")
-        if user.wallet_balance < final_price:
+            raise PermissionError("Invalid user. Please login again.")
+
+        if seat_number:
+            seat_number = validate_seat(seat_number, flight.capacity or settings.DEFAULT_FLIGHT_CAPACITY)
+            _claim_seat(db, flight.id, seat_number)
+
+        _update_attempt_state(db, flight)
+
+        fare_bucket = reserve_seat(db, flight.id)
+        price = _seat_price(db, flight, fare_bucket)
+        if user.wallet_balance_minor < to_minor(price):
             raise ValueError("Insufficient wallet balance")
 
-        user.wallet_balance -= final_price
+        now = datetime.utcnow()
+        hold = models.SeatHold(
+            flight_id=flight.id,
+            user_id=user_id,
+            passenger_name=passenger_name,
+            fare_bucket=fare_bucket,
+            seat_number=seat_number,
+            price=price,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.HOLD_TTL_SECONDS),
+        )
+        db.add(hold)
         db.commit()
-        db.refresh(user)
+    except IntegrityError as e:
+        db.rollback()
+        if "seat" in str(e.orig).lower():
+            raise ValueError("Seat already taken")
+        raise
+    except Exception:
+        db.rollback()
+        raise
 
-    # Generate unique PNR
-    def new_pnr():
-        return f"PNR{random.randint(100000, 999999)}"
+    hold.flight = flight
+    return hold
 
-    pnr = new_pnr()
-    while db.query(models.Booking).filter_by(pnr=pnr).first():
-        pnr = new_pnr()
 
-    booking = models.Booking(
-        pnr=pnr,
-        passenger_name=passenger_name,
-        flight_id=flight.id,
+def confirm_hold(db: Session, hold_id: int, user_id: int):
+    """
+    Phase two: turn a live hold into a booking at the held price.
+    Deleting the hold with `expires_at > now` is the claim, so a hold
+    can be confirmed or swept, never both.
+    """
+    return _retry_pnr_clash(_confirm_hold, db, hold_id, user_id)
+
+
+def _confirm_hold(db, hold_id, user_id):
+    try:
+        hold = (
+            db.query(models.SeatHold)
+            .filter(models.SeatHold.id == hold_id, models.SeatHold.user_id == user_id)
+            .first()
+        )
+        if not hold:
+            raise ValueError("Hold not found or already expired")
+
+        claimed = (
+            db.query(models.SeatHold)
+            .filter(models.SeatHold.id == hold.id, models.SeatHold.expires_at > datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        if not claimed:
+            raise ValueError("Hold has expired")
+
+        pnr = next_pnr()
+        _debit_wallet(db, user_id, hold.price, reference=pnr)
+
+        booking = models.Booking(
+            pnr=pnr,
+            passenger_name=hold.passenger_name,
+            flight_id=hold.flight_id,
+            user_id=user_id,
+            final_price=hold.price,
+            booking_time=_booking_time(),
+            fare_bucket=hold.fare_bucket,
+            seat_number=hold.seat_number,
+        )
+        flight = get_flight_by_id(db, hold.flight_id)
+
+        db.add(booking)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if "seat" in str(e.orig).lower():
+            raise ValueError("Seat already taken")
+        raise
+    except Exception:
+        db.rollback()
+        raise
+
+    booking.flight = flight
+    return booking
+
+
+def release_hold(db: Session, hold_id: int, user_id: int) -> bool:
+    """Cancel a hold early; its seat goes straight back to inventory."""
+    try:
+        hold = (
+            db.query(models.SeatHold)
+            .filter(models.SeatHold.id == hold_id, models.SeatHold.user_id == user_id)
+            .first()
+        )
+        if not hold:
+            return False
+
+        # conditional delete: the sweeper may have got there first
+        deleted = (
+            db.query(models.SeatHold)
+            .filter(models.SeatHold.id == hold.id)
+            .delete(synchronize_session=False)
+        )
+        if not deleted:
+            db.rollback()
+            return False
+
+        _release_seats(db, Counter([(hold.flight_id, hold.fare_bucket)]))
+        _free_seats(db, [(hold.flight_id, hold.seat_number)])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+
+def _release_seats(db: Session, counts: Counter):
+    """Return seats to inventory; `counts` maps (flight_id, fare_bucket) → seats."""
+    if not counts:
+        return
+
+    flight_ids = {flight_id for flight_id, _ in counts}
+    shards = defaultdict(list)
+    for shard_id, flight_id, fare_bucket in (
+        db.query(models.SeatInventory.id, models.SeatInventory.flight_id, models.SeatInventory.fare_bucket)
+        .filter(models.SeatInventory.flight_id.in_(flight_ids))
+        .all()
+    ):
+        shards[(flight_id, fare_bucket)].append(shard_id)
+
+    for key, seats in counts.items():
+        if not shards.get(key):
+            continue
+        db.query(models.SeatInventory).filter(
+            models.SeatInventory.id == random.choice(shards[key])
+        ).update(
+            {models.SeatInventory.seats_available: models.SeatInventory.seats_available + seats},
+            synchronize_session=False,
+        )
+
+    # a cheaper bucket may have reopened
+    mark_prices_stale(flight_ids)
+
+
+def expire_holds(db: Session, now: datetime = None, batch_size: int = None) -> int:
+    """
+    Sweep expired holds in batches of `batch_size`, oldest first.
+
+    Each batch is one range read on ix_seat_holds_expires, so the cost
+    tracks the number of expired holds, not the number outstanding.
+    Rows being confirmed right now are locked and skipped. Every
+    expired hold counts as a booking attempt for surge.
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or settings.HOLD_SWEEP_BATCH
+    surge = get_surge_engine()
+    expired = 0
+
+    while True:
+        try:
+            rows = (
+                db.query(
+                    models.SeatHold.id, models.SeatHold.flight_id, models.SeatHold.fare_bucket, models.SeatHold.seat_number,
+                )
+                .filter(models.SeatHold.expires_at <= now)
+                .order_by(models.SeatHold.expires_at, models.SeatHold.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                break
+
+            db.query(models.SeatHold).filter(
+                models.SeatHold.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            _release_seats(db, Counter((row.flight_id, row.fare_bucket) for row in rows))
+            _free_seats(db, [(row.flight_id, row.seat_number) for row in rows])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # abandoned holds are still demand: feed them to the surge window
+        for row in rows:
+            surge.record_attempt(row.flight_id, now)
+
+        expired += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    return expired
+
+
+def get_booking_by_pnr(db: Session, pnr: str):
+    return (
+        db.query(models.Booking)
+        .options(joinedload(models.Booking.flight))
+        .filter(models.Booking.pnr == pnr)
+        .first()
+    )
+
+
+def _filter_ticket_bookings(query, flight_id: int = None, date_from=None, date_to=None):
+    if flight_id:
+        query = query.filter(models.Booking.flight_id == flight_id)
+    if date_from:
+        query = query.filter(models.Booking.booking_time >= date_from)
+    if date_to:
+        query = query.filter(models.Booking.booking_time < date_to)
+    return query
+
+
+def iter_ticket_rows(db: Session, flight_id: int = None, date_from=None, date_to=None, batch_size: int = 500):
+    """
+    Streams the printed ticket fields for many bookings as row tuples
+    (one joined query, fetched `batch_size` rows at a time).
+    """
+    query = (
+        db.query(
+            models.Booking.pnr,
+            models.Booking.passenger_name,
+            models.Booking.booking_time,
+            models.Booking.final_price,
+            models.Flight.flight_id,
+            models.Flight.departure_city,
+            models.Flight.arrival_city,
+        )
+        .join(models.Flight, models.Booking.flight_id == models.Flight.id)
+    )
+    query = _filter_ticket_bookings(query, flight_id, date_from, date_to)
+
+    return query.order_by(models.Booking.booking_time, models.Booking.id).yield_per(batch_size)
+
+
+def count_ticket_rows(db: Session, flight_id: int = None, date_from=None, date_to=None) -> int:
+    """Number of rows iter_ticket_rows would stream for the same filters."""
+    query = db.query(func.count(models.Booking.id))
+    return _filter_ticket_bookings(query, flight_id, date_from, date_to).scalar()
+
+
+# ============================================================
+# BOOKING HISTORY (row tuples, no ORM objects)
+# ============================================================
+_HISTORY_COLUMNS = (
+    models.Booking.id,
+    models.Booking.pnr,
+    models.Booking.passenger_name,
+    models.Booking.flight_id,
+    models.Booking.final_price,
+    models.Booking.booking_time,
+    models.Booking.user_id,
+    models.Booking.fare_bucket,
+    models.Booking.seat_number,
+    models.Flight.flight_id.label("f_code"),
+    models.Flight.airline.label("f_airline"),
+    models.Flight.departure_city.label("f_departure_city"),
+    models.Flight.arrival_city.label("f_arrival_city"),
+    models.Flight.base_price.label("f_base_price"),
+    models.Flight.departure_at.label("f_departure_at"),
+    models.Flight.arrival_at.label("f_arrival_at"),
+    models.FlightPrice.price.label("f_price"),
+    models.FlightPrice.surge_expires_at.label("f_surge_expires_at"),
+)
+
+
+def get_booking_history(db: Session, user_id: int, limit: int = None, cursor: str = None):
+    """
+    A user's bookings, newest first, as plain dicts shaped like
+    BookingOut; returns (bookings, next_cursor) keyed on (booking_time,
+    id). Bookings, flights and snapshot prices come back as row tuples
+    from one joined query, with no ORM objects built.
+    """
+    if limit is None:
+        limit = settings.DEFAULT_PAGE_LIMIT
+
+    query = (
+        db.query(*_HISTORY_COLUMNS)
+        .outerjoin(models.Flight, models.Flight.id == models.Booking.flight_id)
+        .outerjoin(models.FlightPrice, models.FlightPrice.flight_id == models.Booking.flight_id)
+        .filter(models.Booking.user_id == user_id)
+    )
+
+    rows, next_cursor = keyset_page(
+        query,
+        [models.Booking.booking_time, models.Booking.id],
+        limit,
+        cursor,
+        descending=True,
+    )
+
+    # flights without a snapshot row yet: price live, queue for the refresher
+    missing = {
+        r.flight_id: SimpleNamespace(id=r.flight_id, base_price=r.f_base_price, departure_at=r.f_departure_at)
+        for r in rows if r.f_code is not None and r.f_price is None
+    }
+    buckets = current_fare_buckets(db, missing)
+    live = dict(zip(missing, get_pricing_engine().snapshot_many(list(missing.values()), fare_buckets=buckets)))
+    if missing:
+        mark_prices_stale(live.keys())
+
+    out = []
+    for r in rows:
+        flight = None
+        if r.f_code is not None:
+            price, surge_expires_at = (
+                (r.f_price, r.f_surge_expires_at) if r.f_price is not None
+                else live[r.flight_id][:2]
+            )
+            flight = {
+                "id": r.flight_id,
+                "flight_id": r.f_code,
+                "airline": r.f_airline,
+                "departure_city": r.f_departure_city,
+                "arrival_city": r.f_arrival_city,
+                "base_price": r.f_base_price,
+                "departure_at": r.f_departure_at,
+                "arrival_at": r.f_arrival_at,
+                "price": round(price, 2),
+                "surge_active": surge_expires_at is not None,
+                "surge_expires_at": surge_expires_at,
+            }
+
+        out.append({
+            "id": r.id,
+            "pnr": r.pnr,
+            "passenger_name": r.passenger_name,
+            "flight_id": r.flight_id,
+            "final_price": r.final_price,
+            "booking_time": r.booking_time,
+            "user_id": r.user_id,
+            "fare_bucket": r.fare_bucket,
+            "seat_number": r.seat_number,
+            "flight": flight,
+        })
+
+    return out, next_cursor
+
+
+# ============================================================
+# USERS
+# ============================================================
+def get_user_by_id(db: Session, user_id: int):
+    return db.query(models.User).filter(models.User.id == user_id).first()
+
+
+def get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def get_user_by_username(db: Session, username: str):
+    return db.query(models.User).filter(models.User.username == username).first()
+
+
+def create_user(db: Session, username: str, email: str, password_hash: str, full_name: str = None):
+    user = models.User(
+        username=username,
+        email=email,
+        full_name=full_name,
+        password_hash=password_hash,
+    )
+
+    try:
+        db.add(user)
+        db.flush()
+        post_wallet_entry(db, user.id, to_minor(settings.DEFAULT_WALLET_BALANCE), "opening")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    db.refresh(user)
+    return user
+
+
+def update_password_hash(db: Session, user_id: int, password_hash: str):
+    user = get_user_by_id(db, user_id)
+    user.password_hash = password_hash
+    db.commit()
+    return user
+
+
+def top_up_wallet(db: Session, user_id: int, amount: float, idempotency_key: str = None):
+    """
+    Credit the wallet. With an idempotency key, a retried top-up finds
+    its ledger entry and changes nothing; reusing the key for a
+    different amount is a ValueError. Returns None for unknown users.
+    """
+    amount_minor = to_minor(amount)
+    try:
+        if idempotency_key and _check_top_up_key(db, user_id, idempotency_key, amount_minor):
+            return get_user_by_id(db, user_id)
+
+        post_wallet_entry(db, user_id, amount_minor, "topup", idempotency_key=idempotency_key)
+        db.commit()
+    except PermissionError:
+        db.rollback()
+        return None
+    except IntegrityError:
+        # concurrent retry with the same key won the insert: already applied
+        db.rollback()
+        if not idempotency_key:
+            raise
+        _check_top_up_key(db, user_id, idempotency_key, amount_minor)
+    except Exception:
+        db.rollback()
+        raise
+
+    return get_user_by_id(db, user_id)
+
+
+def get_users(db: Session, limit: int = None, cursor: str = None):
+    """Newest first; returns (users, next_cursor) keyed on (created_at, id)."""
+    if limit is None:
+        limit = settings.DEFAULT_PAGE_LIMIT
+
+    return keyset_page(
+        db.query(models.User),
+        [models.User.created_at, models.User.id],
+        limit,
+        cursor,
+        descending=True,
+    )
+
+
+# ============================================================
+# WALLET LEDGER
+# ============================================================
+def post_wallet_entry(
+    db: Session,
+    user_id: int,
+    amount_minor: int,
+    kind: str,
+    reference: str = None,
+    idempotency_key: str = None,
+) -> models.WalletEntry:
+    """
+    Append a ledger entry and move the cached balance with it, in the
+    caller's transaction (caller commits).
+
+    The balance changes by `UPDATE ... SET balance = balance + ?` (debits
+    also require enough funds), so concurrent writers serialize on the
+    user row and no update is lost. The cached balance is the snapshot:
+    reads stay O(1), and each entry records the balance after it.
+    """
+    balance = models.User.wallet_balance_minor
+    q = db.query(models.User).filter(models.User.id == user_id)
+    if amount_minor < 0:
+        q = q.filter(balance >= -amount_minor)
+
+    if not q.update({balance: balance + amount_minor}, synchronize_session=False):
+        # failure path only: find out why
+        if not get_user_by_id(db, user_id):
+            raise PermissionError("Invalid user. Please login again.")
+        raise ValueError("Insufficient wallet balance")
+
+    # our own row lock is held, so this is exactly the balance we produced
+    balance_after = db.query(balance).filter(models.User.id == user_id).scalar()
+
+    entry = models.WalletEntry(
         user_id=user_id,
-        final_price=round(final_price, 2)
+        kind=kind,
+        amount_minor=amount_minor,
+        balance_after_minor=balance_after,
+        reference=reference,
+        idempotency_key=idempotency_key,
+        created_at=datetime.utcnow(),
     )
+    db.add(entry)
+    db.flush()
+    return entry
 
-    db.add(booking)
+
+def _check_top_up_key(db: Session, user_id: int, idempotency_key: str, amount_minor: int) -> bool:
+    """True if this key's top-up is already in the ledger (same amount)."""
+    applied = (
+        db.query(models.WalletEntry.amount_minor)
+        .filter(
+            models.WalletEntry.user_id == user_id,
+            models.WalletEntry.idempotency_key == idempotency_key,
+        )
+        .scalar()
+    )
+    if applied is not None and applied != amount_minor:
+        raise ValueError("Idempotency-Key was already used with a different amount")
+    return applied is not None
+
+
+def get_wallet_entries(db: Session, user_id: int, limit: int = None, cursor: str = None):
+    """Newest first; returns (entries, next_cursor)."""
+    if limit is None:
+        limit = settings.DEFAULT_PAGE_LIMIT
+
+    return keyset_page(
+        db.query(models.WalletEntry).filter(models.WalletEntry.user_id == user_id),
+        [models.WalletEntry.id],
+        limit,
+        cursor,
+        descending=True,
+    )
+
+
+# ============================================================
+# IDEMPOTENCY KEYS
+# ============================================================
+def _idempotency_query(db: Session, scope: str, key: str):
+    return db.query(models.IdempotencyKey).filter(
+        models.IdempotencyKey.scope == scope,
+        models.IdempotencyKey.key == key,
+    )
+
+
+def claim_idempotency_key(db: Session, scope: str, key: str, fingerprint: str):
+    """
+    Returns the existing record for a retry (finished, or still in
+    progress when status_code is None), or None once this request owns
+    the key. Expired records are replaced.
+    """
+    now = datetime.utcnow()
+    record = _idempotency_query(db, scope, key).first()
+
+    if record is not None and record.expires_at <= now:
+        _idempotency_query(db, scope, key).filter(
+            models.IdempotencyKey.expires_at <= now
+        ).delete(synchronize_session=False)
+        record = None
+
+    if record is not None:
+        if record.fingerprint != fingerprint:
+            raise ValueError("Idempotency-Key was already used with a different request")
+        return record
+
+    db.add(models.IdempotencyKey(
+        scope=scope,
+        key=key,
+        fingerprint=fingerprint,
+        created_at=now,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # a concurrent request with the same key claimed it first
+        db.rollback()
+        return claim_idempotency_key(db, scope, key, fingerprint)
+    return None
+
+
+def complete_idempotency_key(db: Session, scope: str, key: str, status_code: int, response_body: str):
+    _idempotency_query(db, scope, key).update(
+        {
+            models.IdempotencyKey.status_code: status_code,
+            models.IdempotencyKey.response_body: response_body,
+            models.IdempotencyKey.expires_at: datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def release_idempotency_key(db: Session, scope: str, key: str):
+    """Failed request: drop the claim so the client can retry with the same key."""
+    db.rollback()
+    _idempotency_query(db, scope, key).filter(
+        models.IdempotencyKey.status_code.is_(None)
+    ).delete(synchronize_session=False)
     db.commit()
-    db.refresh(booking)
-    return booking
+
+
+def expire_idempotency_keys(db: Session, now: datetime = None, batch_size: int = 1000) -> int:
+    """Delete expired records in batches, oldest first, via ix_idempotency_expires."""
+    now = now or datetime.utcnow()
+    deleted = 0
+
+    while True:
+        ids = [
+            row.id
+            for row in db.query(models.IdempotencyKey.id)
+            .filter(models.IdempotencyKey.expires_at <= now)
+            .order_by(models.IdempotencyKey.expires_at, models.IdempotencyKey.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not ids:
+            break
+
+        db.query(models.IdempotencyKey).filter(
+            models.IdempotencyKey.id.in_(ids),
+            models.IdempotencyKey.expires_at <= now,
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    return deleted
 
 
 # ============================================================
-# GET USER BOOKINGS
-# IMPORTANT: RETURN ORM OBJECTS (NOT DICTS)
+# PNR WORKER LEASES
 # ============================================================
-def get_bookings(db: Session, user_id: int = None):
-    query = db.query(models.Booking).order_by(models.Booking.booking_time.desc())
+def lease_pnr_worker(db: Session, holder: str, now: datetime = None) -> int:
+    """
+    Renew `holder`'s worker id, or lease one no live process holds: a
+    never-used id first, else the longest-expired. Each claim is an
+    INSERT on the primary key or a conditional UPDATE, so two processes
+    can't win the same id. Raises RuntimeError when every id is held.
+    """
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=settings.PNR_LEASE_SECONDS)
+    Lease = models.PNRWorkerLease
+
+    for _ in range(5):
+        own = db.query(Lease.worker_id).filter(Lease.holder == holder, Lease.expires_at > now).first()
+        if own and db.query(Lease).filter(Lease.worker_id == own.worker_id, Lease.holder == holder).update(
+            {Lease.expires_at: expires_at}, synchronize_session=False
+        ):
+            db.commit()
+            return own.worker_id
+
+        leases = db.query(Lease.worker_id, Lease.expires_at).all()   # at most 2**WORKER_BITS rows
+        used = {lease.worker_id for lease in leases}
+        free = next((wid for wid in range(1 << WORKER_BITS) if wid not in used), None)
 
-    if user_id:
-        query = query.filter(models.Booking.user_id == user_id)
+        if free is not None:
+            db.add(Lease(worker_id=free, holder=holder, expires_at=expires_at))
+            try:
+                db.commit()
+                return free
+            except IntegrityError:
+                db.rollback()   # another process took it first
+                continue
 
-    bookings = query.all()
+        for lease in sorted((l for l in leases if l.expires_at <= now), key=lambda l: l.expires_at):
+            claimed = (
+                db.query(Lease)
+                .filter(Lease.worker_id == lease.worker_id, Lease.expires_at <= now)
+                .update({Lease.holder: holder, Lease.expires_at: expires_at}, synchronize_session=False)
+            )
+            if claimed:
+                db.commit()
+                return lease.worker_id
+        db.rollback()
+        raise RuntimeError("All PNR worker ids are leased")
 
-    # RETURN RAW ORM → FastAPI + Pydantic will serialize nested Flight automatically.
-    return bookings
+    raise RuntimeError("Could not lease a PNR worker id")
+
+
+def release_pnr_worker(db: Session, holder: str, now: datetime = None):
+    """Shutdown: let the id go after a short grace (its last second of PNRs)."""
+    now = now or datetime.utcnow()
+    db.query(models.PNRWorkerLease).filter(models.PNRWorkerLease.holder == holder).update(
+        {models.PNRWorkerLease.expires_at: now + timedelta(seconds=2)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+# ============================================================
+# FLIGHT SCHEDULE (dated instances)
+# ============================================================
+def schedule_flights(routes, days: int = None, start: date = None):
+    """
+    Daily instances of (flight_id, airline, from, to, base_price) routes
+    for `days` days from `start` (default tomorrow, UTC), as rows for
+    import_flight_rows. Each route departs at its own hour.
+    """
+    days = settings.FLIGHT_SEED_DAYS if days is None else days
+    start = start or datetime.utcnow().date() + timedelta(days=1)
+
+    rows = []
+    for day in range(days):
+        for i, (code, airline, dep, arr, price) in enumerate(routes):
+            departure_at = datetime.combine(start + timedelta(days=day), time(6 + i % 16))
+            rows.append({
+                "flight_id": code,
+                "airline": airline,
+                "departure_city": dep,
+                "arrival_city": arr,
+                "base_price": price,
+                "departure_at": departure_at,
+                "arrival_at": departure_at + timedelta(hours=2),
+                "capacity": settings.DEFAULT_FLIGHT_CAPACITY,
+            })
+    return rows
+
+
+def prune_flight_instances(db: Session, now: datetime = None, batch_size: int = 500) -> int:
+    """
+    Delete instances that departed more than FLIGHT_RETENTION_DAYS ago
+    and were never booked, with their inventory, holds, prices and
+    surge rows. Walks ix_flights_departure oldest first, so each batch
+    is an index range scan no matter how many years of schedule exist.
+    """
+    if settings.FLIGHT_RETENTION_DAYS <= 0:
+        return 0
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=settings.FLIGHT_RETENTION_DAYS)
+    booked = exists().where(models.Booking.flight_id == models.Flight.id)
+    deleted = 0
+    last = None   # (departure_at, id) of the previous batch; booked flights stay behind it
+
+    while True:
+        query = db.query(models.Flight.id, models.Flight.departure_at).filter(models.Flight.departure_at < cutoff)
+        if last:
+            query = query.filter(
+                (models.Flight.departure_at > last[0])
+                | ((models.Flight.departure_at == last[0]) & (models.Flight.id > last[1]))
+            )
+        rows = query.order_by(models.Flight.departure_at, models.Flight.id).limit(batch_size).all()
+        if not rows:
+            break
+        last = (rows[-1].departure_at, rows[-1].id)
+
+        ids = [
+            row.id
+            for row in db.query(models.Flight.id)
+            .filter(models.Flight.id.in_([r.id for r in rows]), ~booked)
+            .all()
+        ]
+        if ids:
+            # explicit child deletes: ON DELETE CASCADE isn't enforced everywhere (SQLite)
+            for child in (models.SeatInventory, models.SeatHold, models.SeatAssignment, models.FlightPrice, models.FlightAttempt):
+                db.query(child).filter(child.flight_id.in_(ids)).delete(synchronize_session=False)
+            db.query(models.Flight).filter(models.Flight.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            invalidate_flights(ids)
+            get_route_graph().remove(ids)
+            deleted += len(ids)
+
+        if len(rows) < batch_size:
+            break
+
+    return deleted
+
+
+# ============================================================
+# BULK CATALOG IMPORT
+# ============================================================
+def _upsert(db: Session, table, rows, keys, update):
+    """Multi-row INSERT that overwrites `update` columns where `keys` already exist."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+
+        stmt = dialect_insert(table)
+        stmt = stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in update})
+    else:
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            raise RuntimeError(f"Upsert is not supported on {dialect}")
+
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=keys, set_={col: stmt.excluded[col] for col in update})
+
+    db.execute(stmt, rows)
+
+
+# capacity is not updated: existing instances keep their seat counters
+_FLIGHT_UPSERT_COLUMNS = (
+    "airline", "departure_city", "arrival_city", "departure_city_id",
+    "arrival_city_id", "base_price", "arrival_at",
+)
+_PRICE_UPSERT_COLUMNS = ("price", "surge_active", "surge_expires_at", "refresh_at", "updated_at")
+
+
+def import_flight_rows(db: Session, rows, city_cache: dict = None) -> int:
+    """
+    Upsert one chunk of schedule rows keyed on (flight_id, departure_at)
+    with a single multi-row statement, then give new instances seat
+    inventory and upsert every instance's price snapshot (commits).
+    """
+    if not rows:
+        return 0
+    city_cache = {} if city_cache is None else city_cache
+
+    for row in rows:
+        row["departure_city_id"] = get_or_create_city(db, row["departure_city"], city_cache).id
+        row["arrival_city_id"] = get_or_create_city(db, row["arrival_city"], city_cache).id
+
+    try:
+        _upsert(db, models.Flight.__table__, rows, ["flight_id", "departure_at"], _FLIGHT_UPSERT_COLUMNS)
+
+        keys = {(r["flight_id"], r["departure_at"]) for r in rows}
+        F = models.Flight
+        flights = [
+            f for f in db.query(
+                F.id, F.flight_id, F.airline, F.departure_city, F.arrival_city,
+                F.departure_city_id, F.arrival_city_id, F.base_price,
+                F.departure_at, F.arrival_at, F.capacity,
+            )
+            .filter(
+                F.flight_id.in_({k[0] for k in keys}),
+                F.departure_at.between(min(k[1] for k in keys), max(k[1] for k in keys)),
+            )
+            if (f.flight_id, f.departure_at) in keys
+        ]
+        ids = [f.id for f in flights]
+
+        stocked = {
+            r.flight_id
+            for r in db.query(models.SeatInventory.flight_id)
+            .filter(models.SeatInventory.flight_id.in_(ids))
+            .distinct()
+        }
+        fresh = [f for f in flights if f.id not in stocked]
+        create_seat_inventory(db, fresh)
+
+        # new counters are full, so only re-imported instances need reading back
+        now = datetime.utcnow()
+        buckets = current_fare_buckets(db, stocked)
+        for f in fresh:
+            bucket = opening_bucket(f.capacity or settings.DEFAULT_FLIGHT_CAPACITY)
+            if bucket:
+                buckets[f.id] = bucket
+        _upsert(db, models.FlightPrice.__table__, [
+            {
+                "flight_id": f.id,
+                "price": snap.price,
+                "surge_active": snap.surge_expires_at is not None,
+                "surge_expires_at": snap.surge_expires_at,
+                "refresh_at": snap.refresh_at,
+                "updated_at": now,
+            }
+            for f, snap in zip(flights, get_pricing_engine().snapshot_many(flights, now, buckets))
+        ], ["flight_id"], _PRICE_UPSERT_COLUMNS)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    invalidate_flights(ids)
+    get_route_graph().add(flights)
+    return len(flights)
+
+
+def import_flights(db: Session, stream, fmt: str, rejects=None, chunk_size: int = None, progress=None) -> dict:
+    """
+    Stream a CSV / JSON-lines schedule into the catalog in chunks of
+    `chunk_size` rows, one upsert + commit per chunk, so memory stays
+    constant. Bad rows go to `rejects` (JSON lines) and the import
+    continues; `progress(stats)` is called after every chunk. A database
+    error stops the import with earlier chunks already committed.
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    started = perf_counter()
+    stats = {"rows": 0, "rejected": 0, "chunks": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+    city_cache = {}
+    chunk = []
+
+    def flush():
+        import_flight_rows(db, chunk, city_cache)
+        stats["rows"] += len(chunk)
+        stats["chunks"] += 1
+        stats["seconds"] = round(perf_counter() - started, 3)
+        stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+        chunk.clear()
+        if progress:
+            progress(stats)
+
+    try:
+        for line_no, raw, row, error in parse_stream(stream, fmt):
+            if error:
+                stats["rejected"] += 1
+                if rejects is not None:
+                    write_reject(rejects, line_no, raw, error)
+                continue
+
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                flush()
+
+        if chunk:
+            flush()
+    finally:
+        if stats["rows"]:
+            invalidate_catalog()
+
+    stats["seconds"] = round(perf_counter() - started, 3)
+    return stats
 
 
 # ============================================================
@@ -194,14 +1709,6 @@ def seed_flights(db: Session):
         ("UK-505", "Vistara", "Hyderabad", "Delhi", 2300),
     ]
 
-    for s in sample:
-        db.add(models.Flight(
-            flight_id=s[0],
-            airline=s[1],
-            departure_city=s[2],
-            arrival_city=s[3],
-            base_price=s[4]
-        ))
-
-    db.commit()
-    return len(sample)
+    count = import_flight_rows(db, schedule_flights(sample))
+    invalidate_catalog()
+    return count
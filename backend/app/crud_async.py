@@ -0,0 +1,119 @@
+# backend/app/crud_async.py
+#
+# Awaitable versions of the crud functions for `async def` routes.
+#
+# Each wrapper accepts either session type from `get_session`:
+# - AsyncSession → runs the crud function via `run_sync` on the async
+#   driver, so no threadpool worker is held during the DB round trip.
+# - Session (sync mode) → runs it in the threadpool, same as a sync route.
+# Long jobs (`_threadpool`) always run in the threadpool on a sync
+# Session, whichever session type the route got.
+#
+# Read-only calls (`_read`) are served by a replica when DB_REPLICA_URLS
+# is set, unless the client wrote recently; writes (`_write`) stamp the
+# response with the write time (db_routing), and requests carrying a
+# stamp younger than DB_STICKY_SECONDS read from the primary.
+#
+# The query logic itself stays in crud.py.
+
+from functools import wraps
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from . import crud
+from .database import SessionLocal
+from .utils.db_routing import note_write, reads_need_primary, use_replica
+
+
+def _async(fn):
+    @wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+
+    return wrapper
+
+
+def _threadpool(fn):
+    """
+    Long-running jobs (bulk import): always a threadpool worker with a
+    sync Session, so an AsyncSession's run_sync never ties up the event
+    loop for the whole job.
+    """
+
+    def run(*args, **kwargs):
+        db = SessionLocal()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    @wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await run_in_threadpool(run, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+
+    return wrapper
+
+
+def _read(fn):
+    inner = _async(fn)
+
+    @wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if reads_need_primary():
+            return await inner(db, *args, **kwargs)
+        with use_replica(db):
+            return await inner(db, *args, **kwargs)
+
+    return wrapper
+
+
+def _write(fn, run=_async):
+    """Any call that can change rows: stamps the response so the client reads its write."""
+    inner = run(fn)
+
+    @wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        result = await inner(db, *args, **kwargs)
+        note_write()
+        return result
+
+    return wrapper
+
+
+# Flights
+search_cities = _read(crud.search_cities)
+search_flights = _read(crud.search_flights)
+get_flights = _read(crud.get_flights)
+get_flight = _read(crud.get_flight)
+find_connections = _read(crud.find_connections)
+get_fare_calendar = _read(crud.get_fare_calendar)
+seed_flights = _write(crud.seed_flights)
+import_flights = _write(crud.import_flights, run=_threadpool)
+
+# Bookings
+create_booking = _write(crud.create_booking)
+get_booking_history = _read(crud.get_booking_history)
+get_booking_by_pnr = _async(crud.get_booking_by_pnr)
+create_hold = _write(crud.create_hold)
+confirm_hold = _write(crud.confirm_hold)
+release_hold = _write(crud.release_hold)
+
+# Users
+get_user_by_id = _async(crud.get_user_by_id)
+get_user_by_email = _async(crud.get_user_by_email)
+get_user_by_username = _async(crud.get_user_by_username)
+create_user = _write(crud.create_user)
+update_password_hash = _write(crud.update_password_hash)
+get_users = _read(crud.get_users)
+top_up_wallet = _write(crud.top_up_wallet)
+get_wallet_entries = _read(crud.get_wallet_entries)
+
+# Idempotency keys
+claim_idempotency_key = _write(crud.claim_idempotency_key)
+complete_idempotency_key = _write(crud.complete_idempotency_key)
+release_idempotency_key = _write(crud.release_idempotency_key)
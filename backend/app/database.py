@@ -1,8 +1,13 @@
 import os
 from urllib.parse import quote_plus
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .config import settings
+from .utils.db_pool import instrument_engine, pool_kwargs
+from .utils.db_routing import ReplicaSelector, RoutingSession
+
 # -----------------------------
 # READ ENVIRONMENT VARIABLES
 # -----------------------------
@@ -15,7 +20,8 @@ DB_NAME = os.getenv("DB_NAME")
 # -----------------------------
 # VALIDATION (FAIL FAST)
 # -----------------------------
-missing_vars = [
+# DATABASE_URL (full URL) takes precedence over the DB_* parts.
+missing_vars = [] if settings.DATABASE_URL else [
     name for name, value in {
         "DB_USER": DB_USER,
         "DB_PASSWORD": DB_PASSWORD,
@@ -30,38 +36,97 @@ if missing_vars:
         f"Missing required environment variables: {', '.join(missing_vars)}"
     )
 
-# -----------------------------
-# URL-ENCODE PASSWORD
-# -----------------------------
-DB_PASSWORD_ENCODED = quote_plus(DB_PASSWORD)
-
 # -----------------------------
 # CREATE DATABASE URL
 # -----------------------------
-DATABASE_URL = (
-    f"mysql+pymysql://{DB_USER}:{DB_PASSWORD_ENCODED}"
-    f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
+if settings.DATABASE_URL:
+    DATABASE_URL = settings.DATABASE_URL
+else:
+    DATABASE_URL = (
+        f"mysql+pymysql://{DB_USER}:{quote_plus(DB_PASSWORD)}"
+        f"@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+
+REPLICA_URLS = [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+
+
+def _connect_args(url: str) -> dict:
+    # pooled SQLite connections are handed between threads
+    return {"check_same_thread": False} if make_url(url).get_backend_name() == "sqlite" else {}
+
+
+def _async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = "aiosqlite" if parsed.get_backend_name() == "sqlite" else settings.DB_ASYNC_DRIVER
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
 
 # -----------------------------
-# SQLALCHEMY ENGINE
+# SQLALCHEMY ENGINES
 # -----------------------------
 engine = create_engine(
     DATABASE_URL,
     echo=False,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    connect_args=_connect_args(DATABASE_URL),
+    **pool_kwargs(),
 )
+instrument_engine(engine, "sync")
+
+replica_engines = []
+for i, url in enumerate(REPLICA_URLS):
+    replica = create_engine(url, echo=False, connect_args=_connect_args(url), **pool_kwargs())
+    instrument_engine(replica, f"replica{i}")
+    replica_engines.append(replica)
 
 # -----------------------------
 # SESSION MAKER
 # -----------------------------
+# expire_on_commit=False: objects returned by crud stay readable after
+# commit without a lazy refresh during response serialization.
+# RoutingSession: primary unless a read-only crud call opts into a replica.
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
     autocommit=False,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False,
+    bind=engine,
+    primary=engine,
+    replicas=ReplicaSelector(replica_engines) if replica_engines else None,
 )
 
+# -----------------------------
+# ASYNC ENGINE (DB_ASYNC=1)
+# -----------------------------
+# The sync engine above is always created (startup, background tasks).
+# When enabled, request handlers use the async driver instead.
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        _async_url(DATABASE_URL),
+        echo=False,
+        **pool_kwargs(is_async=True),
+    )
+    instrument_engine(async_engine, "async")
+
+    async_replicas = []
+    for i, url in enumerate(REPLICA_URLS):
+        replica = create_async_engine(_async_url(url), echo=False, **pool_kwargs(is_async=True))
+        instrument_engine(replica, f"async_replica{i}")
+        async_replicas.append(replica.sync_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+        primary=async_engine.sync_engine,
+        replicas=ReplicaSelector(async_replicas) if async_replicas else None,
+    )
+
 # -----------------------------
 # BASE CLASS
 # -----------------------------
@@ -76,3 +141,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_session():
+    """
+    Session for `async def` routes: AsyncSession when DB_ASYNC is on,
+    otherwise a regular Session. Use with crud_async.
+    """
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    else:
+        async with AsyncSessionLocal() as db:
+            yield db
@@ -1,24 +1,127 @@
 # backend/app/main.py
+import math
 import os
 import random
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from .database import engine, Base, get_db
-from . import models
-from passlib.context import CryptContext
+from .database import engine, Base, get_db, SessionLocal
+from . import models, crud
+from .migrations import upgrade_schema
+from .config import settings
+from .utils.background import PeriodicTask
+from .utils.db_routing import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, begin_request, parse_last_write
+from .utils.surge import get_surge_engine, flush_surge_state
+from .utils.pnr import get_pnr_allocator
+from .utils.pricing import mark_prices_stale
+from .utils.route_graph import get_route_graph
+from .utils.money import to_minor
+from .utils.security import pwd_context
+from .utils import ticket_store
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+surge_flusher = PeriodicTask("surge-flush", settings.SURGE_FLUSH_SECONDS, flush_surge_state)
+
+
+def refresh_prices() -> int:
+    """Background entry point: bring stale / due flight_prices rows up to date."""
+    db = SessionLocal()
+    try:
+        return crud.refresh_due_prices(db)
+    finally:
+        db.close()
+
+
+price_refresher = PeriodicTask("price-refresh", settings.PRICE_REFRESH_SECONDS, refresh_prices)
+
+
+def sweep_expired_holds() -> int:
+    """Background entry point: release expired seat holds back to inventory."""
+    db = SessionLocal()
+    try:
+        return crud.expire_holds(db)
+    finally:
+        db.close()
+
+
+hold_sweeper = PeriodicTask("hold-sweep", settings.HOLD_SWEEP_SECONDS, sweep_expired_holds)
+
+
+def sweep_idempotency_keys() -> int:
+    db = SessionLocal()
+    try:
+        return crud.expire_idempotency_keys(db)
+    finally:
+        db.close()
+
+
+idempotency_sweeper = PeriodicTask("idempotency-sweep", settings.IDEMPOTENCY_SWEEP_SECONDS, sweep_idempotency_keys)
+
+
+def prune_flights() -> int:
+    """Background entry point: drop departed, unbooked flight instances."""
+    db = SessionLocal()
+    try:
+        get_route_graph().drop_departed()
+        return crud.prune_flight_instances(db)
+    finally:
+        db.close()
+
+
+flight_pruner = PeriodicTask("flight-prune", settings.FLIGHT_PRUNE_SECONDS, prune_flights)
+
+
+def sync_route_graph() -> int:
+    """Background entry point: add flights imported by other processes to the route graph."""
+    db = SessionLocal()
+    try:
+        return get_route_graph().sync(db)
+    finally:
+        db.close()
+
+
+route_graph_syncer = PeriodicTask("route-graph-sync", settings.ROUTE_GRAPH_SYNC_SECONDS, sync_route_graph)
+
+
+def lease_pnr_worker():
+    """Hold a PNR worker id no other live process has; renewed periodically."""
+    allocator = get_pnr_allocator()
+    if not allocator.needs_lease:
+        return allocator.worker_id
+
+    db = SessionLocal()
+    try:
+        worker_id = crud.lease_pnr_worker(db, allocator.holder)
+    finally:
+        db.close()
+    allocator.use_worker_id(worker_id)
+    return worker_id
+
+
+def release_pnr_worker():
+    allocator = get_pnr_allocator()
+    if not allocator.needs_lease:
+        return
+
+    db = SessionLocal()
+    try:
+        crud.release_pnr_worker(db, allocator.holder)
+    finally:
+        db.close()
+
+
+pnr_leaser = PeriodicTask("pnr-lease", settings.PNR_LEASE_SECONDS / 3, lease_pnr_worker)
 
 app = FastAPI(title="Flight Booking API - FastAPI + MySQL")
 
 # Routers
-from .routers import flights, bookings, users
+from .routers import flights, bookings, users, cities, metrics
 app.include_router(flights.router)
 app.include_router(bookings.router)
 app.include_router(users.router)
+app.include_router(cities.router)
+app.include_router(metrics.router)
 
 
 # ---------------------------------------------------
@@ -37,15 +140,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # pagination token, retry marker, read-your-writes stamp
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", LAST_WRITE_HEADER],
 )
 
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    Reads follow the client's last write to the primary: the write time
+    comes in on the X-Last-Write header or cookie and goes back out
+    after this request writes, so no process has to remember it.
+    """
+    sent = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    clock = begin_request(parse_last_write(sent))
+
+    response = await call_next(request)
+
+    if clock.wrote:
+        stamp = f"{clock.last_write:.3f}"
+        response.headers[LAST_WRITE_HEADER] = stamp
+        response.set_cookie(
+            LAST_WRITE_COOKIE, stamp,
+            max_age=max(1, math.ceil(settings.DB_STICKY_SECONDS)), httponly=True, samesite="lax",
+        )
+    return response
+
+
 # ---------------------------------------------------
 # STARTUP → Create tables & seed demo user + flights
 # ---------------------------------------------------
 @app.on_event("startup")
 def startup():
     Base.metadata.create_all(bind=engine)
+    # columns / indexes added since a table was first created
+    upgrade_schema(engine)
+
+    # PNRs from this process use a worker id no other live process holds
+    lease_pnr_worker()
 
     db = next(get_db())
     try:
@@ -62,9 +194,10 @@ def startup():
                 email="demo@example.com",
                 password_hash=pwd_context.hash("demo123"),
                 full_name="Demo User",
-                wallet_balance=50000.0,
             )
             db.add(user)
+            db.flush()
+            crud.post_wallet_entry(db, user.id, to_minor(50000), "opening")
             db.commit()
 
         # ----------------------------
@@ -86,21 +219,63 @@ def startup():
                 ("G8-312", "GoAir", "Kolkata", "Pune", random.uniform(2000, 3000)),
             ]
 
-            for f in seed_flights:
-                db.add(
-                    models.Flight(
-                        flight_id=f[0],
-                        airline=f[1],
-                        departure_city=f[2],
-                        arrival_city=f[3],
-                        base_price=round(f[4], 2),
-                    )
-                )
-            db.commit()
+            # daily dated instances of each route for the next FLIGHT_SEED_DAYS,
+            # through the bulk import path (inventory + price snapshots included)
+            routes = [f[:4] + (round(f[4], 2),) for f in seed_flights]
+            crud.import_flight_rows(db, crud.schedule_flights(routes))
+
+        # ----------------------------
+        # CITY DIMENSION (link pre-existing flights)
+        # ----------------------------
+        crud.backfill_flight_cities(db)
+        crud.backfill_city_codes(db)
+
+        # ----------------------------
+        # SEAT INVENTORY (flights without counters)
+        # ----------------------------
+        crud.backfill_seat_inventory(db)
+
+        # ----------------------------
+        # SURGE STATE (load once, then write back in batches)
+        # ----------------------------
+        get_surge_engine().load(db)
+
+        # ----------------------------
+        # PRICE SNAPSHOTS (surge flips → stale rows → refresher)
+        # ----------------------------
+        crud.backfill_flight_prices(db)
+        get_surge_engine().add_listener(mark_prices_stale)
+
+        # ----------------------------
+        # ROUTE GRAPH (connection search; kept current by crud)
+        # ----------------------------
+        get_route_graph().load(db)
 
     finally:
         db.close()
 
+    surge_flusher.start()
+    price_refresher.start()
+    hold_sweeper.start()
+    idempotency_sweeper.start()
+    flight_pruner.start()
+    route_graph_syncer.start()
+    pnr_leaser.start()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    pnr_leaser.stop()
+    release_pnr_worker()
+    route_graph_syncer.stop()
+    flight_pruner.stop()
+    idempotency_sweeper.stop()
+    hold_sweeper.stop()
+    price_refresher.stop()
+    surge_flusher.stop()
+    flush_surge_state()
+    ticket_store.shutdown()
+
 
 # --------------------------------------------------------------------
 # IMPORTANT: REMOVE OLD ENDPOINTS
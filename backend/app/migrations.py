@@ -0,0 +1,198 @@
+# backend/app/migrations.py
+#
+# create_all only creates missing tables. These steps bring tables that
+# an older version created up to the current models: each inspects the
+# live schema first, so running them on every startup is a no-op once
+# applied. Run them right after create_all, before anything queries.
+
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from . import models  # noqa: F401  (registers the tables)
+from .config import settings
+from .database import Base
+
+
+# (table, column, DDL default) for columns added to existing tables;
+# the column type comes from the model
+ADDED_COLUMNS = [
+    # city dimension
+    ("flights", "departure_city_id", None),
+    ("flights", "arrival_city_id", None),
+    # seat inventory / fare buckets / seat map
+    ("flights", "capacity", str(settings.DEFAULT_FLIGHT_CAPACITY)),
+    ("bookings", "fare_bucket", None),
+    ("bookings", "seat_number", None),
+    # dated flight instances (NULL = legacy undated route)
+    ("flights", "departure_at", None),
+    ("flights", "arrival_at", None),
+    # booking idempotency
+    ("bookings", "idempotency_key", None),
+]
+
+# (table, index) no longer in the models
+REDUNDANT_INDEXES = [
+    # duplicate of the primary key, written once per seat counter
+    ("seat_inventory", "ix_seat_inventory_id"),
+]
+
+
+def upgrade_schema(engine: Engine):
+    """Apply every pending step; each runs in its own transaction."""
+    with engine.begin() as conn:
+        add_missing_columns(conn)
+    with engine.begin() as conn:
+        migrate_wallet_to_minor_units(conn)
+    with engine.begin() as conn:
+        drop_unique_flight_number(conn)
+        drop_redundant_indexes(conn)
+    with engine.begin() as conn:
+        create_missing_indexes(conn)
+    with engine.begin() as conn:
+        backfill_seat_assignments(conn)
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _drop_index(conn: Connection, table: str, name: str):
+    on_table = f" ON {table}" if conn.dialect.name == "mysql" else ""
+    conn.execute(text(f"DROP INDEX {name}{on_table}"))
+
+
+def _add_column(conn: Connection, table: str, name: str, default: str = None):
+    column = Base.metadata.tables[table].c[name]
+    ddl = f"ALTER TABLE {table} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.execute(text(ddl))
+
+
+# ============================================================
+# COLUMNS
+# ============================================================
+def add_missing_columns(conn: Connection) -> int:
+    """
+    Add model columns an older schema lacks. Foreign keys on the city
+    ids are left to the model for new databases (SQLite can't add them).
+    """
+    added = 0
+    existing = {}
+    for table, name, default in ADDED_COLUMNS:
+        if table not in existing:
+            existing[table] = _columns(conn, table)
+        if name not in existing[table]:
+            _add_column(conn, table, name, default)
+            added += 1
+    return added
+
+
+# ============================================================
+# WALLET (float balance → paise + ledger)
+# ============================================================
+def migrate_wallet_to_minor_units(conn: Connection) -> int:
+    """
+    Replace the float users.wallet_balance with wallet_balance_minor
+    (rounded to paise), open each user's ledger with an "opening" entry
+    for that balance, then drop the float column. Does nothing once the
+    old column is gone. Returns the number of users converted.
+    """
+    columns = _columns(conn, "users")
+    if "wallet_balance" not in columns:
+        return 0
+
+    if "wallet_balance_minor" not in columns:
+        _add_column(conn, "users", "wallet_balance_minor", "0")
+
+    converted = conn.execute(text(
+        "UPDATE users SET wallet_balance_minor = ROUND(wallet_balance * 100)"
+    )).rowcount
+
+    # users that already have entries were converted by an earlier, interrupted run
+    conn.execute(text(
+        "INSERT INTO wallet_entries (user_id, kind, amount_minor, balance_after_minor, created_at) "
+        "SELECT u.id, 'opening', u.wallet_balance_minor, u.wallet_balance_minor, :now FROM users u "
+        "WHERE NOT EXISTS (SELECT 1 FROM wallet_entries w WHERE w.user_id = u.id)"
+    ), {"now": datetime.utcnow()})
+
+    conn.execute(text("ALTER TABLE users DROP COLUMN wallet_balance"))
+    return converted
+
+
+# ============================================================
+# FLIGHT NUMBERS (one row per dated instance)
+# ============================================================
+def drop_unique_flight_number(conn: Connection) -> int:
+    """
+    The first schema made flights.flight_id unique; dated instances
+    repeat the flight number, so that index has to go. The plain
+    ix_flights_flight_id is recreated by create_missing_indexes.
+    """
+    dropped = 0
+    for index in inspect(conn).get_indexes("flights"):
+        if index["unique"] and index["column_names"] == ["flight_id"]:
+            _drop_index(conn, "flights", index["name"])
+            dropped += 1
+    return dropped
+
+
+def drop_redundant_indexes(conn: Connection) -> int:
+    """Indexes older models created that no query needs (REDUNDANT_INDEXES)."""
+    inspector = inspect(conn)
+    dropped = 0
+    for table, name in REDUNDANT_INDEXES:
+        if name in {i["name"] for i in inspector.get_indexes(table)}:
+            _drop_index(conn, table, name)
+            dropped += 1
+    return dropped
+
+
+# ============================================================
+# INDEXES AND UNIQUE CONSTRAINTS
+# ============================================================
+def create_missing_indexes(conn: Connection) -> int:
+    """
+    Create model indexes missing from existing tables. Unique
+    constraints are added as unique indexes of the same name.
+    """
+    inspector = inspect(conn)
+    created = 0
+    for table in Base.metadata.sorted_tables:
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        existing |= {u["name"] for u in inspector.get_unique_constraints(table.name)}
+
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created += 1
+
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name and constraint.name not in existing:
+                columns = ", ".join(c.name for c in constraint.columns)
+                conn.execute(text(f"CREATE UNIQUE INDEX {constraint.name} ON {table.name} ({columns})"))
+                created += 1
+    return created
+
+
+# ============================================================
+# SEAT ASSIGNMENTS (one unique key for holds and bookings)
+# ============================================================
+def backfill_seat_assignments(conn: Connection) -> int:
+    """
+    Seats booked or held before seat_assignments existed get their row,
+    so new claims see them. Rows already there are left alone.
+    """
+    added = 0
+    for table in ("bookings", "seat_holds"):
+        added += conn.execute(text(
+            f"INSERT INTO seat_assignments (flight_id, seat_number) "
+            f"SELECT t.flight_id, t.seat_number FROM {table} t "
+            f"WHERE t.seat_number IS NOT NULL AND NOT EXISTS ("
+            f"SELECT 1 FROM seat_assignments a WHERE a.flight_id = t.flight_id AND a.seat_number = t.seat_number)"
+        )).rowcount
+    return added
@@ -1,16 +1,39 @@
 # backend/app/models.py
 
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
     Column,
     Integer,
     String,
     Float,
     DateTime,
     ForeignKey,
+    Index,
+    Text,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy.orm import relationship
 from .database import Base
+from .config import settings
+from .utils.money import from_minor
+
+
+# --------------------------
+# CITY MODEL (search dimension)
+# --------------------------
+class City(Base):
+    __tablename__ = "cities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+
+    # lower-cased, whitespace-collapsed name → exact + prefix lookups use this index
+    search_key = Column(String(100), unique=True, nullable=False, index=True)
+
+    # optional IATA airport code (e.g. BOM)
+    code = Column(String(3), unique=True, nullable=True, index=True)
 
 
 # --------------------------
@@ -18,26 +41,49 @@ from .database import Base
 # --------------------------
 class Flight(Base):
     __tablename__ = "flights"
+    __table_args__ = (
+        # date-bounded searches range-scan departure_at inside the route
+        Index("ix_flights_route", "departure_city_id", "arrival_city_id", "departure_at", "id"),
+        Index("ix_flights_arrival", "arrival_city_id", "departure_at", "id"),
+        # date-only searches and pruning of departed instances
+        Index("ix_flights_departure", "departure_at", "id"),
+        # one instance per flight number per departure
+        UniqueConstraint("flight_id", "departure_at", name="uq_flights_number_departure"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    flight_id = Column(String(50), unique=True, nullable=False, index=True)
+    flight_id = Column(String(50), nullable=False, index=True)  # flight number, e.g. AI-101
     airline = Column(String(100), nullable=False)
     departure_city = Column(String(100), nullable=False)
     arrival_city = Column(String(100), nullable=False)
     base_price = Column(Float, nullable=False)
     created_at = Column(DateTime, default=func.now())
+    capacity = Column(Integer, nullable=False, default=settings.DEFAULT_FLIGHT_CAPACITY)
+
+    # scheduled instance (UTC); NULL = undated route from before schedules
+    departure_at = Column(DateTime, nullable=True)
+    arrival_at = Column(DateTime, nullable=True)
+
+    departure_city_id = Column(Integer, ForeignKey("cities.id"), nullable=True)
+    arrival_city_id = Column(Integer, ForeignKey("cities.id"), nullable=True)
 
     bookings = relationship("Booking", back_populates="flight")
 
     # Dynamic pricing state (one-to-one)
     attempt_state = relationship("FlightAttempt", back_populates="flight", uselist=False)
 
+    seat_inventory = relationship("SeatInventory", back_populates="flight")
+    price_snapshot = relationship("FlightPrice", back_populates="flight", uselist=False)
+
 
 # --------------------------
 # USER MODEL (AUTH READY)
 # --------------------------
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -49,11 +95,16 @@ class User(Base):
     # optional fields
     full_name = Column(String(150), nullable=True)
 
-    # wallet
-    wallet_balance = Column(Float, nullable=False, default=50000.0)
+    # wallet: cached balance in paise, only changed together with a ledger entry
+    wallet_balance_minor = Column(BigInteger, nullable=False, default=0)
     created_at = Column(DateTime, default=func.now())
 
     bookings = relationship("Booking", back_populates="user")
+    wallet_entries = relationship("WalletEntry", back_populates="user")
+
+    @property
+    def wallet_balance(self) -> float:
+        return from_minor(self.wallet_balance_minor)
 
 
 # --------------------------
@@ -61,6 +112,14 @@ class User(Base):
 # --------------------------
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_user_time", "user_id", "booking_time", "id"),
+        Index("ix_bookings_time", "booking_time", "id"),
+        # one passenger per assigned seat (NULL seats don't conflict)
+        UniqueConstraint("flight_id", "seat_number", name="uq_bookings_flight_seat"),
+        # a retried POST /bookings can't book twice, whatever happened to its claim
+        UniqueConstraint("user_id", "idempotency_key", name="uq_bookings_idempotency"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     pnr = Column(String(50), unique=True, nullable=False, index=True)
@@ -72,6 +131,12 @@ class Booking(Base):
     final_price = Column(Float, nullable=False)
     booking_time = Column(DateTime, default=func.now())
 
+    fare_bucket = Column(String(20), nullable=True)
+    seat_number = Column(String(4), nullable=True)
+
+    # client's Idempotency-Key, committed with the booking (NULL = none sent)
+    idempotency_key = Column(String(100), nullable=True)
+
     flight = relationship("Flight", back_populates="bookings")
     user = relationship("User", back_populates="bookings")
 
@@ -90,3 +155,157 @@ class FlightAttempt(Base):
     surge_expires_at = Column(DateTime, nullable=True)
 
     flight = relationship("Flight", back_populates="attempt_state")
+
+
+# --------------------------
+# SEAT INVENTORY (sharded counters)
+# --------------------------
+class SeatInventory(Base):
+    __tablename__ = "seat_inventory"
+    __table_args__ = (
+        UniqueConstraint("flight_id", "fare_bucket", "shard", name="uq_seat_inventory_shard"),
+    )
+
+    # no extra index on id: imports write ~24 counter rows per flight
+    id = Column(Integer, primary_key=True)
+    flight_id = Column(Integer, ForeignKey("flights.id", ondelete="CASCADE"), nullable=False)
+    fare_bucket = Column(String(20), nullable=False)
+    shard = Column(Integer, nullable=False, default=0)
+
+    # decremented only via conditional UPDATE ... WHERE seats_available > 0
+    seats_available = Column(Integer, nullable=False, default=0)
+
+    flight = relationship("Flight", back_populates="seat_inventory")
+
+
+# --------------------------
+# SEAT HOLD (two-phase booking)
+# --------------------------
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+    __table_args__ = (
+        # the sweeper reads only expired rows, oldest first, straight off this index
+        Index("ix_seat_holds_expires", "expires_at", "id"),
+        UniqueConstraint("flight_id", "seat_number", name="uq_seat_holds_flight_seat"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    flight_id = Column(Integer, ForeignKey("flights.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    passenger_name = Column(String(150), nullable=False)
+
+    # seat taken from inventory when the hold was placed; price locked with it
+    fare_bucket = Column(String(20), nullable=False)
+    seat_number = Column(String(4), nullable=True)
+    price = Column(Float, nullable=False)
+
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # UTC
+
+    flight = relationship("Flight")
+
+
+# --------------------------
+# SEAT ASSIGNMENT (one row per taken seat)
+# --------------------------
+class SeatAssignment(Base):
+    """
+    Holds and bookings keep their own seat_number, but both claim the
+    seat here first: one unique key, so a hold and a direct booking
+    can't take the same seat. Confirming a hold keeps the row;
+    releasing or sweeping the hold deletes it.
+    """
+
+    __tablename__ = "seat_assignments"
+    __table_args__ = (
+        UniqueConstraint("flight_id", "seat_number", name="uq_seat_assignments_flight_seat"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    flight_id = Column(Integer, ForeignKey("flights.id", ondelete="CASCADE"), nullable=False)
+    seat_number = Column(String(4), nullable=False)
+
+
+# --------------------------
+# WALLET LEDGER (append-only)
+# --------------------------
+class WalletEntry(Base):
+    __tablename__ = "wallet_entries"
+    __table_args__ = (
+        Index("ix_wallet_entries_user", "user_id", "id"),
+        # a retried top-up with the same key is a no-op
+        UniqueConstraint("user_id", "idempotency_key", name="uq_wallet_entries_idempotency"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    kind = Column(String(20), nullable=False)       # opening / topup / booking
+    amount_minor = Column(BigInteger, nullable=False)   # signed, paise
+    balance_after_minor = Column(BigInteger, nullable=False)
+
+    reference = Column(String(50), nullable=True)   # e.g. booking PNR
+    idempotency_key = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    user = relationship("User", back_populates="wallet_entries")
+
+
+# --------------------------
+# IDEMPOTENCY KEYS (stored responses for retried POSTs)
+# --------------------------
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # a retry is one lookup on this index
+        UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),
+        Index("ix_idempotency_expires", "expires_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(50), nullable=False)     # endpoint + user, e.g. "bookings:7"
+    key = Column(String(100), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+
+    # NULL until the first request finishes (in progress)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # UTC
+
+
+# --------------------------
+# FLIGHT PRICE SNAPSHOT (read model for listings)
+# --------------------------
+class FlightPrice(Base):
+    __tablename__ = "flight_prices"
+    __table_args__ = (
+        # the refresher only visits rows whose price is due to change
+        Index("ix_flight_prices_refresh", "refresh_at"),
+    )
+
+    flight_id = Column(Integer, ForeignKey("flights.id", ondelete="CASCADE"), primary_key=True)
+
+    price = Column(Float, nullable=False)
+    surge_active = Column(Boolean, nullable=False, default=False)
+    surge_expires_at = Column(DateTime, nullable=True)
+
+    # next time the price changes on its own (surge expiry, departure curve);
+    # NULL = stable until a surge event marks the row stale
+    refresh_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    flight = relationship("Flight", back_populates="price_snapshot")
+
+
+# --------------------------
+# PNR WORKER LEASES (distinct allocator ids across processes)
+# --------------------------
+class PNRWorkerLease(Base):
+    __tablename__ = "pnr_worker_leases"
+
+    # one row per allocator id ever handed out (at most 2**WORKER_BITS)
+    worker_id = Column(Integer, primary_key=True, autoincrement=False)
+    holder = Column(String(100), nullable=False)   # host:pid:nonce of the leasing process
+    expires_at = Column(DateTime, nullable=False)  # UTC; renewed while the process lives
@@ -1,56 +1,148 @@
 # backend/app/routers/bookings.py
 
+from datetime import date, datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, Response, Header
+from fastapi.responses import FileResponse, StreamingResponse
 
-from .. import schemas, crud, models
-from ..database import get_db
+from .. import schemas, crud_async, models
+from ..config import settings
+from ..database import get_session
+from ..utils import ticket_store, ticket_export
+from ..utils.fast_json import FastJSONResponse
+from ..utils.idempotency import run_idempotent
+from ..utils.security import require_admin
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
 
 # ============================================================
-# Utility → Inject price into nested flight
+# Utility → response dicts with the flight at its listed price
 # ============================================================
-def attach_price(booking: models.Booking):
-    """Ensures booking.flight always contains price field."""
-    if booking.flight:
-        booking.flight.price = booking.flight.base_price  # simple pricing logic
-    return booking
+_BOOKING_FIELDS = [f for f in schemas.BookingOut.model_fields if f != "flight"]
+_HOLD_FIELDS = [f for f in schemas.HoldOut.model_fields if f not in ("flight", "expires_in")]
+
+
+async def _booking_out(db, booking: models.Booking) -> dict:
+    """
+    Booking as a response dict. The nested flight comes from get_flight,
+    priced like listings (snapshot, open fare bucket); mapped instances
+    are never given a price attribute.
+    """
+    out = {field: getattr(booking, field) for field in _BOOKING_FIELDS}
+    out["flight"] = await crud_async.get_flight(db, booking.flight_id)
+    return out
 
 
 # ============================================================
 # CREATE BOOKING (AUTH REQUIRED)
 # ============================================================
 @router.post("", response_model=schemas.BookingOut, status_code=status.HTTP_201_CREATED)
-def create_booking(payload: schemas.BookingCreate, request: Request, db: Session = Depends(get_db)):
+async def create_booking(
+    payload: schemas.BookingCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=100),
+    db=Depends(get_session),
+):
     """
     Rules:
     - user_id is REQUIRED
     - user must exist
+    - with an Idempotency-Key header, retries replay the first response
     """
 
     if not payload.user_id:
         raise HTTPException(status_code=401, detail="Login required to book a flight")
 
-    user = db.query(models.User).filter(models.User.id == payload.user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Invalid user. Please login again.")
-
     ip = request.client.host if request.client else None
 
+    async def book():
+        try:
+            booking = await crud_async.create_booking(
+                db=db,
+                passenger_name=payload.passenger_name,
+                flight_id=payload.flight_id,
+                user_id=payload.user_id,
+                ip_address=ip,
+                seat_number=payload.seat_number,
+                idempotency_key=idempotency_key,
+            )
+
+        except PermissionError as pe:
+            raise HTTPException(status_code=401, detail=str(pe))
+
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Booking failed: {str(e)}")
+
+        # pre-render the ticket in the background; the response doesn't wait
+        ticket_store.schedule_render(ticket_store.ticket_fields(booking, booking.flight))
+
+        return await _booking_out(db, booking)
+
+    if not idempotency_key:
+        return await book()
+
+    return await run_idempotent(
+        db,
+        scope=f"bookings:{payload.user_id}",
+        key=idempotency_key,
+        payload=payload,
+        handler=book,
+        status_code=status.HTTP_201_CREATED,
+        response_model=schemas.BookingOut,
+    )
+
+
+# ============================================================
+# SEAT HOLDS → hold a seat, then confirm before it expires
+# ============================================================
+async def _hold_out(db, hold: models.SeatHold) -> dict:
+    out = {field: getattr(hold, field) for field in _HOLD_FIELDS}
+    out["expires_in"] = max(0, int((hold.expires_at - datetime.utcnow()).total_seconds()))
+    out["flight"] = await crud_async.get_flight(db, hold.flight_id)
+    return out
+
+
+@router.post("/holds", response_model=schemas.HoldOut, status_code=status.HTTP_201_CREATED)
+async def create_hold(payload: schemas.HoldCreate, db=Depends(get_session)):
+    """Seat and price are held for HOLD_TTL_SECONDS; nothing is charged yet."""
+    if not payload.user_id:
+        raise HTTPException(status_code=401, detail="Login required to book a flight")
+
     try:
-        booking = crud.create_booking(
+        hold = await crud_async.create_hold(
             db=db,
             passenger_name=payload.passenger_name,
             flight_id=payload.flight_id,
             user_id=payload.user_id,
-            ip_address=ip,
+            seat_number=payload.seat_number,
         )
 
-        return attach_price(booking)
+    except PermissionError as pe:
+        raise HTTPException(status_code=401, detail=str(pe))
+
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Hold failed: {str(e)}")
+
+    return await _hold_out(db, hold)
+
+
+@router.post("/holds/{hold_id}/confirm", response_model=schemas.BookingOut, status_code=status.HTTP_201_CREATED)
+async def confirm_hold(hold_id: int, payload: schemas.HoldConfirm, db=Depends(get_session)):
+    if not payload.user_id:
+        raise HTTPException(status_code=401, detail="Login required to book a flight")
+
+    try:
+        booking = await crud_async.confirm_hold(db, hold_id=hold_id, user_id=payload.user_id)
+
+    except PermissionError as pe:
+        raise HTTPException(status_code=401, detail=str(pe))
 
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -58,25 +150,44 @@ def create_booking(payload: schemas.BookingCreate, request: Request, db: Session
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Booking failed: {str(e)}")
 
+    ticket_store.schedule_render(ticket_store.ticket_fields(booking, booking.flight))
+
+    return await _booking_out(db, booking)
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_hold(hold_id: int, user_id: int, db=Depends(get_session)):
+    if not await crud_async.release_hold(db, hold_id=hold_id, user_id=user_id):
+        raise HTTPException(status_code=404, detail="Hold not found or already expired")
+    return Response(status_code=204)
+
 
 # ============================================================
 # LIST BOOKINGS (AUTH REQUIRED)
 # ============================================================
 @router.get("", response_model=List[schemas.BookingOut])
-def list_bookings(user_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def list_bookings(
+    user_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    db=Depends(get_session),
+):
 
     if not user_id:
         raise HTTPException(status_code=401, detail="Login required to view bookings")
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await crud_async.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid user")
 
     try:
-        bookings = crud.get_bookings(db, user_id=user_id)
+        # row tuples → dicts → JSON bytes; no ORM objects or Pydantic validation
+        bookings, next_cursor = await crud_async.get_booking_history(db, user_id=user_id, limit=limit, cursor=cursor)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return FastJSONResponse(bookings, headers=headers)
 
-        # attach price to each booking
-        return [attach_price(b) for b in bookings]
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not fetch bookings: {str(e)}")
@@ -85,30 +196,85 @@ def list_bookings(user_id: Optional[int] = None, db: Session = Depends(get_db)):
 # ============================================================
 # DOWNLOAD TICKET (USER CAN ONLY DOWNLOAD OWN TICKET)
 # ============================================================
-@router.get("/ticket/{pnr}")
-def download_ticket(pnr: str, user_id: int, db: Session = Depends(get_db)):
-
+async def _owned_booking(db, pnr: str, user_id: int):
     if not user_id:
         raise HTTPException(status_code=401, detail="Login required")
 
-    booking = db.query(models.Booking).filter(models.Booking.pnr == pnr).first()
+    booking = await crud_async.get_booking_by_pnr(db, pnr)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
     if booking.user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    return booking
+
+
+@router.get("/ticket/{pnr}")
+async def download_ticket(pnr: str, user_id: int, request: Request, db=Depends(get_session)):
+    """
+    Tickets are immutable: served from the content-addressed store with a
+    strong ETag (304 on revalidation). Rendering, if ever needed, happens
+    in the render worker pool, not on this request.
+    """
+    booking = await _owned_booking(db, pnr, user_id)
+
+    fields = ticket_store.ticket_fields(booking, booking.flight)
+    etag = f'"{ticket_store.ticket_digest(fields)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
     try:
-        from ..utils.pdf_generator import generate_ticket_pdf
+        pdf_path = await ticket_store.ensure_ticket(fields)
+        return FileResponse(pdf_path, filename=f"{pnr}.pdf", media_type="application/pdf", headers=headers)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not generate ticket: {str(e)}")
+
+
+@router.post("/ticket/{pnr}/regenerate", status_code=status.HTTP_202_ACCEPTED)
+async def regenerate_ticket(pnr: str, user_id: int, db=Depends(get_session)):
+    """
+    Re-render a stored ticket (e.g. after a template fix).
+    Bumping ticket_store.TEMPLATE_VERSION re-renders all tickets lazily instead.
+    """
+    booking = await _owned_booking(db, pnr, user_id)
+    ticket_store.schedule_render(ticket_store.ticket_fields(booking, booking.flight), force=True)
+    return {"pnr": pnr, "status": "queued"}
 
-        pdf_path = generate_ticket_pdf(booking=booking, flight=booking.flight)
-        return FileResponse(pdf_path, filename=f"{pnr}.pdf", media_type="application/pdf")
 
-    except ImportError:
+# ============================================================
+# BULK TICKET EXPORT (OPS, X-Admin-Key REQUIRED)
+# ============================================================
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_tickets(
+    flight_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    format: str = Query("zip", pattern="^(zip|pdf)$"),
+):
+    """
+    All tickets for a flight and/or booking date range, streamed as a ZIP
+    of PDFs (rendered in parallel) or one merged multi-page PDF.
+    Every passenger's name and PNR is in here: ops only.
+    """
+    if not (flight_id or date_from or date_to):
+        raise HTTPException(status_code=400, detail="Give flight_id and/or a date range")
+    # checked up front: once streaming starts the status can't change
+    if format == "pdf" and ticket_export.count_tickets(flight_id, date_from, date_to) > settings.TICKET_EXPORT_PDF_MAX_PAGES:
         raise HTTPException(
-            status_code=501,
-            detail="PDF generator missing. Implement backend/app/utils/pdf_generator.py",
+            status_code=400,
+            detail=f"Merged PDF export is limited to {settings.TICKET_EXPORT_PDF_MAX_PAGES} tickets; use format=zip",
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Could not generate ticket: {str(e)}")
+    stamp = flight_id or f"{date_from or ''}_{date_to or ''}"
+    media_type = "application/zip" if format == "zip" else "application/pdf"
+
+    return StreamingResponse(
+        ticket_export.export_tickets(flight_id, date_from, date_to, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tickets_{stamp}.{format}"'},
+    )
@@ -0,0 +1,22 @@
+# backend/app/routers/cities.py
+
+from typing import List
+from fastapi import APIRouter, Depends, Query
+
+from .. import schemas, crud_async
+from ..database import get_session
+
+router = APIRouter(prefix="/cities", tags=["cities"])
+
+
+@router.get("", response_model=List[schemas.CityOut])
+async def search_cities(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db=Depends(get_session),
+):
+    """
+    Autocomplete for the search bar.
+    Matches city name prefix or 3-letter airport code.
+    """
+    return await crud_async.search_cities(db, q, limit=limit)
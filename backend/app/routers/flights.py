@@ -1,70 +1,174 @@
 # backend/app/routers/flights.py
 
+import io
+import os
+from datetime import date as date_type, datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from uuid import uuid4
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, Response, UploadFile
 
-from .. import schemas, crud, models
-from ..database import get_db
+from .. import schemas, crud_async
+from ..config import settings
+from ..database import get_session
+from ..utils.catalog_import import detect_format
+from ..utils.security import require_admin
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 
 
 @router.get("", response_model=List[schemas.FlightOut])
-def list_flights(
+async def list_flights(
+    response: Response,
     departure_city: Optional[str] = None,
     arrival_city: Optional[str] = None,
-    db: Session = Depends(get_db),
+    date: Optional[date_type] = Query(None, description="Departure date (UTC); same as date_from = date_to"),
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    db=Depends(get_session),
 ):
     """
     List flights with optional search filters.
-    Each flight returned includes the computed dynamic price.
+    Each flight returned includes its price from the flight_prices snapshot.
+    With a departure date or date range (inclusive, UTC), only dated
+    instances in that range are returned, in departure order; without
+    one, only flights that have not departed yet.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
+    if date:
+        date_from = date_to = date
+
     try:
-        flights = crud.get_flights(
+        flights, next_cursor = await crud_async.search_flights(
             db,
             departure_city=departure_city,
-            arrival_city=arrival_city
+            arrival_city=arrival_city,
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to,
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return flights
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not fetch flights: {str(e)}")
 
 
+@router.get("/calendar", response_model=List[schemas.FareDayOut])
+async def fare_calendar(
+    departure_city: str,
+    arrival_city: str,
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$", description="YYYY-MM"),
+    db=Depends(get_session),
+):
+    """
+    Lowest price per departure day (UTC) for a route in a month.
+    Days without a bookable flight are omitted.
+    """
+    try:
+        return await crud_async.get_fare_calendar(db, departure_city, arrival_city, month)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not build fare calendar: {str(e)}")
+
+
+@router.get("/connections", response_model=List[schemas.ItineraryOut])
+async def list_connections(
+    departure_city: str,
+    arrival_city: str,
+    date: Optional[date_type] = Query(None, description="First-leg departure date (UTC); default next 24h"),
+    date_to: Optional[date_type] = None,
+    max_stops: Optional[int] = Query(None, ge=0, le=settings.CONNECTION_MAX_STOPS),
+    sort: str = Query("cheapest", pattern="^(cheapest|fastest)$"),
+    limit: int = Query(5, ge=1, le=20),
+    db=Depends(get_session),
+):
+    """
+    Direct and connecting itineraries between two cities, cheapest or
+    fastest first, from the in-memory route graph.
+    """
+    try:
+        return await crud_async.find_connections(
+            db,
+            departure_city,
+            arrival_city,
+            date_from=date,
+            date_to=date_to,
+            max_stops=max_stops,
+            sort=sort,
+            limit=limit,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not search connections: {str(e)}")
+
+
 @router.post("/seed", status_code=status.HTTP_201_CREATED)
-def seed_flights(db: Session = Depends(get_db)):
+async def seed_flights(db=Depends(get_session)):
     """
     Seed default flights into the database.
     """
     try:
-        count = crud.seed_flights(db)
+        count = await crud_async.seed_flights(db)
         return {"seeded": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not seed flights: {str(e)}")
 
 
+@router.post("/import", dependencies=[Depends(require_admin)])
+async def import_schedule(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$", description="default: from the file name"),
+    db=Depends(get_session),
+):
+    """
+    Bulk-load a CSV / JSON-lines schedule, streamed in chunks and
+    upserted on (flight_id, departure_at). Columns: flight_id, airline,
+    departure_city, arrival_city, base_price, departure_at, and optional
+    arrival_at, capacity. Bad rows are skipped and written to a
+    JSON-lines reject file, returned as `reject_file`. Requires the
+    X-Admin-Key header.
+    """
+    os.makedirs(settings.IMPORT_REJECT_DIR, exist_ok=True)
+    reject_path = os.path.join(
+        settings.IMPORT_REJECT_DIR, f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid4().hex[:8]}.jsonl"
+    )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+
+    try:
+        with open(reject_path, "w", encoding="utf-8") as rejects:
+            stats = await crud_async.import_flights(db, stream, format or detect_format(file.filename), rejects)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Import stopped: {str(ve)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+
+    if stats["rejected"]:
+        stats["reject_file"] = reject_path
+    else:
+        os.remove(reject_path)
+    return stats
+
+
 @router.get("/{flight_id}", response_model=schemas.FlightOut)
-def get_flight(flight_id: int, db: Session = Depends(get_db)):
+async def get_flight(flight_id: int, db=Depends(get_session)):
     """
     Fetch a single flight by its DB ID.
-    Dynamic price is recalculated every time.
+    The price is read from the flight_prices snapshot (kept current by
+    the background refresher); flights without one are priced live.
     """
-    flight = crud.get_flight_by_id(db, flight_id)
-    if not flight:
-        raise HTTPException(status_code=404, detail="Flight not found")
-
-    # Compute surge-adjusted price
     try:
-        price = crud.compute_dynamic_price(db, flight)
+        flight = await crud_async.get_flight(db, flight_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pricing error: {str(e)}")
 
-    return {
-        "id": flight.id,
-        "flight_id": flight.flight_id,
-        "airline": flight.airline,
-        "departure_city": flight.departure_city,
-        "arrival_city": flight.arrival_city,
-        "base_price": flight.base_price,
-        "price": round(price, 2),
-    }
+    if not flight:
+        raise HTTPException(status_code=404, detail="Flight not found")
+
+    return flight
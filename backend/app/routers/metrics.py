@@ -0,0 +1,36 @@
+# backend/app/routers/metrics.py
+
+from fastapi import APIRouter
+
+from ..utils.cache import get_search_cache
+from ..utils.db_pool import pool_stats
+from ..utils.security import password_hasher
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/cache")
+def cache_metrics():
+    """
+    Flight search cache counters (hits, misses, evictions, invalidations).
+    """
+    return get_search_cache().stats()
+
+
+@router.get("/auth")
+def auth_metrics():
+    """
+    Password hashing pool: queue depth, rejections and latency percentiles.
+    Tracked apart from request latency so login bursts are visible on their own.
+    """
+    return password_hasher.stats()
+
+
+@router.get("/pool")
+def pool_metrics():
+    """
+    DB connection pools (sync, and async when enabled): occupancy,
+    overflow, checkout wait percentiles, timeouts and invalidations.
+    Size DB_POOL_SIZE / DB_MAX_OVERFLOW per worker from these.
+    """
+    return pool_stats()
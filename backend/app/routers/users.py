@@ -1,26 +1,23 @@
 # backend/app/routers/users.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from passlib.context import CryptContext
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
+from typing import List, Optional
 
-from .. import schemas, models
-from ..database import get_db
+from .. import schemas, crud_async
+from ..config import settings
+from ..database import get_session
+from ..utils.money import to_minor
+from ..utils.security import password_hasher, PasswordHasherBusy
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-
-# Utility: hash password
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-# Utility: verify password
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# Utility: bcrypt runs on the bounded hashing pool, never on the event loop
+async def _hasher_call(coro):
+    try:
+        return await coro
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 
 # ======================================================
@@ -28,52 +25,55 @@ def verify_password(plain: str, hashed: str) -> bool:
 # ======================================================
 
 @router.post("/register", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def register_user(payload: schemas.UserRegister, db: Session = Depends(get_db)):
+async def register_user(payload: schemas.UserRegister, db=Depends(get_session)):
     """
     Register a new user.
     Fields: username, email, full_name, password
     """
     # check if username exists
-    if db.query(models.User).filter(models.User.username == payload.username).first():
+    if await crud_async.get_user_by_username(db, payload.username):
         raise HTTPException(status_code=400, detail="Username already exists")
 
     # check if email exists
-    if db.query(models.User).filter(models.User.email == payload.email).first():
+    if await crud_async.get_user_by_email(db, payload.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = models.User(
+    password_hash = await _hasher_call(password_hasher.hash(payload.password))
+
+    return await crud_async.create_user(
+        db,
         username=payload.username,
         email=payload.email,
         full_name=payload.full_name,
-        password_hash=hash_password(payload.password),
-        wallet_balance=50000.0,   # default wallet
+        password_hash=password_hash,
     )
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
-
 
 # ======================================================
 # LOGIN USER (NO TOKENS)
 # ======================================================
 
 @router.post("/login", response_model=schemas.UserOut)
-def login_user(payload: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login_user(payload: schemas.UserLogin, db=Depends(get_session)):
     """
     Simple login:
     - verify email
-    - verify password
+    - verify password (rehash if BCRYPT_ROUNDS changed)
     - return user object (no JWT token)
     """
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
+    user = await crud_async.get_user_by_email(db, payload.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not verify_password(payload.password, user.password_hash):
+    valid, new_hash = await _hasher_call(
+        password_hasher.verify_and_update(payload.password, user.password_hash)
+    )
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect password")
 
+    if new_hash:
+        user = await crud_async.update_password_hash(db, user.id, new_hash)
+
     return user
 
 
@@ -82,8 +82,8 @@ def login_user(payload: schemas.UserLogin, db: Session = Depends(get_db)):
 # ======================================================
 
 @router.get("/{user_id}", response_model=schemas.UserOut)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def get_user(user_id: int, db=Depends(get_session)):
+    user = await crud_async.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -94,8 +94,19 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 # ======================================================
 
 @router.get("", response_model=List[schemas.UserOut])
-def list_users(db: Session = Depends(get_db)):
-    users = db.query(models.User).order_by(models.User.created_at.desc()).all()
+async def list_users(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    db=Depends(get_session),
+):
+    try:
+        users, next_cursor = await crud_async.get_users(db, limit=limit, cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
 
@@ -104,24 +115,53 @@ def list_users(db: Session = Depends(get_db)):
 # ======================================================
 
 @router.post("/{user_id}/topup")
-def top_up_wallet(user_id: int, amount: float, db: Session = Depends(get_db)):
+async def top_up_wallet(
+    user_id: int,
+    amount: float,
+    idempotency_key: Optional[str] = Header(None, max_length=100),
+    db=Depends(get_session),
+):
     """
     Add balance to user wallet.
+    Send an Idempotency-Key header to make retries safe: the key is
+    stored on the ledger entry, so a repeated key is never credited
+    twice (422 if it is reused for a different amount).
     """
-    if amount <= 0:
+    if to_minor(amount) <= 0:
         raise HTTPException(status_code=400, detail="Amount must be > 0")
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    try:
+        user = await crud_async.top_up_wallet(db, user_id, amount, idempotency_key=idempotency_key)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.wallet_balance += amount
-    db.commit()
-    db.refresh(user)
-
     return {
         "message": "Wallet updated",
         "user_id": user.id,
         "new_balance": user.wallet_balance,
     }
+
+
+# ======================================================
+# WALLET LEDGER (newest first)
+# ======================================================
+
+@router.get("/{user_id}/wallet/entries", response_model=List[schemas.WalletEntryOut])
+async def list_wallet_entries(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    db=Depends(get_session),
+):
+    try:
+        entries, next_cursor = await crud_async.get_wallet_entries(db, user_id, limit=limit, cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
@@ -1,8 +1,8 @@
 # backend/app/schemas.py
 
 from pydantic import BaseModel, EmailStr
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 # ======================================================
@@ -15,6 +15,8 @@ class FlightBase(BaseModel):
     departure_city: str
     arrival_city: str
     base_price: float
+    departure_at: Optional[datetime] = None  # UTC
+    arrival_at: Optional[datetime] = None
 
 
 class FlightCreate(FlightBase):
@@ -28,12 +30,44 @@ class FlightOut(BaseModel):
     departure_city: str
     arrival_city: str
     base_price: float
+    departure_at: Optional[datetime] = None  # UTC; None for undated routes
+    arrival_at: Optional[datetime] = None
     price: float  # dynamic price
+    surge_active: bool = False
+    surge_expires_at: Optional[datetime] = None  # UTC; price holds until then
 
     class Config:
         from_attributes = True  # REQUIRED for ORM → Pydantic v2
 
 
+class ItineraryOut(BaseModel):
+    legs: List[FlightOut]
+    stops: int
+    total_price: float
+    departure_at: datetime
+    arrival_at: datetime
+    duration_minutes: int
+
+
+class FareDayOut(BaseModel):
+    date: date
+    min_price: float
+    flights: int  # bookable instances that day
+
+
+# ======================================================
+# CITY SCHEMAS
+# ======================================================
+
+class CityOut(BaseModel):
+    id: int
+    name: str
+    code: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 # ======================================================
 # USER SCHEMAS (AUTH)
 # ======================================================
@@ -70,6 +104,7 @@ class BookingCreate(BaseModel):
     user_id: Optional[int] = None
     passenger_name: str
     flight_id: int
+    seat_number: Optional[str] = None  # e.g. "12A"; unassigned if omitted
 
 
 class BookingOut(BaseModel):
@@ -80,6 +115,8 @@ class BookingOut(BaseModel):
     final_price: float
     booking_time: datetime
     user_id: Optional[int] = None
+    fare_bucket: Optional[str] = None
+    seat_number: Optional[str] = None
 
     flight: Optional[FlightOut] = None  # nested flight
 
@@ -88,9 +125,47 @@ class BookingOut(BaseModel):
 
 
 # ======================================================
-# OPTIONAL — Pricing Attempt
+# WALLET LEDGER
 # ======================================================
 
-class PricingAttemptCreate(BaseModel):
+class WalletEntryOut(BaseModel):
+    id: int
+    kind: str
+    amount_minor: int          # paise, signed
+    balance_after_minor: int
+    reference: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ======================================================
+# SEAT HOLDS (hold → confirm)
+# ======================================================
+
+class HoldCreate(BaseModel):
+    user_id: Optional[int] = None
+    passenger_name: str
+    flight_id: int
+    seat_number: Optional[str] = None
+
+
+class HoldConfirm(BaseModel):
+    user_id: Optional[int] = None
+
+
+class HoldOut(BaseModel):
+    id: int
     flight_id: int
-    ip_address: Optional[str] = None
+    passenger_name: str
+    fare_bucket: str
+    seat_number: Optional[str] = None
+    price: float
+    expires_at: datetime  # UTC
+    expires_in: int = 0   # seconds left; clients count down from this
+
+    flight: Optional[FlightOut] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,25 @@
+# backend/app/utils/airports.py
+
+from typing import Optional
+
+# normalized city name → IATA code of its main airport; cities.code is
+# filled from this when a city is created (and backfilled on startup),
+# so "BOM" finds Mumbai in the city search
+AIRPORT_CODES = {
+    "ahmedabad": "AMD",
+    "bengaluru": "BLR",
+    "chennai": "MAA",
+    "delhi": "DEL",
+    "goa": "GOI",
+    "hyderabad": "HYD",
+    "jaipur": "JAI",
+    "kochi": "COK",
+    "kolkata": "CCU",
+    "lucknow": "LKO",
+    "mumbai": "BOM",
+    "pune": "PNQ",
+}
+
+
+def airport_code(search_key: str) -> Optional[str]:
+    return AIRPORT_CODES.get(search_key)
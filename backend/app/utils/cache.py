@@ -0,0 +1,161 @@
+# backend/app/utils/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable
+
+from ..config import settings
+
+
+# ============================================================
+# BACKEND INTERFACE
+# ============================================================
+class CacheBackend:
+    """
+    Response cache with tag-based invalidation.
+
+    Entries are stored with a set of tags (e.g. "flight:12"); dropping a
+    tag evicts every entry that carries it. A shared backend (Redis etc.)
+    only needs to implement these methods.
+    """
+
+    def get(self, key: Hashable):
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value, ttl: float = None, tags: Iterable[str] = ()):
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+# ============================================================
+# IN-PROCESS TTL + LRU BACKEND
+# ============================================================
+class InMemoryCache(CacheBackend):
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()   # key -> (expires_at, value, tags)
+        self._tags = {}                 # tag -> set(keys)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # caller holds lock
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value, ttl: float = None, tags: Iterable[str] = ()):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# ============================================================
+# FLIGHT SEARCH CACHE
+# ============================================================
+_search_cache: CacheBackend = InMemoryCache(
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+)
+
+
+def get_search_cache() -> CacheBackend:
+    return _search_cache
+
+
+def set_search_cache(cache: CacheBackend):
+    global _search_cache
+    _search_cache = cache
+
+
+def flight_tag(flight_id: int) -> str:
+    return f"flight:{flight_id}"
+
+
+def invalidate_flights(flight_ids: Iterable[int]) -> int:
+    """Drop cached searches containing any of these flights."""
+    return _search_cache.invalidate_tags(flight_tag(fid) for fid in flight_ids)
+
+
+def invalidate_catalog():
+    """Flights were added/removed: any search result may have changed."""
+    _search_cache.clear()
+
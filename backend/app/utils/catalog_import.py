@@ -0,0 +1,182 @@
+# backend/app/utils/catalog_import.py
+
+import argparse
+import csv
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional, TextIO, Tuple
+
+from ..config import settings
+
+FORMATS = ("csv", "jsonl")
+FIELDS = ("flight_id", "airline", "departure_city", "arrival_city", "base_price", "departure_at", "arrival_at", "capacity")
+_MAX_LENGTH = {"flight_id": 50, "airline": 100, "departure_city": 100, "arrival_city": 100}
+
+
+# ============================================================
+# PARSING / VALIDATION
+# ============================================================
+def detect_format(filename: str) -> str:
+    if filename and filename.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def _utc(value) -> datetime:
+    """ISO 8601 → naive UTC (the convention for every DateTime column)."""
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.replace(microsecond=0)   # MySQL DATETIME keeps whole seconds
+
+
+def parse_flight(record: dict) -> dict:
+    """One schedule record → row for the flights table; ValueError says why not."""
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+
+    row = {}
+    for field, max_len in _MAX_LENGTH.items():
+        value = " ".join(str(record.get(field) or "").split())
+        if not value:
+            raise ValueError(f"{field} is required")
+        if len(value) > max_len:
+            raise ValueError(f"{field} is longer than {max_len} characters")
+        row[field] = value
+
+    try:
+        row["base_price"] = round(float(record.get("base_price")), 2)
+    except (TypeError, ValueError):
+        raise ValueError("base_price must be a number")
+    if not row["base_price"] > 0:
+        raise ValueError("base_price must be positive")
+
+    if not record.get("departure_at"):
+        raise ValueError("departure_at is required")
+    try:
+        row["departure_at"] = _utc(record["departure_at"])
+        row["arrival_at"] = _utc(record["arrival_at"]) if record.get("arrival_at") else None
+    except ValueError:
+        raise ValueError("departure_at / arrival_at must be ISO 8601 datetimes")
+    if row["arrival_at"] is not None and row["arrival_at"] <= row["departure_at"]:
+        raise ValueError("arrival_at must be after departure_at")
+
+    try:
+        row["capacity"] = int(record.get("capacity") or settings.DEFAULT_FLIGHT_CAPACITY)
+    except (TypeError, ValueError):
+        raise ValueError("capacity must be an integer")
+    if row["capacity"] <= 0:
+        raise ValueError("capacity must be positive")
+
+    return row
+
+
+def parse_stream(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object, Optional[dict], Optional[str]]]:
+    """
+    Yields (line_no, raw_record, row, error) one record at a time, so
+    memory stays flat however large the file is. Exactly one of row /
+    error is set.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            try:
+                yield reader.line_num, record, parse_flight(record), None
+            except ValueError as e:
+                yield reader.line_num, record, None, str(e)
+        return
+
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_no, line.rstrip("\n"), None, "invalid JSON"
+            continue
+        try:
+            yield line_no, record, parse_flight(record), None
+        except ValueError as e:
+            yield line_no, record, None, str(e)
+
+
+def write_reject(rejects: TextIO, line_no: int, raw, error: str):
+    rejects.write(json.dumps({"line": line_no, "error": error, "record": raw}, default=str) + "\n")
+
+
+# ============================================================
+# CLI
+#   python -m app.utils.catalog_import schedule.csv --rejects rejects.jsonl
+#   python -m app.utils.catalog_import --generate 200000 > schedule.csv
+# ============================================================
+_CITIES = ["Mumbai", "Delhi", "Bengaluru", "Chennai", "Hyderabad", "Kolkata", "Pune", "Ahmedabad", "Goa", "Kochi", "Jaipur"]
+_AIRLINES = [("AI", "Air India"), ("6E", "IndiGo"), ("UK", "Vistara"), ("SG", "SpiceJet"), ("G8", "GoAir")]
+
+
+def generate_schedule(out: TextIO, n: int):
+    """Synthetic CSV schedule for load testing: ~n instances over the coming year."""
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    rng = random.Random(42)
+    for i in range(n):
+        code, airline = _AIRLINES[i % len(_AIRLINES)]
+        dep, arr = rng.sample(_CITIES, 2)
+        departure_at = start + timedelta(minutes=15 * (i // 500))
+        writer.writerow([
+            f"{code}-{i % 500 + 1000}", airline, dep, arr, round(rng.uniform(2000, 9000), 2),
+            departure_at.isoformat(), (departure_at + timedelta(minutes=rng.randint(60, 240))).isoformat(),
+            180,
+        ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a CSV / JSON-lines flight schedule into the catalog")
+    parser.add_argument("path", nargs="?", help="schedule file ('-' for stdin)")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--rejects", default="rejects.jsonl", help="where bad rows go (JSON lines)")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--generate", type=int, metavar="N", help="write a synthetic N-row CSV to stdout instead")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_schedule(sys.stdout, args.generate)
+        return
+    if not args.path:
+        parser.error("path is required")
+
+    from .. import crud
+    from ..database import Base, SessionLocal, engine
+    from ..migrations import upgrade_schema
+
+    def progress(stats):
+        print(
+            f"\r{stats['rows']:>10} rows  {stats['rejected']:>7} rejected  {stats['rows_per_sec']:>9.0f} rows/s",
+            end="", file=sys.stderr, flush=True,
+        )
+
+    fmt = args.format or detect_format(args.path)
+    # same schema steps as app startup: an older database needs its new columns first
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    db = SessionLocal()
+    try:
+        with stream, open(args.rejects, "w", encoding="utf-8") as rejects:
+            stats = crud.import_flights(db, stream, fmt, rejects, chunk_size=args.chunk_size, progress=progress)
+    finally:
+        db.close()
+
+    print(file=sys.stderr)
+    print(json.dumps(stats))
+    if stats["rejected"]:
+        print(f"rejected rows written to {args.rejects}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# backend/app/utils/db_pool.py
+
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from ..config import settings
+from .stats import percentiles
+
+LIVENESS_MODES = ("always", "idle", "off")
+
+
+# ============================================================
+# METRICS
+# ============================================================
+class PoolMetrics:
+    """Checkout counters and wait times for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.liveness_pings = 0
+        self._waits = deque(maxlen=2048)   # seconds spent in pool checkout
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self._waits.append(seconds)
+
+    def stats(self, pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "liveness": settings.DB_POOL_LIVENESS,
+                "liveness_pings": self.liveness_pings,
+                "checkout_wait_ms": percentiles(waits),
+            }
+
+
+# ============================================================
+# INSTRUMENTED POOLS
+# ============================================================
+class _InstrumentedPoolMixin:
+    """Times the wait for a free connection (queue wait + overflow connect)."""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.incr("timeouts")
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# ============================================================
+# ENGINE SETUP
+# ============================================================
+def pool_kwargs(is_async: bool = False) -> dict:
+    """create_engine / create_async_engine pool arguments from settings."""
+    if settings.DB_POOL_LIVENESS not in LIVENESS_MODES:
+        raise RuntimeError(f"DB_POOL_LIVENESS must be one of {', '.join(LIVENESS_MODES)}")
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # "always" = SQLAlchemy's ping on every checkout (one extra round trip each)
+        "pool_pre_ping": settings.DB_POOL_LIVENESS == "always",
+    }
+
+
+_metrics: Dict[str, tuple] = {}   # name -> (engine, PoolMetrics)
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """Attach metrics (and the idle liveness check, if enabled) to an engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics(name)
+    sync_engine.pool.metrics = metrics
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, record):
+        metrics.incr("connects")
+        record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, record):
+        metrics.incr("checkins")
+        record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, record, exception):
+        metrics.incr("invalidations")
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, record, proxy):
+        metrics.incr("checkouts")
+
+        if settings.DB_POOL_LIVENESS != "idle":
+            return
+
+        # Only connections idle long enough to have been dropped
+        # (server wait_timeout, NAT, failover) pay for a ping.
+        idle = time.monotonic() - record.info.get("last_used", 0.0)
+        if idle < settings.DB_POOL_PING_IDLE_SECONDS:
+            return
+
+        metrics.incr("liveness_pings")
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # the pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError(f"Idle connection failed liveness ping: {e}") from e
+
+    _metrics[name] = (sync_engine, metrics)
+    return metrics
+
+
+def pool_stats() -> dict:
+    return {name: metrics.stats(engine.pool) for name, (engine, metrics) in _metrics.items()}
@@ -0,0 +1,130 @@
+# backend/app/utils/db_routing.py
+
+import itertools
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+
+ROUTING_STRATEGIES = ("round_robin", "least_loaded")
+
+
+# ============================================================
+# REPLICA SELECTION
+# ============================================================
+class ReplicaSelector:
+    """Picks a replica engine per session: round robin or fewest checked-out connections."""
+
+    def __init__(self, engines: Sequence, strategy: str = settings.DB_REPLICA_STRATEGY):
+        if strategy not in ROUTING_STRATEGIES:
+            raise RuntimeError(f"DB_REPLICA_STRATEGY must be one of {', '.join(ROUTING_STRATEGIES)}")
+        self.engines = list(engines)
+        self.strategy = strategy
+        self._next = itertools.count()
+
+    def pick(self):
+        if self.strategy == "least_loaded":
+            return min(self.engines, key=lambda e: e.pool.checkedout())
+        return self.engines[next(self._next) % len(self.engines)]
+
+
+# ============================================================
+# ROUTING SESSION
+# ============================================================
+class RoutingSession(Session):
+    """
+    Everything goes to the primary unless the session is inside
+    `use_replica(...)`; then reads go to one replica, chosen once per
+    session so a request sees a single consistent replica. Flushes
+    always go to the primary.
+    """
+
+    def __init__(self, *args, primary=None, replicas: ReplicaSelector = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replicas and self.info.get("read_replica") and not self._flushing:
+            replica = self.info.get("replica_engine")
+            if replica is None:
+                replica = self.info["replica_engine"] = self.replicas.pick()
+            return replica
+        return self.primary
+
+
+@contextmanager
+def use_replica(db):
+    """Route this session's reads to a replica for the duration of the block."""
+    info = db.info
+    previous = info.get("read_replica", False)
+    info["read_replica"] = True
+    try:
+        yield db
+    finally:
+        info["read_replica"] = previous
+
+
+# ============================================================
+# READ-YOUR-WRITES STICKINESS
+# ============================================================
+# Carried by the client, not held in any one process: a response to a
+# write sets the LAST_WRITE cookie and header (wall-clock time of the
+# write), and a request sending one younger than DB_STICKY_SECONDS
+# (longer than normal replica lag) reads from the primary, whichever
+# worker or instance serves it.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+class WriteClock:
+    """Per-request: when this client last wrote, and whether this request did."""
+
+    __slots__ = ("last_write", "wrote")
+
+    def __init__(self, last_write: Optional[float] = None):
+        self.last_write = last_write
+        self.wrote = False
+
+
+_clock: ContextVar[Optional[WriteClock]] = ContextVar("db_write_clock", default=None)
+
+
+def parse_last_write(value: Optional[str], now: float = None) -> Optional[float]:
+    """Client-sent timestamp → float; junk and future times are ignored."""
+    now = time.time() if now is None else now
+    try:
+        stamp = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(stamp) or stamp > now + 1:
+        return None
+    return stamp
+
+
+def begin_request(last_write: Optional[float] = None) -> WriteClock:
+    """Start tracking writes for the current request (middleware)."""
+    clock = WriteClock(last_write)
+    _clock.set(clock)
+    return clock
+
+
+def note_write():
+    clock = _clock.get()
+    if clock is not None:
+        clock.last_write = time.time()
+        clock.wrote = True
+
+
+def reads_need_primary() -> bool:
+    clock = _clock.get()
+    return (
+        clock is not None
+        and clock.last_write is not None
+        and time.time() - clock.last_write < settings.DB_STICKY_SECONDS
+    )
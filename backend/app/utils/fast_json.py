@@ -0,0 +1,43 @@
+# backend/app/utils/fast_json.py
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:   # optional: stdlib json is correct, just slower
+    orjson = None
+
+
+# ============================================================
+# ENCODING
+# ============================================================
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Plain dicts/lists → JSON bytes; datetimes as ISO 8601 like Pydantic."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSONResponse for payloads that are already plain dicts: skips
+    response_model validation, so only return data shaped like the
+    route's declared model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,69 @@
+# backend/app/utils/idempotency.py
+
+import hashlib
+import json
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def request_fingerprint(payload) -> str:
+    """Same key + different body is a client bug, not a retry."""
+    data = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+async def run_idempotent(
+    db,
+    scope: str,
+    key: str,
+    payload,
+    handler: Callable[[], Awaitable[object]],
+    status_code: int = 200,
+    response_model=None,
+) -> JSONResponse:
+    """
+    Run `handler` at most once per (scope, key).
+
+    A retry of a finished request gets the stored response back from a
+    single indexed lookup; the handler (pricing, wallet, PNR...) is not
+    run again. A retry while the first attempt is still running gets 409.
+    Failed attempts release the key so the client can retry.
+
+    The stored response is a replay cache, committed after the handler's
+    own transaction. Exactly-once needs the handler to commit the key with
+    its write too (bookings carry it on the row), so a retry after a
+    crash, or after the claim expires, finds the write already made.
+    """
+    from .. import crud_async
+
+    try:
+        record = await crud_async.claim_idempotency_key(db, scope, key, request_fingerprint(payload))
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+    if record is not None:
+        if record.status_code is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+        return JSONResponse(
+            content=json.loads(record.response_body),
+            status_code=record.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        result = await handler()
+    except Exception:
+        await crud_async.release_idempotency_key(db, scope, key)
+        raise
+    # not on cancellation: the worker thread may still commit the write,
+    # so the claim stays until IDEMPOTENCY_LOCK_SECONDS runs out
+
+    if response_model is not None:
+        result = response_model.model_validate(result)
+    body = jsonable_encoder(result)
+
+    await crud_async.complete_idempotency_key(db, scope, key, status_code, json.dumps(body))
+    return JSONResponse(content=body, status_code=status_code)
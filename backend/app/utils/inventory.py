@@ -0,0 +1,85 @@
+# backend/app/utils/inventory.py
+
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+from ..config import settings
+
+SEATS_PER_ROW = 6
+SEAT_LETTERS = "ABCDEF"
+_SEAT_RE = re.compile(r"^(\d{1,3})([A-F])$")
+
+
+class FareBucket(NamedTuple):
+    code: str
+    share: float        # fraction of capacity sold in this bucket
+    multiplier: float   # applied on top of the surge-adjusted price
+
+
+def parse_fare_buckets(spec: str) -> List[FareBucket]:
+    """'SAVER:0.4:1.0,FLEX:0.6:1.3' → buckets in sell order (cheapest first)."""
+    buckets = []
+    for part in spec.split(","):
+        code, share, multiplier = part.strip().split(":")
+        buckets.append(FareBucket(code.upper(), float(share), float(multiplier)))
+    return buckets
+
+
+FARE_BUCKETS = parse_fare_buckets(settings.FARE_BUCKETS)
+BUCKET_RANK = {b.code: rank for rank, b in enumerate(FARE_BUCKETS)}
+BUCKET_MULTIPLIER = {b.code: b.multiplier for b in FARE_BUCKETS}
+
+
+def _split(total: int, weights: List[float]) -> List[int]:
+    """Largest-remainder split of `total` by `weights` (sums exactly to total)."""
+    weight_sum = sum(weights) or 1.0
+    raw = [total * w / weight_sum for w in weights]
+    counts = [int(r) for r in raw]
+    by_remainder = sorted(range(len(raw)), key=lambda i: raw[i] - counts[i], reverse=True)
+    for i in by_remainder[: total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def inventory_rows(flight_id: int, capacity: int, shards: int = None) -> List[dict]:
+    """
+    Seat counters for a new flight: capacity split across fare buckets,
+    each bucket split across `shards` rows so concurrent bookers
+    decrement different rows instead of queueing on one.
+    """
+    shards = shards or settings.SEAT_INVENTORY_SHARDS
+    rows = []
+    bucket_seats = _split(capacity, [b.share for b in FARE_BUCKETS])
+
+    for bucket, seats in zip(FARE_BUCKETS, bucket_seats):
+        for shard, count in enumerate(_split(seats, [1.0] * shards)):
+            if count:
+                rows.append({
+                    "flight_id": flight_id,
+                    "fare_bucket": bucket.code,
+                    "shard": shard,
+                    "seats_available": count,
+                })
+    return rows
+
+
+@lru_cache(maxsize=None)
+def opening_bucket(capacity: int) -> Optional[str]:
+    """The bucket a new flight's first seat sells in (None without seats)."""
+    rows = inventory_rows(None, capacity, shards=1)
+    return rows[0]["fare_bucket"] if rows else None
+
+
+def validate_seat(seat_number: str, capacity: int) -> str:
+    """Normalize '12a' → '12A' and check it exists on this aircraft."""
+    seat = seat_number.strip().upper()
+    match = _SEAT_RE.match(seat)
+    if not match:
+        raise ValueError("Invalid seat number (expected e.g. 12A)")
+
+    row, letter = int(match.group(1)), match.group(2)
+    index = (row - 1) * SEATS_PER_ROW + SEAT_LETTERS.index(letter)
+    if row < 1 or index >= capacity:
+        raise ValueError("Seat does not exist on this flight")
+    return seat
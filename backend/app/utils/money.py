@@ -0,0 +1,17 @@
+# backend/app/utils/money.py
+
+from decimal import Decimal, ROUND_HALF_UP
+
+# Wallet amounts are stored as integer minor units (paise): no float drift.
+MINOR_PER_UNIT = 100
+
+
+def to_minor(amount) -> int:
+    """₹ amount (float/str/Decimal) → paise, rounded half-up."""
+    value = Decimal(str(amount)) * MINOR_PER_UNIT
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor(minor: int) -> float:
+    """Paise → ₹ for display / JSON."""
+    return float(Decimal(minor or 0) / MINOR_PER_UNIT)
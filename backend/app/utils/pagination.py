@@ -0,0 +1,74 @@
+# backend/app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+# ============================================================
+# OPAQUE CURSORS
+# ============================================================
+def encode_cursor(*values) -> str:
+    """Pack the sort key of the last row into a URL-safe token."""
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+# ============================================================
+# KEYSET PAGINATION
+# ============================================================
+def _after(columns, values, descending: bool):
+    """
+    (c1, c2, ...) strictly after (v1, v2, ...) in sort order,
+    expanded to OR/AND so MySQL can range-scan the composite index.
+    """
+    clauses = []
+    for i, (col, val) in enumerate(zip(columns, values)):
+        step = col < val if descending else col > val
+        equal_prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns, limit: int, cursor: str = None, descending: bool = False):
+    """
+    Returns (rows, next_cursor). `columns` must form a unique sort key
+    backed by an index (e.g. (booking_time, id)); every page then costs
+    one index range scan of `limit + 1` rows regardless of depth.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        query = query.filter(_after(columns, values, descending))
+
+    order = [c.desc() for c in columns] if descending else list(columns)
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(*(getattr(last, c.key) for c in columns))
+
+    return rows, next_cursor
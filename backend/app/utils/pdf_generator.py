@@ -1,11 +1,10 @@
-import os
+import io
 from reportlab.lib.pagesizes import landscape, A5
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
 
-PDF_OUTPUT_DIR = "generated_tickets"
-os.makedirs(PDF_OUTPUT_DIR, exist_ok=True)
+PAGE_SIZE = landscape(A5)
 
 
 def draw_header(c, width, height):
@@ -27,12 +26,9 @@ def draw_stub_divider(c, width, height):
     c.setDash()  # reset dash
 
 
-def generate_ticket_pdf(booking, flight):
-    filename = f"{booking.pnr}.pdf"
-    filepath = os.path.join(PDF_OUTPUT_DIR, filename)
-
-    c = canvas.Canvas(filepath, pagesize=landscape(A5))
-    width, height = landscape(A5)
+def draw_ticket(c, booking, flight):
+    """Draws one boarding pass on the current page of canvas `c`."""
+    width, height = PAGE_SIZE
 
     # --------------------------------------------------------------------
     # HEADER
@@ -114,5 +110,11 @@ def generate_ticket_pdf(booking, flight):
     c.setFont("Helvetica-Oblique", 10)
     c.drawString(20, 20, "Thank you for choosing FlightEasy. Have a pleasant journey!")
 
+
+def render_ticket_pdf(booking, flight) -> bytes:
+    """Single-page ticket rendered in memory."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+    draw_ticket(c, booking, flight)
     c.save()
-    return filepath
+    return buffer.getvalue()
@@ -0,0 +1,130 @@
+# backend/app/utils/pnr.py
+
+import hashlib
+import os
+import socket
+import threading
+import time
+from uuid import uuid4
+
+from ..config import settings
+
+# Crockford base32: no I, L, O, U → nothing to misread on a ticket
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+EPOCH = 1704067200          # 2024-01-01T00:00:00Z
+TIME_BITS = 30              # seconds since EPOCH (~34 years)
+WORKER_BITS = 8             # 256 concurrent allocators
+SEQ_BITS = 12               # 4096 PNRs per worker per second
+TOTAL_BITS = TIME_BITS + WORKER_BITS + SEQ_BITS
+CODE_LENGTH = TOTAL_BITS // 5
+
+_MASK = (1 << TOTAL_BITS) - 1
+# Odd multiplier → bijection mod 2**TOTAL_BITS; consecutive ids look unrelated
+_MULTIPLIER = 0x2F3A9C6B5D1
+_XOR = 0x15A3C96E2B7B4
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(CODE_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def _default_worker_id() -> int:
+    """Fallback until a lease is held (CLIs, tests); not collision-free."""
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode()
+    return int.from_bytes(hashlib.sha1(seed).digest()[:4], "big") % (1 << WORKER_BITS)
+
+
+def _holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"[-100:]
+
+
+class PNRAllocator:
+    """
+    Snowflake-style PNR generator: (time, worker, sequence) packed into
+    50 bits, scrambled and base32-encoded. Unique across workers as long
+    as each has a distinct worker id; never queries the database.
+
+    Worker ids come from PNR_WORKER_ID, or are leased from the
+    pnr_worker_leases table at startup (see crud.lease_pnr_worker), so
+    live processes never share one.
+    """
+
+    def __init__(self, worker_id: int = None, prefix: str = "PNR"):
+        self.prefix = prefix
+        self._configured_worker = worker_id
+        self._leased_worker = None
+        self._lock = threading.Lock()
+        self._fork()
+
+    @property
+    def needs_lease(self) -> bool:
+        return self._configured_worker is None
+
+    def _fork(self):
+        # new process: its own lease identity, and the parent's lease isn't ours
+        self._pid = os.getpid()
+        self.holder = _holder()
+        self._leased_worker = None
+        self._reset()
+
+    def _reset(self):
+        worker = self._configured_worker
+        if worker is None:
+            worker = self._leased_worker if self._leased_worker is not None else _default_worker_id()
+        self.worker_id = worker % (1 << WORKER_BITS)
+        self._last_ts = -1
+        self._seq = 0
+
+    def use_worker_id(self, worker_id: int):
+        """Switch to a worker id leased from the database."""
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._fork()
+            if worker_id != self._leased_worker:
+                self._leased_worker = worker_id
+                self._reset()
+
+    def next(self) -> str:
+        with self._lock:
+            # forked child: don't replay the parent's sequence or reuse its lease
+            if os.getpid() != self._pid:
+                self._fork()
+
+            ts = int(time.time()) - EPOCH
+
+            if ts <= self._last_ts:
+                # same second, or clock went backwards: continue from last
+                ts = self._last_ts
+                self._seq += 1
+                if self._seq >= (1 << SEQ_BITS):
+                    # sequence exhausted: borrow the next second
+                    ts += 1
+                    self._seq = 0
+            else:
+                self._seq = 0
+
+            self._last_ts = ts
+            raw = (
+                ((ts % (1 << TIME_BITS)) << (WORKER_BITS + SEQ_BITS))
+                | (self.worker_id << SEQ_BITS)
+                | self._seq
+            )
+
+        scrambled = ((raw * _MULTIPLIER) & _MASK) ^ _XOR
+        return f"{self.prefix}{_encode(scrambled)}"
+
+
+_allocator = PNRAllocator(worker_id=settings.PNR_WORKER_ID)
+
+
+def get_pnr_allocator() -> PNRAllocator:
+    return _allocator
+
+
+def next_pnr() -> str:
+    return _allocator.next()
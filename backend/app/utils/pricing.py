@@ -1,64 +1,232 @@
 # backend/app/utils/pricing.py
 
+import threading
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from .. import models
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
 from ..config import settings
+from .inventory import BUCKET_MULTIPLIER
+from .surge import SurgeState, get_surge_engine
 
 
-def compute_dynamic_price(db: Session, flight: models.Flight):
-    """
-    Public wrapper to compute surge pricing using rules:
+# ============================================================
+# STRATEGIES
+# ============================================================
+class PriceContext:
+    """Everything a strategy may look at besides the flight itself."""
+
+    __slots__ = ("now", "surge", "fare_bucket")
+
+    def __init__(self, now: datetime, surge: Optional[SurgeState] = None, fare_bucket: str = None):
+        self.now = now
+        self.surge = surge
+        self.fare_bucket = fare_bucket
+
 
-    - Surge triggers when >=SURGE_ATTEMPTS attempts occur inside SURGE_WINDOW_MINUTES.
-    - Surge lasts SURGE_DURATION_MINUTES (price = base_price * SURGE_MULTIPLIER).
+class PricingStrategy:
+    """
+    One pricing rule, expressed as a multiplier on base_price.
+    Must be O(1) and must not touch the database: inputs arrive
+    through the flight and the PriceContext.
     """
-    now = datetime.utcnow()
 
-    lookback = timedelta(minutes=settings.SURGE_DURATION_MINUTES)
-    window = timedelta(minutes=settings.SURGE_WINDOW_MINUTES)
+    name = "base"
 
-    attempts = (
-        db.query(models.PricingAttempt.attempt_time)
-        .filter(models.PricingAttempt.flight_id == flight.id)
-        .filter(models.PricingAttempt.attempt_time >= now - lookback)
-        .order_by(models.PricingAttempt.attempt_time.asc())
-        .all()
-    )
+    def multiplier(self, flight, ctx: PriceContext) -> float:
+        raise NotImplementedError
 
-    attempt_times = [a[0] for a in attempts]
+    def changes_at(self, flight, ctx: PriceContext) -> Optional[datetime]:
+        """When this multiplier next changes on its own (None = only on events)."""
+        return None
 
-    trigger_time = _find_surge_trigger_time(
-        attempt_times,
-        threshold=settings.SURGE_ATTEMPTS,
-        window_minutes=settings.SURGE_WINDOW_MINUTES
-    )
 
-    if trigger_time:
-        expires_at = trigger_time + timedelta(minutes=settings.SURGE_DURATION_MINUTES)
-        if now <= expires_at:
-            return round(flight.base_price * settings.SURGE_MULTIPLIER, 2)
+class SurgeStrategy(PricingStrategy):
+    """Demand surge; the window policy (sliding/fixed) lives in the surge engine."""
+
+    name = "surge"
 
-    return flight.base_price
+    def __init__(self, multiplier: float = settings.SURGE_MULTIPLIER):
+        self.surge_multiplier = multiplier
 
+    def multiplier(self, flight, ctx: PriceContext) -> float:
+        if ctx.surge is not None and ctx.surge.is_active(ctx.now):
+            return self.surge_multiplier
+        return 1.0
 
-def _find_surge_trigger_time(attempt_times, threshold: int, window_minutes: int):
+    def changes_at(self, flight, ctx: PriceContext) -> Optional[datetime]:
+        if ctx.surge is not None and ctx.surge.is_active(ctx.now):
+            return ctx.surge.surge_expires_at
+        return None
+
+
+class FareBucketStrategy(PricingStrategy):
     """
-    Returns the timestamp when surge triggered or None.
-    A surge triggers when threshold attempts occur within window_minutes.
+    Inventory bucket (SAVER/STANDARD/FLEX). Listings pass the bucket the
+    next seat sells in (crud.current_fare_buckets); no bucket = base fare.
     """
-    if not attempt_times:
-        return None
 
-    window = timedelta(minutes=window_minutes)
-    start = 0
+    name = "fare_bucket"
+
+    def __init__(self, multipliers: Dict[str, float] = None):
+        self.multipliers = multipliers if multipliers is not None else BUCKET_MULTIPLIER
+
+    def multiplier(self, flight, ctx: PriceContext) -> float:
+        if not ctx.fare_bucket:
+            return 1.0
+        return self.multipliers.get(ctx.fare_bucket, 1.0)
+
+
+def parse_departure_curve(spec: str):
+    """'1:1.5,7:1.15' → ([1.0, 7.0], [1.5, 1.15]) sorted by days."""
+    points = sorted(
+        (float(days), float(mult))
+        for days, mult in (part.strip().split(":") for part in spec.split(",") if part.strip())
+    )
+    return [p[0] for p in points], [p[1] for p in points]
+
+
+class TimeToDepartureStrategy(PricingStrategy):
+    """
+    Step curve on days left before departure: the first threshold at or
+    above the days left applies; beyond the last one, no markup.
+    Flights without a departure time are not affected.
+    """
+
+    name = "time_to_departure"
+
+    def __init__(self, curve: str = settings.PRICING_DEPARTURE_CURVE):
+        self.thresholds, self.multipliers = parse_departure_curve(curve)
+
+    def multiplier(self, flight, ctx: PriceContext) -> float:
+        departure_at = getattr(flight, "departure_at", None)
+        if departure_at is None:
+            return 1.0
+
+        idx = bisect_left(self.thresholds, self._days_left(departure_at, ctx.now))
+        return self.multipliers[idx] if idx < len(self.multipliers) else 1.0
+
+    def changes_at(self, flight, ctx: PriceContext) -> Optional[datetime]:
+        departure_at = getattr(flight, "departure_at", None)
+        if departure_at is None:
+            return None
+
+        # next step down the curve: when days_left drops to the threshold below
+        idx = bisect_left(self.thresholds, self._days_left(departure_at, ctx.now))
+        if idx == 0:
+            return None
+        return departure_at - timedelta(days=self.thresholds[idx - 1])
 
-    for end in range(len(attempt_times)):
-        while attempt_times[end] - attempt_times[start] > window:
-            start += 1
+    @staticmethod
+    def _days_left(departure_at: datetime, now: datetime) -> float:
+        return (departure_at - now).total_seconds() / 86400
 
-        if end - start + 1 >= threshold:
-            # Trigger time is time of latest attempt in window
-            return attempt_times[end]
 
-    return None
+STRATEGIES = {
+    SurgeStrategy.name: SurgeStrategy,
+    FareBucketStrategy.name: FareBucketStrategy,
+    TimeToDepartureStrategy.name: TimeToDepartureStrategy,
+}
+
+
+def build_strategies(spec: str) -> List[PricingStrategy]:
+    """'surge,fare_bucket' → strategy instances, in order."""
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown pricing strategies: {', '.join(unknown)}")
+    return [STRATEGIES[name]() for name in names]
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+class PriceSnapshot(NamedTuple):
+    price: float
+    surge_expires_at: Optional[datetime]   # set while surge is active
+    refresh_at: Optional[datetime]         # next self-driven price change
+
+
+class PricingEngine:
+    """
+    The single place prices come from: base_price times each
+    strategy's multiplier. Surge state is fetched in one batch per
+    call, so pricing a page costs O(1) per flight.
+    """
+
+    def __init__(self, strategies: Sequence[PricingStrategy]):
+        self.strategies = list(strategies)
+        self._needs_surge = any(isinstance(s, SurgeStrategy) for s in self.strategies)
+
+    def _price(self, flight, ctx: PriceContext) -> float:
+        price = flight.base_price
+        for strategy in self.strategies:
+            price *= strategy.multiplier(flight, ctx)
+        return round(price, 2)
+
+    def price(self, flight, fare_bucket: str = None, now: datetime = None) -> float:
+        now = now or datetime.utcnow()
+        surge = get_surge_engine().get_state(flight.id, now) if self._needs_surge else None
+        return self._price(flight, PriceContext(now, surge, fare_bucket))
+
+    def price_many(self, flights, now: datetime = None) -> List[float]:
+        """List prices for many flights, in input order."""
+        now = now or datetime.utcnow()
+        states = get_surge_engine().get_states([f.id for f in flights], now) if self._needs_surge else {}
+
+        ctx = PriceContext(now)
+        prices = []
+        for flight in flights:
+            ctx.surge = states.get(flight.id)
+            prices.append(self._price(flight, ctx))
+        return prices
+
+    def snapshot_many(self, flights, now: datetime = None, fare_buckets: Dict[int, str] = None) -> List[PriceSnapshot]:
+        """
+        Prices plus how long each stays valid (for the flight_prices
+        table), each in the flight's entry of `fare_buckets` if given.
+        """
+        now = now or datetime.utcnow()
+        states = get_surge_engine().get_states([f.id for f in flights], now) if self._needs_surge else {}
+        fare_buckets = fare_buckets or {}
+
+        ctx = PriceContext(now)
+        snapshots = []
+        for flight in flights:
+            ctx.surge = states.get(flight.id)
+            ctx.fare_bucket = fare_buckets.get(flight.id)
+            changes = [t for t in (s.changes_at(flight, ctx) for s in self.strategies) if t is not None]
+            surge_active = ctx.surge is not None and ctx.surge.is_active(now)
+            snapshots.append(PriceSnapshot(
+                price=self._price(flight, ctx),
+                surge_expires_at=ctx.surge.surge_expires_at if surge_active else None,
+                refresh_at=min(changes) if changes else None,
+            ))
+        return snapshots
+
+
+_engine = PricingEngine(build_strategies(settings.PRICING_STRATEGIES))
+_stale = set()   # flight ids whose flight_prices row must be recomputed
+_stale_lock = threading.Lock()
+
+
+def get_pricing_engine() -> PricingEngine:
+    return _engine
+
+
+def set_pricing_engine(engine: PricingEngine):
+    global _engine
+    _engine = engine
+
+
+def mark_prices_stale(flight_ids: Iterable[int]):
+    """Surge listener: queue flights for the next snapshot refresh."""
+    with _stale_lock:
+        _stale.update(flight_ids)
+
+
+def drain_stale_prices() -> List[int]:
+    global _stale
+    with _stale_lock:
+        ids, _stale = list(_stale), set()
+    return ids
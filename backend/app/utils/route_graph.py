@@ -0,0 +1,250 @@
+# backend/app/utils/route_graph.py
+
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+
+SORT_MODES = ("cheapest", "fastest")
+
+
+# ============================================================
+# EDGES
+# ============================================================
+class FlightEdge(NamedTuple):
+    """One dated flight instance; attribute names match models.Flight."""
+
+    id: int
+    flight_id: str
+    airline: str
+    departure_city: str
+    arrival_city: str
+    departure_city_id: int
+    arrival_city_id: int
+    base_price: float
+    departure_at: datetime
+    arrival_at: datetime
+
+    @classmethod
+    def from_flight(cls, f) -> Optional["FlightEdge"]:
+        """None for flights that can't be part of an itinerary (undated / unlinked)."""
+        if None in (f.departure_at, f.arrival_at, f.departure_city_id, f.arrival_city_id):
+            return None
+        return cls(
+            f.id, f.flight_id, f.airline, f.departure_city, f.arrival_city,
+            f.departure_city_id, f.arrival_city_id, f.base_price, f.departure_at, f.arrival_at,
+        )
+
+
+# ============================================================
+# GRAPH
+# ============================================================
+class RouteGraph:
+    """
+    Departure city → outgoing flight instances sorted by departure time.
+
+    Writers replace a city's lists (copy-on-write) under a lock, so
+    searches read without locking. Kept in step with the catalog by
+    add/remove calls from crud rather than rebuilt per query; `sync`
+    picks up instances other processes inserted (CLI imports, other
+    workers).
+    """
+
+    def __init__(self):
+        self._out: Dict[int, Tuple[List[datetime], List[FlightEdge]]] = {}
+        self._edges: Dict[int, FlightEdge] = {}   # flight pk -> edge
+        self._watermark = 0                       # highest flights.id seen by load/sync
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._edges)
+
+    # ---------------------------------------------
+    # Maintenance
+    # ---------------------------------------------
+    def load(self, db: Session, now: datetime = None) -> int:
+        """Replace the graph with every future dated instance."""
+        now = now or datetime.utcnow()
+        # taken first: rows inserted while loading are re-read by the next sync
+        watermark = db.query(func.max(models.Flight.id)).scalar() or 0
+        flights = (
+            db.query(models.Flight)
+            .filter(models.Flight.departure_at >= now)
+            .order_by(models.Flight.departure_at, models.Flight.id)
+            .yield_per(5000)
+        )
+
+        out, edges = {}, {}
+        for f in flights:
+            edge = FlightEdge.from_flight(f)
+            if edge is None:
+                continue
+            times, city_edges = out.setdefault(edge.departure_city_id, ([], []))
+            times.append(edge.departure_at)
+            city_edges.append(edge)
+            edges[edge.id] = edge
+
+        with self._lock:
+            self._out, self._edges = out, edges
+            self._watermark = watermark
+        return len(edges)
+
+    def sync(self, db: Session, now: datetime = None) -> int:
+        """
+        Add future instances inserted since the last load/sync, read off
+        the primary key above the watermark. Rows updated in place by
+        another process are only refreshed by its own add or a reload.
+        """
+        now = now or datetime.utcnow()
+        watermark = self._watermark
+        flights = (
+            db.query(models.Flight)
+            .filter(models.Flight.id > watermark)
+            .order_by(models.Flight.id)
+            .all()
+        )
+        if not flights:
+            return 0
+
+        added = self.add(f for f in flights if f.departure_at is not None and f.departure_at >= now)
+        with self._lock:
+            self._watermark = max(self._watermark, flights[-1].id)
+        return added
+
+    def add(self, flights: Iterable) -> int:
+        """Insert or replace instances (ORM flights or FlightEdges)."""
+        new = [e for e in (f if isinstance(f, FlightEdge) else FlightEdge.from_flight(f) for f in flights) if e]
+        if not new:
+            return 0
+
+        with self._lock:
+            self._discard([e.id for e in new if e.id in self._edges])
+            by_city = {}
+            for edge in new:
+                by_city.setdefault(edge.departure_city_id, []).append(edge)
+                self._edges[edge.id] = edge
+
+            for city, added in by_city.items():
+                added.sort(key=lambda e: (e.departure_at, e.id))
+                times, old = self._out.get(city, ([], []))
+                if not old or (old[-1].departure_at, old[-1].id) <= (added[0].departure_at, added[0].id):
+                    # schedules usually arrive in departure order: append, no re-sort
+                    merged = old + added
+                    self._out[city] = (times + [e.departure_at for e in added], merged)
+                else:
+                    merged = sorted(old + added, key=lambda e: (e.departure_at, e.id))
+                    self._out[city] = ([e.departure_at for e in merged], merged)
+        return len(new)
+
+    def remove(self, flight_ids: Iterable[int]) -> int:
+        with self._lock:
+            return self._discard([fid for fid in flight_ids if fid in self._edges])
+
+    def drop_departed(self, now: datetime = None) -> int:
+        now = now or datetime.utcnow()
+        with self._lock:
+            return self._discard([e.id for e in self._edges.values() if e.departure_at < now])
+
+    # caller holds lock
+    def _discard(self, flight_ids: List[int]) -> int:
+        by_city = {}
+        for fid in flight_ids:
+            edge = self._edges.pop(fid)
+            by_city.setdefault(edge.departure_city_id, set()).add(fid)
+
+        for city, gone in by_city.items():
+            kept = [e for e in self._out[city][1] if e.id not in gone]
+            if kept:
+                self._out[city] = ([e.departure_at for e in kept], kept)
+            else:
+                del self._out[city]
+        return len(flight_ids)
+
+    # ---------------------------------------------
+    # Search
+    # ---------------------------------------------
+    def _departures(self, city: int, start: datetime, end: datetime) -> List[FlightEdge]:
+        times, edges = self._out.get(city, ((), ()))
+        return edges[bisect_left(times, start):bisect_right(times, end)]
+
+    def search(
+        self,
+        origins: Iterable[int],
+        destinations: Iterable[int],
+        depart_from: datetime,
+        depart_until: datetime,
+        price: Callable[[FlightEdge], float],
+        max_stops: int = settings.CONNECTION_MAX_STOPS,
+        sort: str = "cheapest",
+        limit: int = 5,
+    ) -> List[Tuple[FlightEdge, ...]]:
+        """
+        Best-first search over itineraries (bounded k-shortest paths):
+        the first leg departs in [depart_from, depart_until], each
+        connection leaves CONNECTION_MIN_MINUTES to
+        CONNECTION_MAX_LAYOVER_HOURS after the previous arrival, and no
+        city is visited twice. Price and elapsed time never decrease
+        as a path grows, so itineraries come off the heap in order.
+
+        Paths reaching the same city at the same time have the same
+        onward connections, so only the best `limit` of them can be part
+        of an answer: each (city, arrival time) is expanded at most
+        `limit` times. That bounds the work by the flights in the search
+        window times `limit`, however dense the graph is, without
+        dropping a later arrival that makes a connection the cheaper
+        ones miss.
+        """
+        if sort not in SORT_MODES:
+            raise ValueError(f"sort must be one of {', '.join(SORT_MODES)}")
+
+        destinations = set(destinations)
+        min_connect = timedelta(minutes=settings.CONNECTION_MIN_MINUTES)
+        max_layover = timedelta(hours=settings.CONNECTION_MAX_LAYOVER_HOURS)
+        tiebreak = itertools.count()
+        heap = []
+
+        def push(path, fare):
+            elapsed = path[-1].arrival_at - path[0].departure_at
+            key = (fare, elapsed) if sort == "cheapest" else (elapsed, fare)
+            heapq.heappush(heap, (key, next(tiebreak), path, fare))
+
+        for city in set(origins):
+            for edge in self._departures(city, depart_from, depart_until):
+                push((edge,), price(edge))
+
+        found = []
+        expanded = Counter()
+        while heap and len(found) < limit:
+            _, _, path, fare = heapq.heappop(heap)
+            last = path[-1]
+            city = last.arrival_city_id
+
+            if city in destinations:
+                found.append(path)
+                continue
+            if len(path) > max_stops or expanded[city, last.arrival_at] >= limit:
+                continue
+            expanded[city, last.arrival_at] += 1
+
+            visited = {path[0].departure_city_id}.union(e.arrival_city_id for e in path)
+            for edge in self._departures(city, last.arrival_at + min_connect, last.arrival_at + max_layover):
+                if edge.arrival_city_id not in visited:
+                    push(path + (edge,), fare + price(edge))
+
+        return found
+
+
+_graph = RouteGraph()
+
+
+def get_route_graph() -> RouteGraph:
+    return _graph
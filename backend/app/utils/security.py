@@ -0,0 +1,129 @@
+# backend/app/utils/security.py
+
+import asyncio
+import hmac
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from passlib.context import CryptContext
+
+from ..config import settings
+from .stats import percentiles
+
+
+# ============================================================
+# PASSWORD CONTEXT (single shared instance)
+# ============================================================
+# min = max = default rounds: any stored hash with a different work
+# factor is flagged by verify_and_update and rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full (caller should return 503)."""
+
+
+# ============================================================
+# BOUNDED HASHING POOL
+# ============================================================
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool, off the event loop and off
+    the shared request threadpool (bcrypt releases the GIL while hashing).
+
+    At most `workers + max_pending` jobs are admitted; beyond that new
+    requests fail fast with PasswordHasherBusy instead of queueing
+    behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._durations = deque(maxlen=1024)   # seconds spent hashing
+        self._waits = deque(maxlen=1024)       # seconds spent queued
+
+    def _timed(self, queued_at: float, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.completed += 1
+                self._waits.append(started - queued_at)
+                self._durations.append(finished - started)
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Too many concurrent password operations")
+
+        with self._lock:
+            self.in_flight += 1
+
+        future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """Returns (valid, new_hash); new_hash is set when the work factor changed."""
+        return await self._run(pwd_context.verify_and_update, password, hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            durations = sorted(self._durations)
+            waits = sorted(self._waits)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "rounds": settings.BCRYPT_ROUNDS,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_ms": percentiles(durations),
+                "queue_wait_ms": percentiles(waits),
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+# ============================================================
+# OPS ENDPOINTS
+# ============================================================
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Route dependency: X-Admin-Key must match ADMIN_API_KEY."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="Admin key required")
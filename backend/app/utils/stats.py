@@ -0,0 +1,13 @@
+# backend/app/utils/stats.py
+
+
+def percentiles(sorted_values) -> dict:
+    """p50/p95/p99 in milliseconds from sorted durations in seconds."""
+    if not sorted_values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+    def pick(q):
+        idx = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+        return round(sorted_values[idx] * 1000, 2)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
@@ -0,0 +1,356 @@
+# backend/app/utils/surge.py
+
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+
+
+# ============================================================
+# SURGE STATE
+# ============================================================
+class SurgeState:
+    """Read-only view of one flight's surge counters."""
+
+    __slots__ = ("attempt_count", "first_attempt_at", "surge_expires_at")
+
+    def __init__(self, attempt_count=0, first_attempt_at=None, surge_expires_at=None):
+        self.attempt_count = attempt_count
+        self.first_attempt_at = first_attempt_at
+        self.surge_expires_at = surge_expires_at
+
+    def is_active(self, now: datetime = None) -> bool:
+        now = now or datetime.utcnow()
+        return self.surge_expires_at is not None and now <= self.surge_expires_at
+
+
+# ============================================================
+# ENGINE INTERFACE
+# ============================================================
+class SurgeEngine:
+    """
+    Tracks booking attempts per flight and decides when surge is active.
+
+    Implementations must never write to the database from
+    `record_attempt` / `get_state`; persistence happens in `flush`.
+    Listeners are called with the ids of flights whose surge
+    switched on or off (used for cache invalidation).
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    def add_listener(self, fn: Callable[[List[int]], None]):
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    def _notify(self, flight_ids: List[int]):
+        if not flight_ids:
+            return
+        for fn in list(self._listeners):
+            fn(flight_ids)
+
+    def record_attempt(self, flight_id: int, now: datetime = None) -> SurgeState:
+        raise NotImplementedError
+
+    def get_state(self, flight_id: int, now: datetime = None) -> Optional[SurgeState]:
+        raise NotImplementedError
+
+    def get_states(self, flight_ids, now: datetime = None) -> Dict[int, SurgeState]:
+        """Batch lookup; flights with no recorded attempts are omitted."""
+        now = now or datetime.utcnow()
+        states = {}
+        for flight_id in flight_ids:
+            state = self.get_state(flight_id, now)
+            if state is not None:
+                states[flight_id] = state
+        return states
+
+    def load(self, db: Session) -> int:
+        """Hydrate state from `flight_attempts`. Returns rows loaded."""
+        raise NotImplementedError
+
+    def flush(self, db: Session) -> int:
+        """Write changed state back to `flight_attempts`. Returns rows written."""
+        raise NotImplementedError
+
+
+# ============================================================
+# IN-MEMORY SLIDING WINDOW ENGINE
+# ============================================================
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(dt: datetime) -> int:
+    return int((dt - _EPOCH).total_seconds())
+
+
+def _from_epoch(ts: int) -> datetime:
+    return _EPOCH + timedelta(seconds=ts)
+
+
+class InMemorySurgeEngine(SurgeEngine):
+    """
+    Process-local sliding-window counter per flight.
+
+    - Surge triggers when >= threshold attempts fall inside `window`.
+    - Surge lasts `duration` from the latest triggering attempt.
+    - Changed flights are marked dirty and written back in one
+      batch by `flush` (run from a background task).
+
+    Each flight owns a slot in flat `array`s: a ring of the last
+    `ring_size` attempt times (epoch seconds), a write head, a count
+    and the surge expiry. Memory per flight is fixed, and a new attempt
+    triggers surge iff the attempt `threshold - 1` places back in the
+    ring is still inside the window: one comparison, no scan.
+    """
+
+    def __init__(
+        self,
+        threshold: int = settings.SURGE_ATTEMPTS,
+        window_minutes: int = settings.SURGE_WINDOW_MINUTES,
+        duration_minutes: int = settings.SURGE_DURATION_MINUTES,
+        ring_size: int = settings.SURGE_RING_SIZE,
+    ):
+        super().__init__()
+        self.threshold = max(1, threshold)
+        self.window = int(timedelta(minutes=window_minutes).total_seconds())
+        self.duration = int(timedelta(minutes=duration_minutes).total_seconds())
+        self.ring_size = max(self.threshold, ring_size)
+
+        self._slots: Dict[int, int] = {}   # flight_id -> slot
+        self._times = array("q")           # ring_size epoch seconds per slot
+        self._heads = array("l")           # next write position in the ring
+        self._counts = array("l")          # attempts recorded, capped at ring_size
+        self._expires = array("q")         # surge expiry (epoch), 0 = off
+        self._empty_ring = array("q", [0]) * self.ring_size
+
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # helpers (caller holds lock)
+    # ---------------------------
+    def _window_start(self, now: int) -> int:
+        return now - self.window
+
+    def _slot(self, flight_id: int) -> int:
+        slot = self._slots.get(flight_id)
+        if slot is None:
+            slot = self._slots[flight_id] = len(self._heads)
+            self._times.extend(self._empty_ring)
+            self._heads.append(0)
+            self._counts.append(0)
+            self._expires.append(0)
+        return slot
+
+    def _push(self, slot: int, ts: int):
+        head = self._heads[slot]
+        self._times[slot * self.ring_size + head] = ts
+        self._heads[slot] = (head + 1) % self.ring_size
+        if self._counts[slot] < self.ring_size:
+            self._counts[slot] += 1
+
+    def _expire(self, flight_id: int, slot: int, now: int) -> bool:
+        """Returns True if surge just ended."""
+        expires = self._expires[slot]
+        if expires and now > expires:
+            self._expires[slot] = 0
+            self._dirty.add(flight_id)
+            return True
+        return False
+
+    def _snapshot(self, slot: int, now: int) -> SurgeState:
+        start = self._window_start(now)
+        base = slot * self.ring_size
+        head = self._heads[slot]
+
+        # newest → oldest; times are non-decreasing, so stop at the window edge
+        count = 0
+        first = None
+        for back in range(1, self._counts[slot] + 1):
+            ts = self._times[base + (head - back) % self.ring_size]
+            if ts < start:
+                break
+            count += 1
+            first = ts
+
+        expires = self._expires[slot]
+        return SurgeState(
+            attempt_count=count,
+            first_attempt_at=_from_epoch(first) if first is not None else None,
+            surge_expires_at=_from_epoch(expires) if expires else None,
+        )
+
+    # ---------------------------
+    # public API
+    # ---------------------------
+    def record_attempt(self, flight_id: int, now: datetime = None) -> SurgeState:
+        ts = _to_epoch(now or datetime.utcnow())
+
+        with self._lock:
+            slot = self._slot(flight_id)
+            ended = self._expire(flight_id, slot, ts)
+            was_active = self._expires[slot] != 0
+            self._push(slot, ts)
+
+            # Trigger (or extend) surge: is the threshold-th newest attempt in the window?
+            if self._counts[slot] >= self.threshold:
+                oldest = self._times[slot * self.ring_size + (self._heads[slot] - self.threshold) % self.ring_size]
+                if oldest >= self._window_start(ts):
+                    self._expires[slot] = ts + self.duration
+
+            self._dirty.add(flight_id)
+            flipped = ended or was_active != (self._expires[slot] != 0)
+            state = self._snapshot(slot, ts)
+
+        if flipped:
+            self._notify([flight_id])
+        return state
+
+    def get_state(self, flight_id: int, now: datetime = None) -> Optional[SurgeState]:
+        ts = _to_epoch(now or datetime.utcnow())
+
+        with self._lock:
+            slot = self._slots.get(flight_id)
+            if slot is None:
+                return None
+
+            ended = self._expire(flight_id, slot, ts)
+            state = self._snapshot(slot, ts)
+
+        if ended:
+            self._notify([flight_id])
+        return state
+
+    def get_states(self, flight_ids, now: datetime = None) -> Dict[int, SurgeState]:
+        ts = _to_epoch(now or datetime.utcnow())
+        states = {}
+        ended = []
+
+        # One lock round for the whole page
+        with self._lock:
+            for flight_id in flight_ids:
+                slot = self._slots.get(flight_id)
+                if slot is not None:
+                    if self._expire(flight_id, slot, ts):
+                        ended.append(flight_id)
+                    states[flight_id] = self._snapshot(slot, ts)
+
+        self._notify(ended)
+        return states
+
+    def load(self, db: Session) -> int:
+        now = _to_epoch(datetime.utcnow())
+        rows = db.query(models.FlightAttempt).all()
+
+        with self._lock:
+            for row in rows:
+                slot = self._slot(row.flight_id)
+
+                # Only the window start is persisted; replay the count at that instant.
+                if row.first_attempt_at:
+                    first = _to_epoch(row.first_attempt_at)
+                    if first >= self._window_start(now):
+                        for _ in range(min(row.attempt_count or 0, self.ring_size)):
+                            self._push(slot, first)
+
+                if row.surge_expires_at:
+                    expires = _to_epoch(row.surge_expires_at)
+                    if now <= expires:
+                        self._expires[slot] = expires
+
+        return len(rows)
+
+    def flush(self, db: Session) -> int:
+        now = _to_epoch(datetime.utcnow())
+        with self._lock:
+            if not self._dirty:
+                return 0
+            dirty, self._dirty = self._dirty, set()
+            pending = {fid: self._snapshot(self._slots[fid], now) for fid in dirty}
+
+        try:
+            # flights deleted since (pruned instances) would fail the FK on
+            # every flush from now on: their state is dropped, not retried
+            live = {
+                flight_id
+                for (flight_id,) in db.query(models.Flight.id).filter(models.Flight.id.in_(pending.keys()))
+            }
+            pending = {fid: state for fid, state in pending.items() if fid in live}
+
+            existing = {
+                row.flight_id: row
+                for row in db.query(models.FlightAttempt)
+                .filter(models.FlightAttempt.flight_id.in_(pending.keys()))
+                .all()
+            }
+
+            for flight_id, state in pending.items():
+                row = existing.get(flight_id)
+                if row is None:
+                    row = models.FlightAttempt(flight_id=flight_id)
+                    db.add(row)
+
+                row.attempt_count = state.attempt_count
+                row.first_attempt_at = state.first_attempt_at
+                row.surge_expires_at = state.surge_expires_at
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Retry these flights on the next flush
+            with self._lock:
+                self._dirty |= pending.keys()
+            raise
+
+        return len(pending)
+
+
+class FixedWindowSurgeEngine(InMemorySurgeEngine):
+    """
+    Same counters, but attempts are counted per aligned window
+    (e.g. 10:00-10:05, 10:05-10:10) instead of the trailing `window`.
+    Cheaper to reason about; bursts straddling a boundary don't trigger.
+    """
+
+    def _window_start(self, now: int) -> int:
+        return now - now % self.window
+
+
+SURGE_ENGINES = {
+    "sliding": InMemorySurgeEngine,
+    "fixed": FixedWindowSurgeEngine,
+}
+
+
+# ============================================================
+# ENGINE REGISTRY
+# ============================================================
+_engine: SurgeEngine = SURGE_ENGINES[settings.SURGE_WINDOW_MODE]()
+
+
+def get_surge_engine() -> SurgeEngine:
+    return _engine
+
+
+def set_surge_engine(engine: SurgeEngine):
+    """Swap the active engine (e.g. for a shared/Redis-backed one)."""
+    global _engine
+    _engine = engine
+
+
+def flush_surge_state() -> int:
+    """Background write-back entry point: one session, one commit."""
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return _engine.flush(db)
+    finally:
+        db.close()
@@ -0,0 +1,263 @@
+# backend/app/utils/ticket_export.py
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+from ..config import settings
+from . import ticket_store
+
+EXPORT_FORMATS = ("zip", "pdf")
+
+
+# ============================================================
+# WORKERS (run in the export process pool)
+# ============================================================
+def _export_chunk(chunk):
+    """Reuse stored tickets where present; render (and store) the rest."""
+    out = []
+    for fields in chunk:
+        digest = ticket_store.ticket_digest(fields)
+        path = ticket_store.ticket_path(digest)
+        if not os.path.exists(path):
+            ticket_store._render_to_store(fields, digest)
+        with open(path, "rb") as fh:
+            out.append((fields["pnr"], fh.read()))
+    return out
+
+
+# The merged PDF is drawn by a single-worker pool, so the same process
+# owns the canvas across _merge_* calls and pages arrive in batches.
+_merge_canvas = None
+
+
+def _merge_open(out_path: str):
+    global _merge_canvas
+    from reportlab.pdfgen import canvas
+    from .pdf_generator import PAGE_SIZE
+
+    # compressed page streams: the document object is all that grows
+    _merge_canvas = canvas.Canvas(out_path, pagesize=PAGE_SIZE, pageCompression=1)
+
+
+def _merge_pages(fields_batch) -> int:
+    from .pdf_generator import draw_ticket
+
+    for fields in fields_batch:
+        draw_ticket(_merge_canvas, *ticket_store._ticket_objects(fields))
+        _merge_canvas.showPage()
+    return len(fields_batch)
+
+
+def _merge_close():
+    global _merge_canvas
+    _merge_canvas.save()
+    _merge_canvas = None
+
+
+# ============================================================
+# QUERY → FIELDS
+# ============================================================
+def _booking_window(date_from: date = None, date_to: date = None):
+    # date_to is inclusive of the whole day
+    start = datetime.combine(date_from, time.min) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
+    return start, end
+
+
+def iter_ticket_fields(db, flight_id: int = None, date_from: date = None, date_to: date = None):
+    from .. import crud
+
+    start, end = _booking_window(date_from, date_to)
+    for row in crud.iter_ticket_rows(db, flight_id=flight_id, date_from=start, date_to=end):
+        fields = dict(row._mapping)
+        fields["booking_time"] = str(fields["booking_time"])
+        yield fields
+
+
+def _chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _new_pool(workers: int = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers or settings.TICKET_EXPORT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def render_many(fields_iter, workers: int = None, chunk_size: int = 25):
+    """
+    Yields (pnr, pdf_bytes) in input order, rendering chunks in parallel.
+    At most `2 * workers` chunks are in flight, so memory stays bounded
+    no matter how many tickets are exported.
+    """
+    workers = workers or settings.TICKET_EXPORT_WORKERS
+    pool = _new_pool(workers)
+    window = 2 * workers
+    in_flight = deque()
+
+    try:
+        for chunk in _chunks(fields_iter, chunk_size):
+            in_flight.append(pool.submit(_export_chunk, chunk))
+            if len(in_flight) >= window:
+                yield from in_flight.popleft().result()
+
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ============================================================
+# STREAMING OUTPUTS
+# ============================================================
+class _ZipSink(io.RawIOBase):
+    """Non-seekable write target; zipfile falls back to data descriptors."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_zip(tickets):
+    """(pnr, pdf_bytes) iterable → ZIP byte chunks, one ticket at a time."""
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for pnr, data in tickets:
+            zf.writestr(f"{pnr}.pdf", data)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_merged_pdf(fields_iter, chunk_size: int = 100, chunk_bytes: int = 64 * 1024, max_pages: int = None):
+    """
+    One multi-page PDF. Rows go to the drawing process `chunk_size` at a
+    time while the next batch is fetched, so this side never holds the
+    whole export; the finished file is then streamed back in chunks.
+
+    The drawing side does: ReportLab keeps every page of the document in
+    memory until it is saved. Past `max_pages` (TICKET_EXPORT_PDF_MAX_PAGES)
+    this raises ValueError before anything is yielded; use the ZIP export.
+    """
+    max_pages = max_pages or settings.TICKET_EXPORT_PDF_MAX_PAGES
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    pool = _new_pool(1)
+    try:
+        pool.submit(_merge_open, path).result()
+        drawing = None
+        pages = 0
+        for chunk in _chunks(fields_iter, chunk_size):
+            pages += len(chunk)
+            if pages > max_pages:
+                raise ValueError(f"Merged PDF export is limited to {max_pages} tickets; use the zip format")
+            if drawing is not None:
+                drawing.result()
+            drawing = pool.submit(_merge_pages, chunk)
+        if drawing is not None:
+            drawing.result()
+        pool.submit(_merge_close).result()
+
+        with open(path, "rb") as fh:
+            while True:
+                data = fh.read(chunk_bytes)
+                if not data:
+                    break
+                yield data
+    finally:
+        pool.shutdown(wait=False)
+        os.remove(path)
+
+
+def count_tickets(flight_id: int = None, date_from: date = None, date_to: date = None) -> int:
+    """Tickets an export with these filters would contain."""
+    from .. import crud
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return crud.count_ticket_rows(db, flight_id, *_booking_window(date_from, date_to))
+    finally:
+        db.close()
+
+
+def export_tickets(flight_id: int = None, date_from: date = None, date_to: date = None, fmt: str = "zip"):
+    """
+    Byte-chunk generator for a bulk export. Opens its own session so it
+    can be consumed after the request's session has closed.
+    """
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        fields_iter = iter_ticket_fields(db, flight_id, date_from, date_to)
+        if fmt == "pdf":
+            yield from stream_merged_pdf(fields_iter)
+        else:
+            yield from stream_zip(render_many(fields_iter))
+    finally:
+        db.close()
+
+
+# ============================================================
+# CLI
+#   python -m app.utils.ticket_export --flight 3 -o manifest.zip
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk export boarding passes")
+    parser.add_argument("--flight", type=int, help="flights.id to export")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="zip")
+    parser.add_argument("-o", "--output", required=True, help="output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.format == "pdf" and count_tickets(args.flight, args.date_from, args.date_to) > settings.TICKET_EXPORT_PDF_MAX_PAGES:
+        parser.error(f"merged PDF export is limited to {settings.TICKET_EXPORT_PDF_MAX_PAGES} tickets; use --format zip")
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    written = 0
+    try:
+        for chunk in export_tickets(args.flight, args.date_from, args.date_to, args.format):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    print(f"Wrote {written} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# backend/app/utils/ticket_store.py
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from types import SimpleNamespace
+
+from ..config import settings
+
+# Bump when the ticket layout in pdf_generator changes:
+# every digest changes, so tickets are re-rendered on next access.
+TEMPLATE_VERSION = 1
+
+
+# ============================================================
+# CONTENT ADDRESSING
+# ============================================================
+def ticket_fields(booking, flight) -> dict:
+    """Everything printed on the ticket, as plain picklable data."""
+    return {
+        "pnr": booking.pnr,
+        "passenger_name": booking.passenger_name,
+        "booking_time": str(booking.booking_time),
+        "final_price": booking.final_price,
+        "flight_id": flight.flight_id,
+        "departure_city": flight.departure_city,
+        "arrival_city": flight.arrival_city,
+    }
+
+
+def ticket_digest(fields: dict) -> str:
+    payload = json.dumps([TEMPLATE_VERSION, fields], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def ticket_path(digest: str) -> str:
+    return os.path.join(settings.TICKET_STORAGE_DIR, digest[:2], f"{digest}.pdf")
+
+
+# ============================================================
+# RENDER WORKER (runs in a separate process)
+# ============================================================
+def _ticket_objects(fields: dict):
+    booking = SimpleNamespace(
+        pnr=fields["pnr"],
+        passenger_name=fields["passenger_name"],
+        booking_time=fields["booking_time"],
+        final_price=fields["final_price"],
+    )
+    flight = SimpleNamespace(
+        flight_id=fields["flight_id"],
+        departure_city=fields["departure_city"],
+        arrival_city=fields["arrival_city"],
+    )
+    return booking, flight
+
+
+def render_fields(fields: dict) -> bytes:
+    from .pdf_generator import render_ticket_pdf
+
+    return render_ticket_pdf(*_ticket_objects(fields))
+
+
+def _render_to_store(fields: dict, digest: str) -> str:
+    path = ticket_path(digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # write-then-rename so readers never see a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(render_fields(fields))
+    os.replace(tmp, path)
+    return path
+
+
+# ============================================================
+# SCHEDULING
+# ============================================================
+_executor = None
+_pending = {}   # digest -> Future (dedupes concurrent renders)
+_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.TICKET_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def schedule_render(fields: dict, force: bool = False) -> Future:
+    """
+    Queue a background render unless the ticket is already stored.
+    Never blocks on rendering; returns a Future resolving to the file path.
+    """
+    digest = ticket_digest(fields)
+    path = ticket_path(digest)
+
+    with _lock:
+        future = _pending.get(digest)
+        if future is not None:
+            return future
+
+        if not force and os.path.exists(path):
+            done = Future()
+            done.set_result(path)
+            return done
+
+        future = _get_executor().submit(_render_to_store, fields, digest)
+        _pending[digest] = future
+
+    future.add_done_callback(lambda _f: _forget(digest))
+    return future
+
+
+def _forget(digest: str):
+    with _lock:
+        _pending.pop(digest, None)
+
+
+async def ensure_ticket(fields: dict) -> str:
+    """Path of the stored PDF, awaiting a render if it is missing."""
+    path = ticket_path(ticket_digest(fields))
+    if os.path.exists(path):
+        return path
+    return await asyncio.wrap_future(schedule_render(fields))
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
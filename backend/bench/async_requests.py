@@ -0,0 +1,172 @@
+# backend/bench/async_requests.py
+#
+# Sync (threadpool) vs async (AsyncSession) request path under load:
+# N concurrent clients listing flights through the full ASGI app.
+#
+#   DATABASE_URL=sqlite:////tmp/bench.db python -m bench.async_requests --concurrency 200
+#   python -m bench.async_requests --threadpool 10     # model a small worker threadpool
+#
+#   # network-bound: a server DB behind a proxy adding 2 ms round trip
+#   DATABASE_URL=postgresql+psycopg2://postgres@127.0.0.1:5432/bench DB_ASYNC_DRIVER=asyncpg \
+#       python -m bench.async_requests --requests 1000 --concurrency 100 --latency-ms 2
+#
+# Each mode runs in its own interpreter because DB_ASYNC is read at import.
+#
+# SQLite is a local file: each query is CPU and a lock, there is nothing
+# to wait on, and the async path only adds aiosqlite's thread hop. Against
+# a local SQLite file the two modes come out about even. The async path
+# pays off when queries wait on the network. One run on a 1-CPU box,
+# 1000 requests, 100 clients, PostgreSQL 16 over loopback TCP:
+#
+#                        sync        async
+#   +0 ms, threadpool 40  180 req/s   183 req/s   (even; async p95 is worse)
+#   +2 ms, threadpool 40  107 req/s   199 req/s
+#   +5 ms, threadpool 40   81 req/s   145 req/s
+#   +2 ms, threadpool  4  109 req/s   157 req/s
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+
+MODES = {"sync": "0", "async": "1"}
+_DEFAULT_PORTS = {"mysql": 3306, "postgresql": 5432}
+
+
+async def _load(app, args):
+    import httpx
+    from anyio import to_thread
+
+    # the threadpool sync routes and crud_async wrappers queue on
+    to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm-up: pools, search cache misses on every page below
+        await client.get("/flights", params={"limit": 10})
+
+        pending = iter(range(args.requests))
+
+        async def worker():
+            for i in pending:
+                started = time.perf_counter()
+                # distinct cursors/filters so the search cache doesn't answer everything
+                response = await client.get("/flights", params={"limit": 10, "departure_city": "Mumbai" if i % 2 else None})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    # aiosqlite / aiomysql connections must be closed on this loop
+    from app.database import async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+
+    return sorted(latencies), elapsed
+
+
+def _start_latency_proxy(host: str, port: int, latency_ms: float) -> int:
+    """
+    TCP proxy to host:port on a daemon thread, delaying every chunk by
+    half of latency_ms in each direction. Returns the local port.
+    """
+    delay = latency_ms / 2000
+    ready = threading.Event()
+    bound = []
+
+    async def pipe(reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while data := await reader.read(65536):
+                # equal delays keep the chunks in order
+                loop.call_later(delay, writer.write, data)
+        finally:
+            loop.call_later(delay, writer.close)
+
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(host, port)
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer))
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        bound.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return bound[0]
+
+
+def run_mode(args):
+    """Child process: one mode, results as one JSON line on stdout."""
+    from app.main import app, shutdown, startup
+    from app.utils.cache import get_search_cache
+    from app.utils.stats import percentiles
+
+    startup()
+    try:
+        get_search_cache().clear()
+        latencies, elapsed = asyncio.run(_load(app, args))
+    finally:
+        shutdown()
+
+    print(json.dumps({
+        "mode": args.mode,
+        "requests": len(latencies),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "latency_ms": percentiles(latencies),
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync vs async request path throughput")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--threadpool", type=int, default=40, help="threadpool size (Starlette default: 40)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="round trip added to every DB connection (server DBs only)")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///bench_async.db")
+    # the cache would hide the DB path entirely
+    env.setdefault("SEARCH_CACHE_TTL_SECONDS", "0")
+
+    if args.latency_ms:
+        url = make_url(env["DATABASE_URL"])
+        if url.get_backend_name() == "sqlite":
+            parser.error("--latency-ms needs a server database (DATABASE_URL)")
+        proxy_port = _start_latency_proxy(url.host or "127.0.0.1", url.port or _DEFAULT_PORTS[url.get_backend_name()], args.latency_ms)
+        env["DATABASE_URL"] = url.set(host="127.0.0.1", port=proxy_port).render_as_string(hide_password=False)
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent clients, threadpool {args.threadpool}, "
+          f"+{args.latency_ms:g} ms DB round trip")
+    for mode, flag in MODES.items():
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.async_requests", *(argv or sys.argv[1:]), "--mode", mode],
+            env={**env, "DB_ASYNC": flag},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(out)
+        lat = result["latency_ms"]
+        print(f"{mode:<6} {result['req_per_sec']:>9.1f} req/s   p50 {lat['p50']:>8.1f} ms   p95 {lat['p95']:>8.1f} ms   p99 {lat['p99']:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# backend/bench/booking_history.py
+#
+# Booking history page: ORM objects + Pydantic validation + jsonable_encoder
+# (the old path) vs crud.get_booking_history row tuples + fast_json.
+#
+#   python -m bench.booking_history --bookings 10000
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload
+
+from app import crud, models, schemas
+from app.database import Base
+from app.utils.fast_json import dumps, orjson
+from app.utils.pagination import keyset_page
+from app.utils.pricing import get_pricing_engine
+
+
+def _seed(db, n: int) -> int:
+    flights = [
+        models.Flight(
+            flight_id=f"BENCH{i}",
+            airline="Bench Air",
+            departure_city="Mumbai",
+            arrival_city="Delhi",
+            base_price=4000.0 + i,
+        )
+        for i in range(50)
+    ]
+    user = models.User(username="bench", email="bench@example.com", password_hash="x")
+    db.add_all(flights + [user])
+    db.flush()
+
+    db.bulk_insert_mappings(models.Booking, [
+        {
+            "pnr": f"B{i:09d}",
+            "passenger_name": f"Passenger {i}",
+            "flight_id": flights[i % len(flights)].id,
+            "user_id": user.id,
+            "final_price": 4000.0 + i % 500,
+            "booking_time": datetime(2024, 1, 1) + (datetime(2024, 6, 1) - datetime(2024, 1, 1)) * i / n,
+            "fare_bucket": "SAVER",
+        }
+        for i in range(n)
+    ])
+    db.commit()
+    crud.backfill_flight_prices(db)
+    return user.id
+
+
+def legacy_bookings(db, user_id: int, limit: int):
+    """The old history query: Booking ORM objects with their flights, priced in one batch."""
+    bookings, _ = keyset_page(
+        db.query(models.Booking)
+        .options(joinedload(models.Booking.flight))
+        .filter(models.Booking.user_id == user_id),
+        [models.Booking.booking_time, models.Booking.id],
+        limit,
+        None,
+        descending=True,
+    )
+    flights = list({b.flight.id: b.flight for b in bookings if b.flight}.values())
+    for flight, price in zip(flights, get_pricing_engine().price_many(flights)):
+        flight.price = price
+    return bookings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Booking history: ORM + Pydantic vs row tuples + fast JSON")
+    parser.add_argument("--bookings", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    adapter = TypeAdapter(list[schemas.BookingOut])
+
+    with Session(engine, expire_on_commit=False) as db:
+        user_id = _seed(db, args.bookings)
+
+        def orm_path():
+            db.expunge_all()   # cold identity map, like a fresh request session
+            bookings = legacy_bookings(db, user_id, args.bookings)
+            payload = adapter.validate_python(bookings, from_attributes=True)
+            return json.dumps(jsonable_encoder(payload)).encode()
+
+        def row_path():
+            rows, _ = crud.get_booking_history(db, user_id=user_id, limit=args.bookings)
+            return dumps(rows)
+
+        print(f"encoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+        for name, fn in (("orm + pydantic", orm_path), ("rows + fast json", row_path)):
+            best = min(_timed(fn) for _ in range(args.repeat))
+            print(f"{name:<20} {best * 1000:9.1f} ms  {len(fn()) / 1024:8.0f} KiB")
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
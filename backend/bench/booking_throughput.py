@@ -0,0 +1,140 @@
+# backend/bench/booking_throughput.py
+#
+# Bookings/sec: the old multi-commit create_booking vs the current
+# single-transaction one, against a local SQLite file or MySQL.
+#
+#   python -m bench.booking_throughput --bookings 2000
+#   BENCH_DATABASE_URL=mysql+pymysql://user:pw@localhost/bench python -m bench.booking_throughput
+#
+# The current path also claims a seat and writes a ledger entry, so it
+# does more work per booking than the old one did.
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.database import Base
+from app.utils.money import to_minor
+
+
+def legacy_create_booking(db, passenger_name: str, flight_id: int, user_id: int):
+    """create_booking before the single-transaction rewrite: a commit per step, refreshes, PNR probing."""
+    flight = db.query(models.Flight).filter(models.Flight.id == flight_id).first()
+
+    now = datetime.utcnow()
+    state = flight.attempt_state
+    if not state:
+        state = models.FlightAttempt(flight_id=flight.id, attempt_count=1, first_attempt_at=now)
+        db.add(state)
+        db.commit()
+        db.refresh(state)
+    else:
+        state.attempt_count += 1
+        db.commit()
+    final_price = flight.base_price
+
+    user = db.query(models.User).filter(models.User.id == user_id).with_for_update().first()
+    if user.wallet_balance_minor < to_minor(final_price):
+        raise ValueError("Insufficient wallet balance")
+    user.wallet_balance_minor -= to_minor(final_price)
+    db.commit()
+    db.refresh(user)
+
+    pnr = f"PNR{random.randint(100000, 999999)}"
+    while db.query(models.Booking).filter_by(pnr=pnr).first():
+        pnr = f"PNR{random.randint(100000, 999999)}"
+
+    booking = models.Booking(
+        pnr=pnr,
+        passenger_name=passenger_name,
+        flight_id=flight.id,
+        user_id=user_id,
+        final_price=round(final_price, 2),
+    )
+    db.add(booking)
+    db.commit()
+    db.refresh(booking)
+    return booking
+
+
+def _setup(url: str, bookings: int):
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with Session() as db:
+        routes = [(f"BN-{i}", "Bench Air", "Mumbai", "Delhi", 3000.0 + i) for i in range(20)]
+        rows = crud.schedule_flights(routes, days=1)
+        for row in rows:
+            row["capacity"] = bookings   # never sells out, whichever path runs
+        crud.import_flight_rows(db, rows)
+
+        user = models.User(username="bench", email="bench@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        crud.post_wallet_entry(db, user.id, to_minor(10_000 * bookings * 2), "opening")
+        db.commit()
+        return engine, Session, user.id
+
+
+def _run(engine, Session, book, bookings: int, user_id: int) -> dict:
+    counts = {"statements": 0, "commits": 0}
+
+    def on_execute(*_):
+        counts["statements"] += 1
+
+    def on_commit(_conn):
+        counts["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        started = time.perf_counter()
+        with Session() as db:
+            for i in range(bookings):
+                book(db, f"Passenger {i}", i % 20 + 1, user_id)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+
+    return {
+        "per_sec": bookings / elapsed,
+        "statements": counts["statements"] / bookings,
+        "commits": counts["commits"] / bookings,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bookings/sec: multi-commit vs single transaction")
+    parser.add_argument("--bookings", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite:///bench_booking.db")
+    paths = (
+        ("before (commit per step)", legacy_create_booking),
+        ("after (one transaction)", lambda db, name, fid, uid: crud.create_booking(db, name, fid, user_id=uid)),
+    )
+
+    print(f"{args.bookings} sequential bookings on {url.split('://')[0]}")
+    for name, book in paths:
+        engine, Session, user_id = _setup(url, args.bookings)
+        result = _run(engine, Session, book, args.bookings, user_id)
+        engine.dispose()
+        print(
+            f"{name:<26} {result['per_sec']:8.0f} bookings/s   "
+            f"{result['statements']:5.1f} statements   {result['commits']:4.1f} commits per booking"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# backend/bench/pricing_strategies.py
+#
+# Cost of each pricing strategy (and the full pipeline) over an
+# in-memory catalog; every 10th flight has a surge attempt recorded.
+#
+#   python -m bench.pricing_strategies --flights 100000
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.utils.pricing import STRATEGIES, PricingEngine
+from app.utils.surge import get_surge_engine
+
+
+def _catalog(n: int, now: datetime):
+    engine = get_surge_engine()
+    flights = []
+    for i in range(n):
+        flights.append(SimpleNamespace(
+            id=-(i + 1),   # negative ids: never collide with real flights
+            base_price=2000.0 + i % 1000,
+            departure_at=now + timedelta(hours=i % 720),
+        ))
+        if i % 10 == 0:
+            engine.record_attempt(-(i + 1), now)
+    return flights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare pricing strategy costs")
+    parser.add_argument("--flights", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    now = datetime.utcnow()
+    flights = _catalog(args.flights, now)
+
+    suites = [[name] for name in STRATEGIES] + [list(STRATEGIES)]
+    for names in suites:
+        engine = PricingEngine([STRATEGIES[name]() for name in names])
+        best = min(_timed(engine.price_many, flights, now) for _ in range(args.repeat))
+        per_flight_ns = best / len(flights) * 1e9
+        print(f"{'+'.join(names):<40} {best * 1000:9.1f} ms  {per_flight_ns:7.0f} ns/flight")
+
+
+def _timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
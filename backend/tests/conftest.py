@@ -0,0 +1,65 @@
+# backend/tests/conftest.py
+
+import os
+
+# app.database builds its engines at import time; tests use their own
+# SQLite file per test (below), so this only has to be importable.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models  # noqa: F401  (registers the tables)
+from app.database import Base
+from app.utils.cache import InMemoryCache, set_search_cache
+from app.utils.pricing import drain_stale_prices
+from app.utils.surge import InMemorySurgeEngine, set_surge_engine
+
+ROUTES = [
+    ("AI-101", "Air India", "Mumbai", "Delhi", 2500.0),
+    ("6E-303", "IndiGo", "Mumbai", "Bengaluru", 2550.0),
+    ("UK-505", "Vistara", "Hyderabad", "Delhi", 2300.0),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # timeout: concurrent writers wait for SQLite's file lock instead of failing
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=20,
+        max_overflow=20,
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    """Process-wide engines (surge, search cache, stale prices) start empty per test."""
+    set_surge_engine(InMemorySurgeEngine())
+    set_search_cache(InMemoryCache())
+    drain_stale_prices()
+    yield
+
+
+def seed_schedule(db, days: int = 7, routes=ROUTES):
+    """Daily dated instances of ROUTES through the bulk import path."""
+    return crud.import_flight_rows(db, crud.schedule_flights(routes, days=days))
@@ -0,0 +1,59 @@
+# backend/tests/test_booking_idempotency.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import crud, models
+from app.utils.idempotency import run_idempotent
+from app.utils.money import to_minor
+
+from .conftest import seed_schedule
+
+
+def _user(db, balance=10000):
+    user = models.User(username="u", email="u@x", password_hash="-")
+    db.add(user)
+    db.flush()
+    crud.post_wallet_entry(db, user.id, to_minor(balance), "opening")
+    db.commit()
+    return user
+
+
+def test_concurrent_retries_with_one_key_book_and_charge_once(db, session_factory):
+    seed_schedule(db, days=1)
+    user = _user(db)
+
+    def book(i):
+        session = session_factory()
+        try:
+            return crud.create_booking(session, "P", flight_id=1, user_id=user.id, idempotency_key="k").pnr
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        pnrs = set(pool.map(book, range(16)))
+
+    db.expire_all()
+    assert len(pnrs) == 1
+    assert db.query(models.Booking).count() == 1
+    assert db.query(models.WalletEntry).filter(models.WalletEntry.kind == "booking").count() == 1
+
+    with pytest.raises(ValueError, match="different booking"):
+        crud.create_booking(db, "P", flight_id=2, user_id=user.id, idempotency_key="k")
+
+
+def test_cancelled_request_keeps_its_claim(db):
+    async def cancelled():
+        raise asyncio.CancelledError
+
+    async def run():
+        await run_idempotent(db, "bookings:1", "k", {"flight_id": 1}, cancelled)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+
+    # the booking may still commit in its worker thread: a retry must see "in progress"
+    record = db.query(models.IdempotencyKey).one()
+    assert (record.key, record.status_code) == ("k", None)
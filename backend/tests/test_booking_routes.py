@@ -0,0 +1,54 @@
+# backend/tests/test_booking_routes.py
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.database import get_session
+from app.routers import bookings
+from app.utils import ticket_store
+from app.utils.money import to_minor
+from app.utils.pricing import get_pricing_engine
+
+from .conftest import ROUTES
+
+
+def test_booking_and_hold_responses_show_the_listed_price(session_factory, db, monkeypatch):
+    monkeypatch.setattr(ticket_store, "schedule_render", lambda fields, force=False: None)
+    rows = crud.schedule_flights(ROUTES[:1], days=1)
+    rows[0]["capacity"] = 10   # SAVER 4, STANDARD 4, FLEX 2
+    crud.import_flight_rows(db, rows)
+    flight = db.query(models.Flight).one()
+    user = models.User(username="u", email="u@x", password_hash="-")
+    db.add(user)
+    db.flush()
+    crud.post_wallet_entry(db, user.id, to_minor(100000), "opening")
+    db.commit()
+
+    for i in range(4):
+        crud.create_booking(db, f"Saver {i}", flight_id=flight.id)
+    crud.refresh_due_prices(db)
+    listed = crud.get_flight(db, flight.id)["price"]
+    assert listed == round(get_pricing_engine().price(flight, "STANDARD"), 2) != round(get_pricing_engine().price(flight), 2)
+
+    def session():
+        s = session_factory()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app = FastAPI()
+    app.include_router(bookings.router)
+    app.dependency_overrides[get_session] = session
+    client = TestClient(app)
+    body = {"passenger_name": "P", "flight_id": flight.id, "user_id": user.id}
+
+    booked = client.post("/bookings", json=body)
+    assert booked.status_code == 201
+    assert booked.json()["flight"]["price"] == listed
+
+    held = client.post("/bookings/holds", json=body)
+    assert held.status_code == 201
+    assert held.json()["flight"]["price"] == listed
+    assert 0 < held.json()["expires_in"] <= crud.settings.HOLD_TTL_SECONDS
@@ -0,0 +1,25 @@
+# backend/tests/test_cities.py
+
+from app import crud, models
+
+from .conftest import seed_schedule
+
+
+def test_cities_are_found_by_iata_code(db):
+    seed_schedule(db, days=1)
+
+    assert [c.name for c in crud.search_cities(db, "bom")] == ["Mumbai"]
+    flights, _ = crud.get_flights(db, departure_city="BOM", arrival_city="del")
+    assert {(f["departure_city"], f["arrival_city"]) for f in flights} == {("Mumbai", "Delhi")}
+
+
+def test_codes_are_backfilled_for_existing_cities(db):
+    db.add_all([
+        models.City(name="Pune", search_key="pune"),
+        models.City(name="Shillong", search_key="shillong"),   # not in AIRPORT_CODES
+    ])
+    db.commit()
+
+    assert crud.backfill_city_codes(db) == 1
+    assert {c.search_key: c.code for c in db.query(models.City)} == {"pune": "PNQ", "shillong": None}
+    assert crud.backfill_city_codes(db) == 0
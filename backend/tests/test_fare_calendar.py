@@ -0,0 +1,34 @@
+# backend/tests/test_fare_calendar.py
+
+from datetime import datetime, timedelta
+
+from app import crud, models
+from app.utils.pricing import get_pricing_engine, mark_prices_stale
+
+from .conftest import ROUTES
+
+
+def _sell(db, flight_id, *buckets):
+    query = db.query(models.SeatInventory).filter(models.SeatInventory.flight_id == flight_id)
+    if buckets:
+        query = query.filter(models.SeatInventory.fare_bucket.in_(buckets))
+    query.update({models.SeatInventory.seats_available: 0}, synchronize_session=False)
+    db.commit()
+    mark_prices_stale([flight_id])
+
+
+def test_calendar_skips_sold_out_days_and_prices_the_open_bucket(db):
+    start = (datetime.utcnow().replace(day=1) + timedelta(days=32)).replace(day=1).date()   # next month
+    crud.import_flight_rows(db, crud.schedule_flights(ROUTES[:1], days=3, start=start))
+    sold_out, saver_gone, open_ = db.query(models.Flight).order_by(models.Flight.departure_at).all()
+
+    _sell(db, sold_out.id)
+    _sell(db, saver_gone.id, "SAVER")
+    crud.refresh_due_prices(db)
+
+    calendar = crud.get_fare_calendar(db, "Mumbai", "Delhi", start.strftime("%Y-%m"))
+    engine = get_pricing_engine()
+    assert [(d["date"], d["min_price"]) for d in calendar] == [
+        (saver_gone.departure_at.date(), round(engine.price(saver_gone, "STANDARD"), 2)),
+        (open_.departure_at.date(), round(engine.price(open_, "SAVER"), 2)),
+    ]
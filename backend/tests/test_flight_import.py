@@ -0,0 +1,65 @@
+# backend/tests/test_flight_import.py
+
+import asyncio
+import io
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async, models
+from app.config import settings
+from app.database import get_session
+from app.routers import flights
+
+CSV = (
+    "flight_id,airline,departure_city,arrival_city,base_price,departure_at\n"
+    "AI-101,Air India,Mumbai,Delhi,2500,2030-01-01T06:00:00\n"
+    "AI-101,Air India,Mumbai,Delhi,2500,2030-01-02T06:00:00\n"
+)
+
+
+def test_import_requires_the_admin_key(session_factory, db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "IMPORT_REJECT_DIR", str(tmp_path))
+
+    def session():
+        s = session_factory()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app = FastAPI()
+    app.include_router(flights.router)
+    app.dependency_overrides[get_session] = session
+    client = TestClient(app)
+    upload = {"file": ("schedule.csv", CSV, "text/csv")}
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "")
+    assert client.post("/flights/import", files=upload).status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "s3cret")
+    assert client.post("/flights/import", files=upload).status_code == 401
+    assert client.post("/flights/import", files=upload, headers={"X-Admin-Key": "nope"}).status_code == 401
+    assert db.query(models.Flight).count() == 0
+
+    response = client.post("/flights/import", files=upload, headers={"X-Admin-Key": "s3cret"})
+    assert response.status_code == 200 and response.json()["rows"] == 2
+    assert db.query(models.Flight).count() == 2
+
+
+def test_async_import_runs_off_the_event_loop_on_a_sync_session(session_factory, db, monkeypatch):
+    monkeypatch.setattr(crud_async, "SessionLocal", session_factory)
+    threads = []
+
+    async def run():
+        threads.append(threading.get_ident())
+        return await crud_async.import_flights(
+            AsyncSession(), io.StringIO(CSV), "csv", progress=lambda stats: threads.append(threading.get_ident()),
+        )
+
+    assert asyncio.run(run())["rows"] == 2
+    loop_thread, worker_thread = threads
+    assert worker_thread != loop_thread
+    assert db.query(models.Flight).count() == 2
@@ -0,0 +1,70 @@
+# backend/tests/test_flight_listing.py
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import crud, models
+from app.utils.surge import get_surge_engine
+
+from .conftest import ROUTES, seed_schedule
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _listing_queries(engine, db, limit: int, **filters) -> int:
+    db.expunge_all()   # cold identity map, like a fresh request session
+    with count_queries(engine) as statements:
+        flights, _ = crud.get_flights(db, limit=limit, **filters)
+    assert len(flights) == limit
+    return len(statements)
+
+
+def test_listing_costs_one_query_whatever_the_page_size(engine, db):
+    seed_schedule(db, days=30)
+
+    # surge on some flights must not add per-row work
+    for flight_id in (1, 5, 9):
+        for _ in range(5):
+            get_surge_engine().record_attempt(flight_id)
+
+    for limit in (1, 10, 50):
+        assert _listing_queries(engine, db, limit) == 1
+        assert _listing_queries(engine, db, limit, departure_city="mum") == 1
+
+
+def test_flights_missing_a_snapshot_are_priced_in_one_batch(engine, db):
+    seed_schedule(db, days=30)
+    db.query(models.FlightPrice).delete()
+    db.commit()
+
+    counts = {limit: _listing_queries(engine, db, limit) for limit in (1, 10, 50)}
+    assert counts[1] == counts[10] == counts[50]
+
+
+def test_departed_instances_are_neither_listed_nor_bookable(db):
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    crud.import_flight_rows(db, crud.schedule_flights(ROUTES, days=3, start=yesterday))
+    departed = {f.id for f in db.query(models.Flight).filter(models.Flight.departure_at < datetime.utcnow())}
+    assert len(departed) == len(ROUTES)
+
+    listed = {f["id"] for f in crud.get_flights(db, limit=50)[0]}
+    assert listed and not listed & departed
+
+    for flight_id in departed:
+        with pytest.raises(ValueError, match="Flight has departed"):
+            crud.create_booking(db, "Late", flight_id=flight_id)
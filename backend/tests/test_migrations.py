@@ -0,0 +1,97 @@
+# backend/tests/test_migrations.py
+
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, create_engine, inspect,
+)
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.database import Base
+from app.migrations import upgrade_schema
+
+# the tables as the first release created them
+legacy = MetaData()
+Table(
+    "flights", legacy,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("flight_id", String(50), unique=True, nullable=False, index=True),
+    Column("airline", String(100), nullable=False),
+    Column("departure_city", String(100), nullable=False),
+    Column("arrival_city", String(100), nullable=False),
+    Column("base_price", Float, nullable=False),
+    Column("created_at", DateTime),
+)
+Table(
+    "users", legacy,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String(100), unique=True, nullable=False, index=True),
+    Column("email", String(200), unique=True, nullable=False, index=True),
+    Column("password_hash", String(300), nullable=False),
+    Column("full_name", String(150)),
+    Column("wallet_balance", Float, nullable=False, default=50000.0),
+    Column("created_at", DateTime),
+)
+Table(
+    "bookings", legacy,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("pnr", String(50), unique=True, nullable=False, index=True),
+    Column("passenger_name", String(150), nullable=False),
+    Column("flight_id", Integer, ForeignKey("flights.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("final_price", Float, nullable=False),
+    Column("booking_time", DateTime),
+)
+
+
+def test_legacy_schema_is_upgraded_in_place(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    legacy.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(legacy.tables["flights"].insert(), [
+            {"flight_id": "AI-101", "airline": "Air India", "departure_city": "Mumbai",
+             "arrival_city": "Delhi", "base_price": 2500.0},
+        ])
+        conn.execute(legacy.tables["users"].insert(), [
+            {"username": "a", "email": "a@x", "password_hash": "-", "wallet_balance": 49876.545},
+            {"username": "b", "email": "b@x", "password_hash": "-", "wallet_balance": 0.1 + 0.2},
+        ])
+
+    Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)   # second run is a no-op
+
+    columns = {c["name"] for c in inspect(engine).get_columns("users")}
+    assert "wallet_balance" not in columns and "wallet_balance_minor" in columns
+
+    db = sessionmaker(bind=engine)()
+    try:
+        balances = {u.username: u.wallet_balance_minor for u in db.query(models.User)}
+        assert balances == {"a": 4987655, "b": 30}
+
+        entries = db.query(models.WalletEntry).all()
+        assert sorted((e.user_id, e.kind, e.amount_minor, e.balance_after_minor) for e in entries) == [
+            (1, "opening", 4987655, 4987655),
+            (2, "opening", 30, 30),
+        ]
+
+        # startup's backfills run against the upgraded tables
+        assert crud.backfill_flight_cities(db) == 1
+        crud.backfill_seat_inventory(db)
+        flight = db.query(models.Flight).one()
+        assert flight.capacity == crud.settings.DEFAULT_FLIGHT_CAPACITY
+        assert flight.departure_city_id is not None
+        assert crud.create_booking(db, "Legacy", flight_id=flight.id, user_id=1).fare_bucket == "SAVER"
+    finally:
+        db.close()
+
+    indexes = {i["name"]: i["unique"] for i in inspect(engine).get_indexes("flights")}
+    assert {"ix_flights_route", "ix_flights_departure", "uq_flights_number_departure"} <= indexes.keys()
+    assert not indexes["ix_flights_flight_id"]   # dated instances repeat the flight number
+
+    db = sessionmaker(bind=engine)()
+    try:
+        crud.import_flight_rows(db, crud.schedule_flights([("AI-101", "Air India", "Mumbai", "Delhi", 2500.0)], days=2))
+        assert db.query(models.Flight).filter_by(flight_id="AI-101").count() == 3
+    finally:
+        db.close()
+    engine.dispose()
@@ -0,0 +1,53 @@
+# backend/tests/test_pnr.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, models
+from app.utils.pnr import PNRAllocator
+from app.utils.surge import get_surge_engine
+
+from .conftest import seed_schedule
+
+
+def test_live_processes_lease_distinct_worker_ids(db):
+    now = datetime.utcnow()
+    ids = [crud.lease_pnr_worker(db, f"host:{pid}", now) for pid in range(10)]
+    assert len(set(ids)) == 10
+
+    # renewal keeps the same id
+    assert crud.lease_pnr_worker(db, "host:3", now + timedelta(seconds=60)) == ids[3]
+
+
+def test_expired_lease_is_taken_over_once_ids_run_out(db, monkeypatch):
+    monkeypatch.setattr(crud, "WORKER_BITS", 1)   # two ids
+    now = datetime.utcnow()
+    first = crud.lease_pnr_worker(db, "a", now)
+    crud.lease_pnr_worker(db, "b", now)
+
+    with pytest.raises(RuntimeError):
+        crud.lease_pnr_worker(db, "c", now)
+
+    later = now + timedelta(seconds=crud.settings.PNR_LEASE_SECONDS + 1)
+    crud.lease_pnr_worker(db, "b", now + timedelta(seconds=30))   # b renews, a doesn't
+    assert crud.lease_pnr_worker(db, "c", later) == first
+
+
+def test_same_worker_id_collides_and_booking_retries_with_a_fresh_pnr(db, monkeypatch):
+    a, b = PNRAllocator(worker_id=7), PNRAllocator(worker_id=7)
+    clash = a.next()
+    assert clash == b.next()
+
+    seed_schedule(db, days=1)
+    drawn = iter([clash, clash, b.next()])
+    monkeypatch.setattr(crud, "next_pnr", lambda: next(drawn))
+
+    first = crud.create_booking(db, "First", flight_id=1)
+    second = crud.create_booking(db, "Second", flight_id=1)
+
+    assert first.pnr == clash
+    assert second.pnr not in (clash, None)
+    assert db.query(models.Booking).count() == 2
+    # the retry redraws the PNR; it isn't another booking attempt
+    assert get_surge_engine().get_state(1).attempt_count == 2
@@ -0,0 +1,83 @@
+# backend/tests/test_read_your_writes.py
+
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud_async, models
+from app.database import Base
+from app.main import read_your_writes
+from app.utils.db_routing import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, ReplicaSelector, RoutingSession
+
+
+@pytest.fixture
+def api(engine, tmp_path, db):
+    """A primary with one user and a replica that never caught up."""
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(replica)
+    db.add(models.User(username="u", email="u@x", password_hash="-"))
+    db.commit()
+
+    Session = sessionmaker(
+        class_=RoutingSession, bind=engine, primary=engine,
+        replicas=ReplicaSelector([replica]), expire_on_commit=False,
+    )
+
+    def session():
+        s = Session()
+        try:
+            yield s
+        finally:
+            s.close()
+
+    app = FastAPI()
+    app.middleware("http")(read_your_writes)
+
+    @app.post("/topup")
+    async def topup(s=Depends(session)):
+        await crud_async.top_up_wallet(s, 1, 100)
+
+    @app.post("/signup")
+    async def signup(s=Depends(session)):
+        await crud_async.create_user(s, "v", "v@x", "-")
+
+    @app.get("/users")
+    async def users(s=Depends(session)):
+        rows, _ = await crud_async.get_users(s)
+        return len(rows)
+
+    @app.get("/entries")
+    async def entries(s=Depends(session)):
+        rows, _ = await crud_async.get_wallet_entries(s, 1)
+        return len(rows)
+
+    yield app
+    replica.dispose()
+
+
+def test_write_stamp_pins_reads_to_primary_on_any_worker(api):
+    writer = TestClient(api)
+    response = writer.post("/topup")
+    stamp = response.headers[LAST_WRITE_HEADER]
+    assert response.cookies[LAST_WRITE_COOKIE] == stamp
+
+    # the cookie (or header) is all another worker needs
+    assert writer.get("/entries").json() == 1
+    assert TestClient(api).get("/entries", headers={LAST_WRITE_HEADER: stamp}).json() == 1
+
+    # no stamp, an old one, or a forged future one: replica
+    assert TestClient(api).get("/entries").json() == 0
+    for sent in (str(time.time() - 3600), str(time.time() + 3600), "nan", "junk"):
+        assert TestClient(api).get("/entries", headers={LAST_WRITE_HEADER: sent}).json() == 0
+    assert LAST_WRITE_HEADER not in TestClient(api).get("/entries").headers
+
+
+def test_signup_is_a_write_and_stamps_the_response(api):
+    client = TestClient(api)
+    response = client.post("/signup")
+    assert LAST_WRITE_HEADER in response.headers
+    assert client.get("/users").json() == 2
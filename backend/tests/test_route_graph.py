@@ -0,0 +1,47 @@
+# backend/tests/test_route_graph.py
+
+from datetime import datetime, timedelta
+
+from app import crud
+from app.utils.route_graph import FlightEdge, RouteGraph
+
+from .conftest import ROUTES, seed_schedule
+
+A, X, B = 1, 2, 3
+
+
+def _edge(id, dep, arr, departure_at, hours, price):
+    return FlightEdge(
+        id, f"T-{id}", "Test Air", str(dep), str(arr), dep, arr,
+        price, departure_at, departure_at + timedelta(hours=hours),
+    )
+
+
+def test_later_arrival_keeps_its_connection_whatever_the_limit():
+    day = datetime(2030, 1, 1)
+    graph = RouteGraph()
+    graph.add(
+        # five cheap legs into X around 07:00: nothing leaves X in their layover window
+        [_edge(i, A, X, day + timedelta(hours=5, minutes=i), 2, 1000 + i) for i in range(1, 6)]
+        # a pricier one arriving 19:00, and X → B at 02:00 the next day
+        + [_edge(6, A, X, day + timedelta(hours=17), 2, 3000), _edge(7, X, B, day + timedelta(hours=26), 2, 500)]
+    )
+
+    for limit in (1, 5, 6):
+        paths = graph.search([A], [B], day, day + timedelta(days=1), lambda e: e.base_price, max_stops=1, limit=limit)
+        assert [[e.id for e in p] for p in paths] == [[6, 7]]
+
+
+def test_sync_adds_flights_imported_elsewhere(db):
+    seed_schedule(db, days=1)
+    graph = RouteGraph()
+    loaded = graph.load(db)
+    assert graph.sync(db) == 0
+
+    # imported through another graph (another process): this one isn't told
+    start = datetime.utcnow().date() + timedelta(days=2)
+    crud.import_flight_rows(db, crud.schedule_flights(ROUTES, days=2, start=start))
+
+    assert graph.sync(db) == 2 * len(ROUTES)
+    assert len(graph) == loaded + 2 * len(ROUTES)
+    assert graph.sync(db) == 0
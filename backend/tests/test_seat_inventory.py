@@ -0,0 +1,103 @@
+# backend/tests/test_seat_inventory.py
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func
+
+from app import crud, models
+from app.utils.money import to_minor
+from app.utils.pricing import get_pricing_engine
+
+from .conftest import ROUTES
+
+
+def _seed_flight(db, capacity):
+    rows = crud.schedule_flights(ROUTES[:1], days=1)
+    rows[0]["capacity"] = capacity
+    crud.import_flight_rows(db, rows)
+    return db.query(models.Flight).one()
+
+
+def test_listed_price_follows_the_cheapest_open_bucket(db):
+    flight = _seed_flight(db, capacity=10)   # SAVER 4, STANDARD 4, FLEX 2
+    engine = get_pricing_engine()
+    assert crud.get_flight(db, flight.id)["price"] == engine.price(flight, "SAVER")
+
+    for i in range(4):
+        crud.create_booking(db, f"Saver {i}", flight_id=flight.id)
+    crud.refresh_due_prices(db)
+
+    listed = crud.get_flight(db, flight.id)["price"]
+    assert listed == engine.price(flight, "STANDARD")
+
+    booking = crud.create_booking(db, "Standard", flight_id=flight.id)
+    assert booking.fare_bucket == "STANDARD"
+    assert booking.final_price == listed
+
+
+def test_concurrent_bookings_never_oversell(db, session_factory):
+    capacity = 60
+    flight = _seed_flight(db, capacity=capacity)
+
+    def attempt(i):
+        session = session_factory()
+        try:
+            return crud.create_booking(session, f"Passenger {i}", flight_id=flight.id).fare_bucket
+        except ValueError as e:
+            return str(e)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        outcomes = Counter(pool.map(attempt, range(1000)))
+
+    sold = {bucket: n for bucket, n in outcomes.items() if bucket != "Flight is sold out"}
+    assert sum(sold.values()) == capacity
+    assert outcomes["Flight is sold out"] == 1000 - capacity
+
+    db.expire_all()
+    assert db.query(models.Booking).count() == capacity
+    assert db.query(func.min(models.SeatInventory.seats_available)).scalar() == 0
+    assert db.query(func.sum(models.SeatInventory.seats_available)).scalar() == 0
+    booked = Counter(b for (b,) in db.query(models.Booking.fare_bucket))
+    assert booked == Counter(sold) == Counter({"SAVER": 24, "STANDARD": 24, "FLEX": 12})
+
+
+def test_holds_and_direct_bookings_race_for_one_seat_assignment(db, session_factory):
+    flight = _seed_flight(db, capacity=60)
+    user = models.User(username="u", email="u@x", password_hash="-")
+    db.add(user)
+    db.flush()
+    crud.post_wallet_entry(db, user.id, to_minor(100000), "opening")
+    db.commit()
+
+    def attempt(i):
+        session = session_factory()
+        try:
+            if i % 2:
+                crud.create_hold(session, f"Holder {i}", flight.id, user.id, seat_number="3A")
+            else:
+                crud.create_booking(session, f"Booker {i}", flight_id=flight.id, seat_number="3A")
+            return "taken"
+        except ValueError as e:
+            return str(e)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        outcomes = Counter(pool.map(attempt, range(64)))
+
+    assert outcomes == {"taken": 1, "Seat already taken": 63}
+    db.expire_all()
+    held = db.query(models.SeatHold).filter(models.SeatHold.seat_number == "3A").count()
+    booked = db.query(models.Booking).filter(models.Booking.seat_number == "3A").count()
+    assert held + booked == 1
+
+    # a released hold frees the seat for the next claim
+    hold = crud.create_hold(db, "Holder", flight.id, user.id, seat_number="4B")
+    with pytest.raises(ValueError, match="Seat already taken"):
+        crud.create_booking(db, "Booker", flight_id=flight.id, seat_number="4b")
+    assert crud.release_hold(db, hold.id, user.id)
+    assert crud.create_booking(db, "Booker", flight_id=flight.id, seat_number="4b").seat_number == "4B"
@@ -0,0 +1,33 @@
+# backend/tests/test_surge.py
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.utils.surge import InMemorySurgeEngine
+
+from .conftest import seed_schedule
+
+
+def test_flush_drops_state_of_deleted_flights_instead_of_retrying_forever(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fk.db'}")
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    try:
+        seed_schedule(db, days=1)
+        surge = InMemorySurgeEngine()
+        surge.record_attempt(1)
+        surge.record_attempt(999)   # e.g. pruned while its attempts were in memory
+
+        assert surge.flush(db) == 1
+        assert surge.flush(db) == 0   # nothing re-queued
+
+        surge.record_attempt(2)
+        assert surge.flush(db) == 1
+        assert {row.flight_id for row in db.query(models.FlightAttempt)} == {1, 2}
+    finally:
+        db.close()
+        engine.dispose()
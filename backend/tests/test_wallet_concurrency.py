@@ -0,0 +1,68 @@
+# backend/tests/test_wallet_concurrency.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func
+
+from app import crud, models
+from app.utils.money import to_minor
+
+from .conftest import seed_schedule
+
+
+def test_concurrent_top_ups_and_bookings_keep_balance_equal_to_ledger(db, session_factory):
+    seed_schedule(db, days=1)
+    user = models.User(username="u", email="u@x", password_hash="-")
+    db.add(user)
+    db.flush()
+    crud.post_wallet_entry(db, user.id, to_minor(10000), "opening")
+    db.commit()
+
+    def top_up(i):
+        session = session_factory()
+        try:
+            crud.top_up_wallet(session, user.id, 100.10, idempotency_key=f"k{i % 100}")
+        finally:
+            session.close()
+
+    def book(i):
+        session = session_factory()
+        try:
+            crud.create_booking(session, f"P{i}", flight_id=1 + i % 3, user_id=user.id)
+            return True
+        except ValueError:
+            return False
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        top_ups = [pool.submit(top_up, i) for i in range(200)]   # each key twice
+        booked = [pool.submit(book, i) for i in range(60)]
+        for f in top_ups:
+            f.result()
+        booked = sum(f.result() for f in booked)
+
+    db.expire_all()
+    entries = db.query(models.WalletEntry).filter_by(user_id=user.id).order_by(models.WalletEntry.id).all()
+    balance = db.query(models.User.wallet_balance_minor).filter_by(id=user.id).scalar()
+
+    assert sum(e.amount_minor for e in entries) == balance
+    assert sum(e.kind == "topup" for e in entries) == 100
+    assert sum(e.kind == "booking" for e in entries) == booked == db.query(models.Booking).count()
+    assert entries[-1].balance_after_minor == balance
+    assert db.query(func.min(models.WalletEntry.balance_after_minor)).scalar() >= 0
+
+
+def test_top_up_key_is_credited_once_and_bound_to_its_amount(db):
+    user = models.User(username="u", email="u@x", password_hash="-")
+    db.add(user)
+    db.commit()
+
+    crud.top_up_wallet(db, user.id, 250, idempotency_key="k")
+    crud.top_up_wallet(db, user.id, 250, idempotency_key="k")
+    assert db.query(models.User.wallet_balance_minor).filter_by(id=user.id).scalar() == 25000
+
+    with pytest.raises(ValueError):
+        crud.top_up_wallet(db, user.id, 300, idempotency_key="k")
+    assert db.query(models.WalletEntry).count() == 1
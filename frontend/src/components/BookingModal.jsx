@@ -1,40 +1,96 @@
 // frontend/src/components/BookingModal.jsx
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 
-export default function BookingModal({ flight, onClose, onConfirm, loading }) {
+const formatCountdown = (seconds) => {
+  const m = Math.floor(seconds / 60);
+  const s = seconds % 60;
+  return `${m}:${String(s).padStart(2, "0")}`;
+};
+
+// Two steps: hold a seat (price locked for a few minutes), then confirm.
+export default function BookingModal({ flight, hold, onHold, onConfirm, onClose, loading }) {
   const [name, setName] = useState("");
+  const [seat, setSeat] = useState("");
+  const [secondsLeft, setSecondsLeft] = useState(0);
+
+  // countdown from the server's expires_in (immune to client clock skew)
+  useEffect(() => {
+    if (!hold) return;
+
+    const deadline = Date.now() + hold.expires_in * 1000;
+    const tick = () =>
+      setSecondsLeft(Math.max(0, Math.round((deadline - Date.now()) / 1000)));
 
-  const handleConfirm = () => {
+    tick();
+    const timer = setInterval(tick, 1000);
+    return () => clearInterval(timer);
+  }, [hold]);
+
+  const expired = hold && secondsLeft === 0;
+
+  const handleHold = () => {
     if (!name.trim()) {
       alert("Enter passenger name");
       return;
     }
-    onConfirm(name.trim());
+    onHold(name.trim(), seat.trim());
   };
 
   return (
     <div className="fixed inset-0 z-50 flex items-center justify-center">
       <div className="absolute inset-0 bg-black/40" onClick={onClose} />
       <div className="relative z-10 w-full max-w-md bg-white rounded-xl shadow-lg p-6">
-        <h3 className="text-xl font-semibold mb-2">Confirm Booking</h3>
+        <h3 className="text-xl font-semibold mb-2">
+          {hold ? "Confirm Booking" : "Hold a Seat"}
+        </h3>
         <div className="text-sm text-gray-600 mb-4">
           {flight.airline} — {flight.flight_id ?? flight.id}
         </div>
 
-        <div className="mb-4">
-          <label className="block text-sm text-gray-600 mb-1">Passenger name</label>
-          <input
-            className="w-full border rounded-md p-3"
-            value={name}
-            onChange={(e) => setName(e.target.value)}
-            placeholder="e.g. Rahul Sharma"
-          />
-        </div>
+        {!hold ? (
+          <>
+            <div className="mb-4">
+              <label className="block text-sm text-gray-600 mb-1">Passenger name</label>
+              <input
+                className="w-full border rounded-md p-3"
+                value={name}
+                onChange={(e) => setName(e.target.value)}
+                placeholder="e.g. Rahul Sharma"
+              />
+            </div>
+
+            <div className="mb-4">
+              <label className="block text-sm text-gray-600 mb-1">Seat (optional)</label>
+              <input
+                className="w-full border rounded-md p-3"
+                value={seat}
+                onChange={(e) => setSeat(e.target.value)}
+                placeholder="e.g. 12A"
+                maxLength={4}
+              />
+            </div>
+          </>
+        ) : (
+          <div className="mb-4 text-sm text-gray-700 space-y-1">
+            <div>Passenger: <span className="font-medium">{hold.passenger_name}</span></div>
+            <div>Fare: <span className="font-medium">{hold.fare_bucket}</span></div>
+            {hold.seat_number && (
+              <div>Seat: <span className="font-medium">{hold.seat_number}</span></div>
+            )}
+            <div className={expired ? "text-red-600" : "text-gray-500"}>
+              {expired
+                ? "Hold expired — close and try again."
+                : `Seat held for ${formatCountdown(secondsLeft)}`}
+            </div>
+          </div>
+        )}
 
         <div className="flex items-center justify-between">
           <div>
-            <div className="text-xs text-gray-500">Final price</div>
-            <div className="text-lg font-bold">₹{flight.price ?? flight.base_price}</div>
+            <div className="text-xs text-gray-500">{hold ? "Held price" : "Current price"}</div>
+            <div className="text-lg font-bold">
+              ₹{hold ? hold.price : flight.price ?? flight.base_price}
+            </div>
           </div>
 
           <div className="flex gap-3">
@@ -45,13 +101,23 @@ export default function BookingModal({ flight, onClose, onConfirm, loading }) {
             >
               Cancel
             </button>
-            <button
-              className="px-4 py-2 rounded-md bg-primary text-white"
-              onClick={handleConfirm}
-              disabled={loading}
-            >
-              {loading ? "Booking..." : "Confirm"}
-            </button>
+            {hold ? (
+              <button
+                className="px-4 py-2 rounded-md bg-primary text-white"
+                onClick={onConfirm}
+                disabled={loading || expired}
+              >
+                {loading ? "Booking..." : "Confirm"}
+              </button>
+            ) : (
+              <button
+                className="px-4 py-2 rounded-md bg-primary text-white"
+                onClick={handleHold}
+                disabled={loading}
+              >
+                {loading ? "Holding..." : "Hold seat"}
+              </button>
+            )}
           </div>
         </div>
       </div>
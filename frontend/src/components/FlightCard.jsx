@@ -11,6 +11,8 @@ export default function FlightCard({ flight, onBookClick }) {
   const basePrice = flight.base_price || price;
   const departure = flight.departure_city || flight.from || "Unknown";
   const arrival = flight.arrival_city || flight.to || "Unknown";
+  // departure_at is UTC without an offset
+  const departsAt = flight.departure_at ? new Date(`${flight.departure_at}Z`).toLocaleString() : null;
 
   return (
     <motion.div
@@ -25,6 +27,7 @@ export default function FlightCard({ flight, onBookClick }) {
         <div>
           <h2 className="text-xl font-semibold text-primary">{airline}</h2>
           <p className="text-gray-600 text-sm">Flight ID: {flightId}</p>
+          {departsAt && <p className="text-gray-500 text-sm">Departs {departsAt}</p>}
         </div>
 
       {/* Pricing */}
@@ -1,15 +1,46 @@
 // frontend/src/components/SearchBar.jsx
 import React from "react";
-import { useState } from "react";
+import { useState, useEffect } from "react";
+import axios from "axios";
+
+// Debounced city autocomplete backed by GET /cities?q=
+function useCitySuggestions(term) {
+  const [cities, setCities] = useState([]);
+
+  useEffect(() => {
+    const q = term.trim();
+    if (!q) {
+      setCities([]);
+      return;
+    }
+
+    const timer = setTimeout(async () => {
+      try {
+        const res = await axios.get("http://127.0.0.1:8000/cities", { params: { q } });
+        setCities(Array.isArray(res.data) ? res.data : []);
+      } catch (error) {
+        setCities([]);
+      }
+    }, 200);
+
+    return () => clearTimeout(timer);
+  }, [term]);
+
+  return cities;
+}
 
 export default function SearchBar({ onSearch }) {
   const [departure, setDeparture] = useState("");
   const [arrival, setArrival] = useState("");
+  const [travelDate, setTravelDate] = useState("");
+
+  const departureSuggestions = useCitySuggestions(departure);
+  const arrivalSuggestions = useCitySuggestions(arrival);
 
   const handleSubmit = (e) => {
     e.preventDefault();
     // send backend-friendly keys
-    onSearch({ departure_city: departure.trim(), arrival_city: arrival.trim() });
+    onSearch({ departure_city: departure.trim(), arrival_city: arrival.trim(), date: travelDate });
   };
 
   return (
@@ -17,16 +48,22 @@ export default function SearchBar({ onSearch }) {
       onSubmit={handleSubmit}
       className="bg-white p-6 shadow-lg rounded-xl border border-gray-100 mb-6 animate-slideUp"
     >
-      <div className="grid grid-cols-1 md:grid-cols-3 gap-4 items-end">
+      <div className="grid grid-cols-1 md:grid-cols-4 gap-4 items-end">
         <label className="block">
           <div className="text-xs text-gray-500 mb-1">Departure</div>
           <input
             type="text"
             value={departure}
             placeholder="Mumbai"
+            list="departure-cities"
             onChange={(e) => setDeparture(e.target.value)}
             className="border p-3 rounded-lg focus:ring-2 focus:ring-primary w-full"
           />
+          <datalist id="departure-cities">
+            {departureSuggestions.map((c) => (
+              <option key={c.id} value={c.name} />
+            ))}
+          </datalist>
         </label>
 
         <label className="block">
@@ -35,9 +72,25 @@ export default function SearchBar({ onSearch }) {
             type="text"
             value={arrival}
             placeholder="Delhi"
+            list="arrival-cities"
             onChange={(e) => setArrival(e.target.value)}
             className="border p-3 rounded-lg focus:ring-2 focus:ring-primary w-full"
           />
+          <datalist id="arrival-cities">
+            {arrivalSuggestions.map((c) => (
+              <option key={c.id} value={c.name} />
+            ))}
+          </datalist>
+        </label>
+
+        <label className="block">
+          <div className="text-xs text-gray-500 mb-1">Date</div>
+          <input
+            type="date"
+            value={travelDate}
+            onChange={(e) => setTravelDate(e.target.value)}
+            className="border p-3 rounded-lg focus:ring-2 focus:ring-primary w-full"
+          />
         </label>
 
         <div>
@@ -5,6 +5,10 @@ import axios from "axios";
 
 const WalletContext = createContext(null);
 
+// One key per user action: retries of the same request are not applied twice
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
 export function WalletProvider({ children }) {
   const API = "http://localhost:8000";
 
@@ -87,7 +91,9 @@ export function WalletProvider({ children }) {
     if (!user) throw new Error("Login required");
 
     try {
-      await axios.post(`${API}/users/${user.id}/topup?amount=${amount}`);
+      await axios.post(`${API}/users/${user.id}/topup?amount=${amount}`, null, {
+        headers: { "Idempotency-Key": newIdempotencyKey() },
+      });
       await refreshWallet();
     } catch (err) {
       console.error("Top-up error:", err);
@@ -104,27 +110,86 @@ export function WalletProvider({ children }) {
     if (!user) throw new Error("Login required");
 
     try {
-      const res = await axios.post(`${API}/bookings`, {
+      const res = await axios.post(
+        `${API}/bookings`,
+        {
+          passenger_name,
+          flight_id,
+          user_id: user.id,
+        },
+        { headers: { "Idempotency-Key": newIdempotencyKey() } }
+      );
+
+      await refreshWallet(); // wallet reduces
+      return res.data;
+    } catch (err) {
+      console.error("Booking error:", err);
+      throw new Error(err.response?.data?.detail || "Booking failed");
+    }
+  };
+
+
+  // Two-phase booking: hold a seat (price locked, nothing charged) ...
+  const holdSeat = async ({ passenger_name, flight_id, seat_number }) => {
+    if (!user) throw new Error("Login required");
+
+    try {
+      const res = await axios.post(`${API}/bookings/holds`, {
         passenger_name,
         flight_id,
         user_id: user.id,
+        ...(seat_number ? { seat_number } : {}),
+      });
+      return res.data;
+    } catch (err) {
+      console.error("Hold error:", err);
+      throw new Error(err.response?.data?.detail || "Could not hold seat");
+    }
+  };
+
+  // ... then confirm before it expires (wallet is debited here)
+  const confirmHold = async (holdId) => {
+    if (!user) throw new Error("Login required");
+
+    try {
+      const res = await axios.post(`${API}/bookings/holds/${holdId}/confirm`, {
+        user_id: user.id,
       });
 
-      await refreshWallet(); // wallet reduces
+      await refreshWallet();
       return res.data;
     } catch (err) {
-      console.error("Booking error:", err);
+      console.error("Confirm error:", err);
       throw new Error(err.response?.data?.detail || "Booking failed");
     }
   };
 
+  const releaseHold = async (holdId) => {
+    if (!user) return;
 
-  const fetchBookings = async () => {
+    try {
+      await axios.delete(`${API}/bookings/holds/${holdId}`, {
+        params: { user_id: user.id },
+      });
+    } catch (err) {
+      // already expired/swept: nothing to release
+      console.error("Release hold error:", err);
+    }
+  };
+
+
+  // Keyset-paginated: pass the previous nextCursor to get the next page
+  const fetchBookings = async (cursor = null) => {
     if (!user) throw new Error("Login required");
 
     try {
-      const res = await axios.get(`${API}/bookings?user_id=${user.id}`);
-      return res.data;
+      const res = await axios.get(`${API}/bookings`, {
+        params: { user_id: user.id, ...(cursor ? { cursor } : {}) },
+      });
+      return {
+        bookings: res.data,
+        nextCursor: res.headers["x-next-cursor"] || null,
+      };
     } catch (err) {
       console.error("Fetch bookings error:", err);
       throw new Error("Unable to load bookings");
@@ -148,6 +213,9 @@ export function WalletProvider({ children }) {
     topUpWallet,
 
     bookFlight,
+    holdSeat,
+    confirmHold,
+    releaseHold,
     fetchBookings,
   };
 
@@ -7,6 +7,7 @@ export default function Bookings() {
   const { user, fetchBookings } = useWallet();
 
   const [bookings, setBookings] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   // -----------------------------------------
@@ -29,13 +30,24 @@ export default function Bookings() {
   const loadBookings = async () => {
     try {
       const data = await fetchBookings(); // Calls GET /bookings?user_id=ID
-      setBookings(data);
+      setBookings(data.bookings);
+      setNextCursor(data.nextCursor);
     } catch (err) {
       console.error("Failed to load bookings:", err);
     }
     setLoading(false);
   };
 
+  const loadMore = async () => {
+    try {
+      const data = await fetchBookings(nextCursor);
+      setBookings((prev) => [...prev, ...data.bookings]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      console.error("Failed to load more bookings:", err);
+    }
+  };
+
   useEffect(() => {
     loadBookings();
   }, [user]);
@@ -123,6 +135,17 @@ export default function Bookings() {
           );
         })}
       </div>
+
+      {nextCursor && (
+        <div className="mt-6 text-center">
+          <button
+            onClick={loadMore}
+            className="px-6 py-2 rounded-lg border border-primary text-primary hover:bg-primary hover:text-white transition"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 }
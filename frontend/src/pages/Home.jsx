@@ -10,9 +10,10 @@ export default function Home() {
   const [flights, setFlights] = useState([]);
   const [selectedFlight, setSelectedFlight] = useState(null);
   const [loadingBooking, setLoadingBooking] = useState(false);
+  const [hold, setHold] = useState(null);
 
   // NEW context API
-  const { user, wallet, bookFlight, refreshWallet } = useWallet();
+  const { user, wallet, holdSeat, confirmHold, releaseHold } = useWallet();
 
   // --------------------------------------------------------------------
   // FETCH FLIGHTS
@@ -22,6 +23,7 @@ export default function Home() {
       const params = {
         ...(filters.departure_city ? { departure_city: filters.departure_city } : {}),
         ...(filters.arrival_city ? { arrival_city: filters.arrival_city } : {}),
+        ...(filters.date ? { date: filters.date } : {}),
       };
 
       const res = await axios.get("http://127.0.0.1:8000/flights", { params });
@@ -37,9 +39,9 @@ export default function Home() {
   }, []);
 
   // --------------------------------------------------------------------
-  // BOOKING HANDLER
+  // BOOKING HANDLERS (hold → confirm)
   // --------------------------------------------------------------------
-  const handleBooking = async (passengerName) => {
+  const handleHold = async (passengerName, seatNumber) => {
     if (!passengerName) return alert("Please enter passenger name");
     if (!selectedFlight) return alert("No flight selected");
 
@@ -48,9 +50,9 @@ export default function Home() {
       return;
     }
 
-    const finalPrice = selectedFlight.price ?? selectedFlight.base_price;
+    const currentPrice = selectedFlight.price ?? selectedFlight.base_price;
 
-    if (Number(wallet) < Number(finalPrice)) {
+    if (Number(wallet) < Number(currentPrice)) {
       alert("Insufficient wallet balance!");
       return;
     }
@@ -58,13 +60,27 @@ export default function Home() {
     setLoadingBooking(true);
 
     try {
-      // Using the new WalletContext API call
-      const booking = await bookFlight({
+      const held = await holdSeat({
         passenger_name: passengerName,
         flight_id: selectedFlight.id,
+        seat_number: seatNumber,
       });
+      setHold(held);
+    } catch (err) {
+      console.error("Hold error:", err);
+      alert(`Could not hold seat: ${err?.message || "Hold failed"}`);
+    } finally {
+      setLoadingBooking(false);
+    }
+  };
 
-      await refreshWallet();
+  const handleConfirm = async () => {
+    if (!hold) return;
+
+    setLoadingBooking(true);
+
+    try {
+      const booking = await confirmHold(hold.id);
 
       alert(`Booking successful! PNR: ${booking.pnr}`);
 
@@ -72,19 +88,23 @@ export default function Home() {
       const pdfUrl = `http://127.0.0.1:8000/bookings/ticket/${booking.pnr}?user_id=${user.id}`;
       window.open(pdfUrl, "_blank");
 
+      setHold(null);
       setSelectedFlight(null);
     } catch (err) {
       console.error("Booking error:", err);
-      const message =
-        err?.response?.data?.detail ||
-        err?.message ||
-        "Booking failed";
-      alert(`Booking failed: ${message}`);
+      alert(`Booking failed: ${err?.message || "Booking failed"}`);
     } finally {
       setLoadingBooking(false);
     }
   };
 
+  // Closing the modal gives an unconfirmed seat back right away
+  const handleClose = () => {
+    if (hold) releaseHold(hold.id);
+    setHold(null);
+    setSelectedFlight(null);
+  };
+
   // --------------------------------------------------------------------
   // RENDER UI
   // --------------------------------------------------------------------
@@ -136,8 +156,10 @@ export default function Home() {
       {selectedFlight && (
         <BookingModal
           flight={selectedFlight}
-          onClose={() => setSelectedFlight(null)}
-          onConfirm={handleBooking}
+          hold={hold}
+          onHold={handleHold}
+          onConfirm={handleConfirm}
+          onClose={handleClose}
           loading={loadingBooking}
         />
       )}